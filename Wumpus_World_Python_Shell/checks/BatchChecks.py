@@ -0,0 +1,37 @@
+# ======================================================================
+# FILE:        BatchChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks BatchWorld against World. It plays the
+#              same worlds in batches and one at a time, with the
+#              scripted agent and with one that returns invalid actions,
+#              and compares the scores.
+#
+# NOTES:       - Requires NumPy, like BatchWorld; skipped without it.
+# ======================================================================
+
+from Common import Check, ScriptedAI, InvalidAI, randomWorld
+from World import World
+
+def checkBatch ( games, rng ):
+    try:
+        from BatchWorld import BatchWorld
+    except ImportError:
+        return None
+
+    check  = Check()
+    worlds = [ randomWorld ( rng, 12, offBoard = False ) for i in range ( games ) ]
+
+    for name, agentClass in ( ( "Conformance:ScriptedAI", ScriptedAI ), ( "Common:InvalidAI", InvalidAI ) ):
+        for start in range ( 0, len(worlds), 100 ):
+            batch  = worlds[start:start+100]
+            scores = BatchWorld ( batch, agent = name ).run()
+            for i, ( record, score ) in enumerate ( zip ( batch, scores ), start ):
+                expected = World ( agent=agentClass(), record=record ).run()
+                check.expect ( score == expected,
+                               name + ", world " + str(i) + " scores " + str(score) + " in a batch, not " + str(expected) )
+
+    return check
+
+CHECKS = [ ( "batch", checkBatch ) ]
@@ -0,0 +1,64 @@
+# ======================================================================
+# FILE:        BoardChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the boards of Board.py against each
+#              other. It fills TileBoard, BitBoard and SparseBoard with
+#              the same features, on and off the board, then shoots,
+#              grabs, snapshots, restores and clears them the way a
+#              World does, and compares every tile, percept and answer.
+# ======================================================================
+
+from Common import Check, BOARDS, tileFacts
+
+def boardFacts ( board, cols, rows ):
+    return [ ( tileFacts ( board.tile ( c, r ) ), board.percepts ( c, r ), board.isDeadly ( c, r ) )
+             for c in range ( cols ) for r in range ( rows ) ]
+
+def checkBoards ( games, rng ):
+    check = Check()
+
+    for game in range ( games ):
+        cols, rows = rng.randint ( 1, 9 ), rng.randint ( 1, 9 )
+        boards     = [ board ( cols, rows ) for board in BOARDS ]
+
+        # Boards are filled, and then played on; a snapshot is only
+        # good until the board is cleared
+        for phase in range ( 3 ):
+            for i in range ( rng.randint ( 0, 12 ) ):
+                op   = rng.choice ( ( "addPit", "addWumpus", "addGold" ) )
+                c, r = rng.randint ( -1, cols ), rng.randint ( -1, rows )
+                for board in boards:
+                    getattr ( board, op ) ( c, r )
+
+            snapshots = [ [ board.snapshot() for board in boards ] ]
+            for step in range ( 20 ):
+                op   = rng.choice ( ( "shoot", "takeGold", "snapshot", "restore" ) )
+                c, r = rng.randrange ( cols ), rng.randrange ( rows )
+
+                if op == "shoot":
+                    direction = rng.randrange ( 4 )
+                    results   = [ board.shoot ( c, r, direction ) for board in boards ]
+                elif op == "takeGold":
+                    results = [ board.takeGold ( c, r ) for board in boards ]
+                elif op == "snapshot":
+                    snapshots.append ( [ board.snapshot() for board in boards ] )
+                    results = []
+                else:
+                    for board, snapshot in zip ( boards, rng.choice ( snapshots ) ):
+                        board.restore ( snapshot )
+                    results = []
+
+                where = op + " on a " + str(cols) + "x" + str(rows) + " board"
+                check.expect ( all ( result == results[0] for result in results ), where + " answered " + str(results) )
+                facts = [ boardFacts ( board, cols, rows ) for board in boards ]
+                check.expect ( all ( fact == facts[0] for fact in facts ), "boards differ after " + where )
+
+            cols, rows = rng.randint ( 1, 9 ), rng.randint ( 1, 9 )
+            for board in boards:
+                board.clear ( cols, rows )
+
+    return check
+
+CHECKS = [ ( "boards", checkBoards ) ]
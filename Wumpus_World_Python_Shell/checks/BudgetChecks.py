@@ -0,0 +1,149 @@
+# ======================================================================
+# FILE:        BudgetChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks time budgets. It plays the scripted
+#              agent, made to sleep or loop forever on one move, under a
+#              move limit and a game limit, and checks that the game is
+#              forfeited on that move with the score of the moves before
+#              it less the penalty, that the next game starts with a
+#              full budget, and that Main.py --move-limit scores the
+#              same.
+#
+# NOTES:       - The move limits are short, but an agent only runs over
+#                on its slow move, so a forfeited game only takes a few
+#                hundredths of a second.
+# ======================================================================
+
+import time
+import signal
+import tempfile
+
+from Common import Check, ScriptedAI, randomWorld
+from Agent import Agent
+from World import World
+from Corpus import Corpus
+from Budget import TimeBudget, PENALTY
+from MainChecks import runMain, printed, writeWorlds
+
+# The move the slow agents take too long on, and the move limit
+SLOW_MOVE = 5
+LIMIT     = 0.02
+
+class SleepyAI ( ScriptedAI ):
+
+    # The scripted agent, sleeping through one move, with the exception
+    # a careless agent would use to ignore being interrupted
+
+    def __init__ ( self ):
+        super().__init__()
+        self.__moves = 0
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        self.__moves += 1
+        if self.__moves == SLOW_MOVE:
+            try:
+                time.sleep ( 1 )
+            except Exception:
+                pass
+        return super().getAction ( stench, breeze, glitter, bump, scream )
+
+class StuckAI ( ScriptedAI ):
+
+    # The scripted agent, stuck in a loop on one move
+
+    def __init__ ( self ):
+        super().__init__()
+        self.__moves = 0
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        self.__moves += 1
+        while self.__moves == SLOW_MOVE:
+            pass
+        return super().getAction ( stench, breeze, glitter, bump, scream )
+
+class PacedAI ( Agent ):
+
+    # Turns three times, taking a quarter of the limit for each, then
+    # climbs out, so a game takes most of a game limit
+
+    def __init__ ( self ):
+        self.__moves = 0
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        self.__moves += 1
+        if self.__moves > 3:
+            return Agent.Action.CLIMB
+        time.sleep ( LIMIT / 4 )
+        return Agent.Action.TURN_LEFT
+
+def forfeitScore ( record ):
+    # Returns the score of a game the scripted agent forfeits on its
+    # slow move, or None if the game is over before it
+    world = World ( agent=ScriptedAI(), record=record )
+    agent = ScriptedAI()
+    for move in range ( SLOW_MOVE - 1 ):
+        percepts, change, done = world.step ( agent.getAction ( *world.percepts() ) )
+        if done:
+            return None
+    return world.state()["score"] - PENALTY
+
+def checkBudget ( games, rng ):
+    check   = Check()
+    handler = signal.getsignal ( signal.SIGALRM ) if hasattr ( signal, "SIGALRM" ) else None
+
+    for i in range ( games // 10 ):
+        record   = randomWorld ( rng, 8 )
+        expected = forfeitScore ( record )
+        plain    = World ( agent=ScriptedAI(), record=record ).run()
+        budget   = TimeBudget ( LIMIT, 0 ) if i % 2 == 0 else TimeBudget ( 0, LIMIT )
+
+        for agentClass in ( SleepyAI, StuckAI ):
+            where = agentClass.__name__ + ", world " + str(i) + ( ", move limit" if i % 2 == 0 else ", game limit" )
+            world = World ( agent=agentClass(), record=record, budget=budget )
+            score = world.run()
+
+            if expected == None:
+                check.expect ( score == plain and world.outcome() != "forfeit", where + ": a game over before the slow move is forfeited" )
+            else:
+                check.expect ( score == expected and world.outcome() == "forfeit",
+                               where + ": scores " + str(score) + " with outcome " + world.outcome() + ", not a forfeit of " + str(expected) )
+
+            # The same budget starts the next game afresh
+            fast = World ( agent=ScriptedAI(), record=record, budget=budget )
+            check.expect ( fast.run() == plain and fast.outcome() != "forfeit", where + ": the next game doesn't get a full budget" )
+
+        # A game limit is for one game, however many the budget is used for
+        if i % 5 == 0:
+            shared = TimeBudget ( 0, LIMIT * 2 )
+            paced  = [ World ( agent=PacedAI(), record=record, budget=shared ) for j in range ( 3 ) ]
+            check.expect ( [ world.run() for world in paced ] == [ -4 ] * 3, "world " + str(i) + ": a game limit runs out over many games" )
+
+        if handler != None:
+            check.expect ( signal.getsignal ( signal.SIGALRM ) == handler, "world " + str(i) + ": the SIGALRM handler isn't put back" )
+
+    return check
+
+def checkMoveLimit ( games, rng ):
+    # Main.py --move-limit forfeits the same games, and warns for each
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 20 )
+
+        with Corpus ( corpus ) as worlds:
+            expected = [ forfeitScore ( worlds[i] ) for i in range ( len(worlds) ) ]
+        forfeits = sum ( 1 for score in expected if score != None )
+        expected = [ score if forfeit == None else forfeit for score, forfeit in zip ( scores, expected ) ]
+
+        status, output = runMain ( [ "--move-limit", str(LIMIT), "-f", corpus ], "BudgetChecks:SleepyAI" )
+        average = printed ( output, "The agent's average score: " )
+        check.expect ( status == 0 and average != None and float(average) == sum ( expected ) / len(expected),
+                       "Main.py --move-limit averages " + str(average) + ", not " + str(sum ( expected ) / len(expected)) )
+        check.expect ( output.count ( "ran out of time" ) == forfeits,
+                       "Main.py --move-limit warns of " + str(output.count ( "ran out of time" )) + " forfeits, not " + str(forfeits) )
+
+    return check
+
+CHECKS = [ ( "budget", checkBudget ), ( "limits", checkMoveLimit ) ]
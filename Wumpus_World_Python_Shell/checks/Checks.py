@@ -0,0 +1,106 @@
+# ======================================================================
+# FILE:        Checks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file runs the checks of the shell, which play many
+#              random games and compare every engine, board and helper
+#              against a reference. It is run from the checks folder:
+#
+#                   python3 Checks.py [-q] [Check...]
+#
+#              With no Check, every check is run. Each module below
+#              holds the checks of one part of the shell, and lists them
+#              in its CHECKS.
+#
+#              -q plays fewer games. It exits with status 1 if any check
+#              fails, so it can be run as a test.
+#
+# NOTES:       - Every check is seeded from its name, so a failure
+#                happens again on the next run.
+#
+#              - A check that needs an optional dependency returns None
+#                without it, and is reported as skipped.
+# ======================================================================
+
+import sys
+import random
+import SnapshotChecks
+import BatchChecks
+import BoardChecks
+import CorpusChecks
+import ParseChecks
+import EngineChecks
+import WumpusChecks
+import OracleChecks
+import KnowledgeChecks
+import ProbabilityChecks
+import PoolChecks
+import TraceChecks
+import TournamentChecks
+import MainChecks
+import TimingChecks
+import RenderChecks
+import ResultsChecks
+import BudgetChecks
+
+MODULES = [
+    SnapshotChecks,
+    BatchChecks,
+    BoardChecks,
+    CorpusChecks,
+    ParseChecks,
+    EngineChecks,
+    WumpusChecks,
+    OracleChecks,
+    KnowledgeChecks,
+    ProbabilityChecks,
+    PoolChecks,
+    TraceChecks,
+    TournamentChecks,
+    MainChecks,
+    TimingChecks,
+    RenderChecks,
+    ResultsChecks,
+    BudgetChecks
+]
+
+CHECKS = [ check for module in MODULES for check in module.CHECKS ]
+
+# Failures printed per check; the rest are only counted
+SHOWN = 5
+
+def main ( ):
+    args  = sys.argv[1:]
+    quick = "-q" in args
+    names = [ arg for arg in args if arg != "-q" ]
+    known = [ name for name, function in CHECKS ]
+
+    if any ( name not in known for name in names ):
+        print ( "Checks [-q] [Check...]" )
+        print ( )
+        print ( "Checks: " + ", ".join ( known ) )
+        sys.exit ( 2 )
+
+    games  = 200 if quick else 1000
+    failed = 0
+
+    for name, function in CHECKS:
+        if names and name not in names:
+            continue
+
+        check = function ( games, random.Random ( name ) )
+        if check == None:
+            print ( name.ljust(12) + "skipped" )
+            continue
+
+        print ( name.ljust(12) + str(check.cases).rjust(8) + " cases" + str(len(check.failures)).rjust(8) + " failures" )
+        for message in check.failures[:SHOWN]:
+            print ( "\t[ERROR] " + message )
+        failed += len(check.failures)
+
+    if failed > 0:
+        sys.exit ( 1 )
+
+if __name__ == "__main__":
+    main()
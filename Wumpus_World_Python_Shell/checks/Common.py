@@ -0,0 +1,114 @@
+# ======================================================================
+# FILE:        Common.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains what the checks share: the Check that
+#              counts cases and keeps failures, random worlds, and ways
+#              to compare two games. Importing it puts the src folder on
+#              the path, so every check imports the shell the same way.
+#
+# NOTES:       - Random worlds can have features off the board and more
+#                than one wumpus, which world files allow, so the checks
+#                cover more than World.py ever generates.
+# ======================================================================
+
+import sys
+import os
+import random
+
+SOURCE = os.path.join ( os.path.dirname ( os.path.abspath ( __file__ ) ), "..", "src" )
+if SOURCE not in sys.path:
+    sys.path.insert ( 0, SOURCE )
+
+from Agent import Agent
+from Board import TileBoard, BitBoard, SparseBoard
+from Worlds import WorldDescription
+from Conformance import ScriptedAI
+
+BOARDS  = [ TileBoard, BitBoard, SparseBoard ]
+ACTIONS = list ( Agent.Action )
+
+class Check():
+
+    # Counts the cases of a check and keeps its failures
+
+    def __init__ ( self ):
+        self.cases    = 0
+        self.failures = []
+
+    def expect ( self, ok, message ):
+        self.cases += 1
+        if not ok:
+            self.failures.append ( message )
+
+class InvalidAI ( ScriptedAI ):
+
+    # The scripted agent, returning None or a string instead of an
+    # action now and then
+
+    def __init__ ( self ):
+        super().__init__()
+        self.__moves = 0
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        action        = super().getAction ( stench, breeze, glitter, bump, scream )
+        self.__moves += 1
+        if self.__moves % 7 == 0:
+            return None
+        if self.__moves % 11 == 0:
+            return "CLIMB"
+        return action
+
+def randomWorld ( rng, maxSize, offBoard = True, extraWumpus = True ):
+    # Returns a random WorldDescription, with up to four wumpus if
+    # extraWumpus, and features up to one cell off the board if offBoard
+    cols  = rng.randint ( 1, maxSize )
+    rows  = rng.randint ( 1, maxSize )
+    edge  = 1 if offBoard else 0
+    cells = [ ( c, r ) for c in range ( -edge, cols + edge ) for r in range ( -edge, rows + edge ) ]
+    count = rng.choice ( ( 1, 1, 1, 2, 4 ) ) if extraWumpus else 1
+
+    return WorldDescription ( cols, rows, [ rng.choice ( cells ) for i in range ( count ) ], [ rng.choice ( cells ) ],
+                              [ cell for cell in cells if cell != ( 0, 0 ) and rng.random() < 0.15 ] )
+
+def tileFacts ( tile ):
+    return ( tile.pit, tile.wumpus, tile.gold, tile.breeze, tile.stench )
+
+def grid ( world ):
+    # Every tile of a World, as tuples
+    cols, rows = world.dimensions()
+    return [ tileFacts ( world.tile ( c, r ) ) for c in range ( cols ) for r in range ( rows ) ]
+
+def play ( world, seed ):
+    # Runs a game with the random module seeded; returns everything a
+    # game can be compared on
+    random.seed ( seed )
+    score = world.run()
+    return score, world.state(), world.outcome(), grid ( world )
+
+def fields ( record ):
+    return ( record.colDimension, record.rowDimension, list ( record.wumpus ), list ( record.gold ), list ( record.pits ) )
+
+def worldText ( record, newline = "\n" ):
+    # The text of a world file, with the extra wumpus section if it has
+    # more than one
+    lines  = [ str(record.colDimension) + "\t" + str(record.rowDimension) ]
+    lines += [ str(c) + "\t" + str(r) for c, r in list ( record.wumpus[:1] ) + list ( record.gold ) ]
+    lines += [ str(len(record.pits)) ] + [ str(c) + "\t" + str(r) for c, r in record.pits ]
+    if len(record.wumpus) > 1:
+        lines += [ str(len(record.wumpus) - 1) ] + [ str(c) + "\t" + str(r) for c, r in record.wumpus[1:] ]
+    return newline.join ( lines ) + newline
+
+class WorldFile():
+
+    # A world file in memory, for World's file argument
+
+    def __init__ ( self, text ):
+        self.__text = text
+
+    def read ( self ):
+        return self.__text
+
+    def close ( self ):
+        pass
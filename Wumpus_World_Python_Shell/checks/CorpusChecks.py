@@ -0,0 +1,66 @@
+# ======================================================================
+# FILE:        CorpusChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the packed corpus of Corpus.py. It
+#              writes random worlds as world files and as a corpus,
+#              reads the corpus back, converts the folder, and compares
+#              every world and its digest. Cut-off and foreign files
+#              have to raise ValueError.
+# ======================================================================
+
+import os
+import tempfile
+from Common import Check, randomWorld, worldText, fields
+from Corpus import Corpus, writeCorpus, convertFolder, worldDigest
+
+def checkCorpus ( games, rng ):
+    check  = Check()
+    worlds = [ randomWorld ( rng, 12 ) for i in range ( games ) ]
+    names  = [ "world_" + str(i) + ".txt" for i in range ( games ) ]
+
+    with tempfile.TemporaryDirectory() as temporary:
+        folder = os.path.join ( temporary, "worlds" )
+        os.mkdir ( folder )
+        for name, record in zip ( names, worlds ):
+            with open ( os.path.join ( folder, name ), "w" ) as file:
+                file.write ( worldText ( record ) )
+
+        filename  = os.path.join ( temporary, "worlds.wwc" )
+        converted = os.path.join ( temporary, "converted.wwc" )
+        writeCorpus ( filename, [ ( name, ) + fields ( record ) for name, record in zip ( names, worlds ) ] )
+        convertFolder ( folder, converted )
+
+        with Corpus ( filename ) as corpus, Corpus ( converted ) as other:
+            check.expect ( len(corpus) == len(other) == len(worlds), "the corpora hold " + str(( len(corpus), len(other) )) + " worlds" )
+            for name, record, packed in zip ( names, worlds, corpus ):
+                check.expect ( fields ( packed ) == fields ( record ) and packed.name == name,
+                               name + " reads back from the corpus differently" )
+                check.expect ( worldDigest ( packed ) == worldDigest ( record ), name + " has a different digest in the corpus" )
+
+            # Converting the folder gives the same worlds, in name order
+            byName = { packed.name: fields ( packed ) for packed in corpus }
+            for packed in other:
+                check.expect ( byName.get ( packed.name ) == fields ( packed ), packed.name + " converts differently" )
+
+        with open ( filename, "rb" ) as file:
+            data = file.read()
+        for size in sorted ( set ( [ 0, 1, 15, 16, 17, 16 + 8 * len(worlds) - 1 ] ) ):
+            broken = os.path.join ( temporary, "broken.wwc" )
+            with open ( broken, "wb" ) as file:
+                file.write ( data[:size] )
+            check.expect ( raisesValueError ( broken ), "a corpus cut to " + str(size) + " bytes doesn't raise ValueError" )
+
+        check.expect ( raisesValueError ( os.path.join ( folder, names[0] ) ), "a world file opens as a corpus" )
+
+    return check
+
+def raisesValueError ( filename ):
+    try:
+        Corpus ( filename ).close()
+    except ValueError:
+        return True
+    return False
+
+CHECKS = [ ( "corpus", checkCorpus ) ]
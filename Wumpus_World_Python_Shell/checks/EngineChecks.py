@@ -0,0 +1,31 @@
+# ======================================================================
+# FILE:        EngineChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the turbo loop of World.run() against
+#              the plain loop. Random worlds, some with more than one
+#              wumpus or with features off the board, are played on
+#              every board with both loops, by the scripted agent and by
+#              the RandomAI, and the scores, final states and boards are
+#              compared.
+# ======================================================================
+
+from Common import Check, BOARDS, ScriptedAI, randomWorld, play
+from World import World
+from RandomAI import RandomAI
+
+def checkEngine ( games, rng ):
+    check  = Check()
+    worlds = [ randomWorld ( rng, 12 ) for i in range ( games ) ]
+
+    for i, record in enumerate ( worlds ):
+        for agentClass in ( ScriptedAI, RandomAI ):
+            results = [ play ( World ( agent=agentClass(), record=record, board=board, turbo=turbo ), i )
+                        for board in BOARDS for turbo in ( True, False ) ]
+            check.expect ( all ( result == results[0] for result in results ),
+                           agentClass.__name__ + ", world " + str(i) + ": scores " + str([ result[0] for result in results ]) )
+
+    return check
+
+CHECKS = [ ( "engine", checkEngine ) ]
@@ -0,0 +1,148 @@
+# ======================================================================
+# FILE:        KnowledgeChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the knowledge base of Knowledge.py. An
+#              explorer walks random worlds with it, and on small boards
+#              every cell it calls safe or deadly is checked against a
+#              brute force count of every pit and wumpus layout that
+#              fits the percepts. On larger boards, with shots and more
+#              than one wumpus, its answers are checked against the
+#              world itself.
+# ======================================================================
+
+import itertools
+from Common import Check, randomWorld
+from Agent import Agent
+from World import World
+from Worlds import WorldDescription
+from Knowledge import Knowledge
+
+STEPS = ( ( 1, 0 ), ( 0, -1 ), ( -1, 0 ), ( 0, 1 ) )
+
+# World.py puts a pit in 2 cells in 10, so a layout's weight is 2 per
+# pit and 8 per clear cell
+PIT_WEIGHT   = 2
+CLEAR_WEIGHT = 8
+
+class Explorer ( Agent ):
+
+    # Walks a world with a knowledge base, forward into the cells it
+    # says are safe and now and then into a risky one, shooting now
+    # and then if shoots. inspect is called with the explorer after
+    # every percept; percepts holds (breeze, stench) by visited cell.
+
+    def __init__ ( self, record, rng, shoots, inspect ):
+        self.knowledge = Knowledge ( len(record.wumpus) == 1 )
+        self.record    = record
+        self.rng       = rng
+        self.shoots    = shoots
+        self.inspect   = inspect
+        self.percepts  = {}
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        knowledge = self.knowledge
+        knowledge.perceive ( stench, breeze, glitter, bump, scream )
+        self.percepts[knowledge.x, knowledge.y] = ( breeze, stench )
+        self.inspect ( self )
+
+        action = self.__choose()
+        knowledge.act ( action )
+        return action
+
+    def __choose ( self ):
+        knowledge, rng = self.knowledge, self.rng
+        if self.shoots and knowledge.hasArrow and rng.random() < 0.03:
+            return Agent.Action.SHOOT
+        if rng.random() < 0.3:
+            return rng.choice ( ( Agent.Action.TURN_LEFT, Agent.Action.TURN_RIGHT ) )
+
+        dx, dy = STEPS[knowledge.facing]
+        cell   = ( knowledge.x + dx, knowledge.y + dy )
+        if knowledge.isSafe ( *cell ) or ( not knowledge.frontier() and rng.random() < 0.5 ):
+            return Agent.Action.FORWARD
+        return rng.choice ( ( Agent.Action.TURN_LEFT, Agent.Action.TURN_RIGHT ) )
+
+def smallWorld ( rng ):
+    # A world as World.py makes them, on a board small enough to count
+    # every layout
+    cols, rows = rng.randint ( 2, 4 ), rng.randint ( 2, 4 )
+    cells      = [ ( c, r ) for c in range ( cols ) for r in range ( rows ) if ( c, r ) != ( 0, 0 ) ]
+    return WorldDescription ( cols, rows, [ rng.choice ( cells ) ], [ rng.choice ( cells ) ],
+                              [ cell for cell in cells if rng.random() < 0.2 ] )
+
+def bruteForce ( cols, rows, percepts ):
+    # Returns the chance of a pit and of the wumpus in every cell but
+    # the start, by (c, r), counted over every layout that fits the
+    # percepts, with one wumpus that hasn't been shot
+    cells     = [ ( c, r ) for c in range ( cols ) for r in range ( rows ) if ( c, r ) != ( 0, 0 ) ]
+    neighbors = lambda c, r: [ ( c + dx, r + dy ) for dx, dy in STEPS if 0 <= c + dx < cols and 0 <= r + dy < rows ]
+    unknown   = [ cell for cell in cells if cell not in percepts ]
+
+    total = 0
+    pits  = dict.fromkeys ( cells, 0 )
+    for bits in itertools.product ( ( 0, 1 ), repeat = len(unknown) ):
+        layout = { cell for cell, bit in zip ( unknown, bits ) if bit }
+        if any ( any ( n in layout for n in neighbors ( *cell ) ) != breeze for cell, ( breeze, stench ) in percepts.items() ):
+            continue
+        weight = PIT_WEIGHT ** len(layout) * CLEAR_WEIGHT ** ( len(unknown) - len(layout) )
+        total += weight
+        for cell in layout:
+            pits[cell] += weight
+
+    candidates = [ cell for cell in unknown
+                   if all ( ( cell in neighbors ( *visited ) ) == stench for visited, ( breeze, stench ) in percepts.items() ) ]
+
+    return ( { cell: pits[cell] / total for cell in cells },
+             { cell: ( 1 / len(candidates) if cell in candidates else 0 ) for cell in cells } )
+
+def checkKnowledge ( games, rng ):
+    check = Check()
+
+    def againstLayouts ( explorer ):
+        if rng.random() >= 0.3:
+            return
+        knowledge    = explorer.knowledge
+        pits, wumpus = bruteForce ( explorer.record.colDimension, explorer.record.rowDimension, explorer.percepts )
+        where        = "at " + str(( knowledge.x, knowledge.y )) + " after " + str(sorted ( explorer.percepts.items() ))
+        for cell in pits:
+            if knowledge.isSafe ( *cell ):
+                check.expect ( pits[cell] == 0 and wumpus[cell] == 0, "Knowledge says " + str(cell) + " is safe " + where )
+            if knowledge.isDeadly ( *cell ):
+                check.expect ( pits[cell] == 1 or wumpus[cell] == 1, "Knowledge says " + str(cell) + " is deadly " + where )
+
+    for i in range ( games // 4 ):
+        record = smallWorld ( rng )
+        World ( agent=Explorer ( record, rng, False, againstLayouts ), record=record ).run()
+
+    for i in range ( games // 4 ):
+        record = randomWorld ( rng, 9, offBoard = False )
+        record.wumpus = [ cell for cell in record.wumpus if cell != ( 0, 0 ) ]
+        if record.wumpus:
+            world = World ( agent=Explorer ( record, rng, True, lambda explorer: againstWorld ( check, explorer, world ) ), record=record )
+            world.run()
+
+    return check
+
+def againstWorld ( check, explorer, world ):
+    knowledge  = explorer.knowledge
+    cols, rows = world.dimensions()
+    where      = "at " + str(( knowledge.x, knowledge.y )) + " on a " + str(cols) + "x" + str(rows) + " world"
+
+    for c in range ( cols ):
+        for r in range ( rows ):
+            tile = world.tile ( c, r )
+            if knowledge.isSafe ( c, r ):
+                check.expect ( not tile.pit and not tile.wumpus, "Knowledge says " + str(( c, r )) + " is safe " + where )
+            if knowledge.isDeadly ( c, r ):
+                check.expect ( tile.pit or tile.wumpus, "Knowledge says " + str(( c, r )) + " is deadly " + where )
+
+    wumpus = knowledge.wumpus()
+    if wumpus != None:
+        check.expect ( world.tile ( *wumpus ).wumpus, "Knowledge puts the wumpus in " + str(wumpus) + " " + where )
+    for cell in knowledge.frontier():
+        check.expect ( knowledge.isSafe ( *cell ) and not knowledge.isVisited ( *cell ),
+                       "Knowledge's frontier holds " + str(cell) + " " + where )
+
+CHECKS = [ ( "knowledge", checkKnowledge ) ]
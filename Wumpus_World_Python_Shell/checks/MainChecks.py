@@ -0,0 +1,277 @@
+# ======================================================================
+# FILE:        MainChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the options of Main.py. It runs Main.py
+#              on a packed corpus of random worlds with the scripted
+#              agent, and checks what it prints against the same games
+#              played with World and the oracle, and loads agents through
+#              Registry.py like -a does.
+# ======================================================================
+
+import os
+import sys
+import math
+import subprocess
+import tempfile
+
+from Common import Check, SOURCE, ScriptedAI, randomWorld, fields, worldText
+from World import World
+from Board import BOARDS
+from Corpus import Corpus, writeCorpus
+from Worlds import RandomWorlds
+from Oracle import bestScores
+import Registry
+import Main
+
+AGENT = "Conformance:ScriptedAI"
+
+def runMain ( args, agent = AGENT ):
+    # Runs Main.py; returns its exit status and what it printed. The
+    # checks folder is on its path, so the agent can be one of the
+    # checks' own.
+    environment = dict ( os.environ, PYTHONPATH = os.path.dirname ( os.path.abspath ( __file__ ) ) )
+    run = subprocess.run ( [ sys.executable, os.path.join ( SOURCE, "Main.py" ), "-a", agent ] + args,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=environment, universal_newlines=True )
+    return run.returncode, run.stdout
+
+def printed ( output, prefix ):
+    # Returns the rest of the line of output that starts with prefix,
+    # or None
+    for line in output.splitlines():
+        if line.startswith ( prefix ):
+            return line[len(prefix):]
+    return None
+
+def writeWorlds ( folder, rng, count, maxSize = 8 ):
+    # Writes a corpus of random worlds; returns its name and the score
+    # of every world with the scripted agent
+    records  = [ randomWorld ( rng, maxSize ) for i in range ( count ) ]
+    filename = os.path.join ( folder, "worlds.wwc" )
+    writeCorpus ( filename, [ ( "world_" + str(i), ) + fields ( record ) for i, record in enumerate ( records ) ] )
+    return filename, [ World ( agent=ScriptedAI(), record=record ).run() for record in records ]
+
+def checkJobs ( games, rng ):
+    # A folder of world files, and a corpus, score the same with any
+    # number of workers, and a folder with a broken world file prints
+    # the same too
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 4 )
+        worlds         = os.path.join ( folder, "worlds" )
+        os.mkdir ( worlds )
+        with Corpus ( corpus ) as packed:
+            for i in range ( len(packed) ):
+                with open ( os.path.join ( worlds, packed[i].name ), "w" ) as file:
+                    file.write ( worldText ( packed[i] ) )
+
+        average = sum ( scores ) / len(scores)
+        for source in ( worlds, corpus ):
+            for jobs in ( "1", "2", "4" ):
+                where  = os.path.basename ( source ) + ", -j " + jobs
+                status, output = runMain ( [ "-j", jobs, "-f", source ] )
+                played = printed ( output, "The agent's average score: " )
+                check.expect ( status == 0 and played != None and math.isclose ( float(played), average ),
+                               where + ": the average is " + str(played) + ", not " + str(average) )
+
+        with open ( os.path.join ( worlds, "broken.txt" ), "w" ) as file:
+            file.write ( "4\t4\n1\n" )
+        status, serial   = runMain ( [ "-f", worlds ] )
+        status, parallel = runMain ( [ "-j", "4", "-f", worlds ] )
+        check.expect ( parallel == serial, "with a broken world, -j 4 prints " + parallel[-200:] + " instead of " + serial[-200:] )
+
+    return check
+
+def checkRandomWorlds ( games, rng ):
+    # World i of a seeded stream is the same whichever order it is
+    # drawn in, is drawn like World's own random worlds, and -n with
+    # --seed plays the same worlds with any number of workers
+    check   = Check()
+    seed    = rng.randrange ( 1 << 32 )
+    count   = games // 2
+    stream  = RandomWorlds ( seed )
+    records = [ stream[i] for i in range ( count ) ]
+
+    order = list ( range ( count ) )
+    rng.shuffle ( order )
+    again = RandomWorlds ( seed )
+    check.expect ( all ( fields ( again[i] ) == fields ( records[i] ) for i in order ),
+                   "seed " + str(seed) + ": worlds drawn in another order differ" )
+    other = RandomWorlds ( seed + 1 )
+    check.expect ( [ fields ( record ) for record in records ] != [ fields ( other[i] ) for i in range ( count ) ],
+                   "seeds " + str(seed) + " and " + str(seed + 1) + " draw the same worlds" )
+
+    pits  = sum ( len(record.pits) for record in records )
+    cells = sum ( record.colDimension * record.rowDimension - 1 for record in records )
+    check.expect ( abs ( pits / cells - 0.2 ) < 0.05, "seed " + str(seed) + ": " + str(pits) + " pits in " + str(cells) + " cells" )
+    check.expect ( all ( ( 0, 0 ) not in list ( record.wumpus ) + list ( record.gold ) + list ( record.pits ) for record in records ),
+                   "seed " + str(seed) + ": a world has a feature on the start cell" )
+
+    average = sum ( World ( agent=ScriptedAI(), record=record ).run() for record in records ) / count
+    runs    = [ [], [ "-j", "3" ] ]
+    try:
+        import BatchWorld
+        runs.append ( [ "-b", "50" ] )
+    except ImportError:
+        pass
+
+    for options in runs:
+        where  = " ".join ( [ "-n", str(count), "--seed", str(seed) ] + options )
+        status, output = runMain ( options + [ "-n", str(count), "--seed", str(seed) ] )
+        played = printed ( output, "The agent's average score: " )
+        check.expect ( status == 0 and played != None and math.isclose ( float(played), average ),
+                       where + ": the average is " + str(played) + ", not " + str(average) )
+
+    return check
+
+def checkAdaptive ( games, rng ):
+    # Adaptive runs print the same with one worker and many, and every
+    # round of a parallel run shares the same workers, so a traced run
+    # writes one trace file per worker. There are enough worlds for
+    # three rounds of 3 workers, and the tolerance is too small to stop
+    # early, so both runs play the same worlds.
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, 800, 4 )
+        average        = sum ( scores ) / len(scores)
+        runs           = ( [ "--budget", str(len(scores)) ], [ "--budget", str(len(scores) // 2) ], [ "--tolerance", "0.1" ] )
+
+        for number, options in enumerate ( runs ):
+            where  = " ".join ( options )
+            status, serial = runMain ( options + [ "--seed", "7", "-f", corpus ] )
+            check.expect ( status == 0 and printed ( serial, "The agent's average score: " ) != None,
+                           where + ": Main.py prints no average: " + serial[-200:] )
+
+            traces = os.path.join ( folder, "traces_" + str(number) )
+            os.mkdir ( traces )
+            status, parallel = runMain ( options + [ "--seed", "7", "-j", "3", "-x", traces, "-f", corpus ] )
+            check.expect ( parallel == serial, where + ": -j 3 prints " + parallel[-200:] + " instead of " + serial[-200:] )
+            check.expect ( len(os.listdir ( traces )) == 3,
+                           where + ": -j 3 writes " + str(len(os.listdir ( traces ))) + " trace files, not one per worker" )
+
+            if number == 0:
+                played = float ( printed ( serial, "The agent's average score: " ) or "nan" )
+                check.expect ( math.isclose ( played, average ),
+                               where + ": the average is " + str(played) + ", not " + str(average) )
+
+    return check
+
+def checkBoardOption ( games, rng ):
+    # Every --board prints the same as the default, with one worker and
+    # two, and runFolder keeps the worlds in the board it is given
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 4 )
+        status, plain  = runMain ( [ "-f", corpus ] )
+
+        for name, board in sorted ( BOARDS.items() ):
+            for jobs in ( "1", "2" ):
+                status, output = runMain ( [ "--board", name, "-j", jobs, "-f", corpus ] )
+                check.expect ( status == 0 and output == plain,
+                               "--board " + name + " -j " + jobs + " prints " + output[-200:] + " instead of " + plain[-200:] )
+
+            # A board of the named class that counts the worlds it is
+            # cleared for; the first one is added to it new
+            class CountingBoard ( board ):
+                worlds = 0
+
+                def clear ( self, colDimension, rowDimension ):
+                    CountingBoard.worlds += 1
+                    super().clear ( colDimension, rowDimension )
+
+            results = Main.runFolder ( corpus, range ( len(scores) ), 1, False, False, False, False, False, agent=AGENT, board=CountingBoard )
+            check.expect ( results != None and results[:2] == ( len(scores), sum ( scores ) ) and CountingBoard.worlds == len(scores) - 1,
+                           name + ": runFolder doesn't play the worlds on the board it is given" )
+
+        status, output = runMain ( [ "--board", "huge", "-f", corpus ] )
+        check.expect ( output.startswith ( "Wumpus_World [Options]" ), "--board huge doesn't print the help" )
+
+    return check
+
+def checkAgents ( games, rng ):
+    # Agents load by name and by module:Class, a bad name raises
+    # ImportError and is reported by -a, and a run only imports the
+    # agent it plays
+    check = Check()
+
+    check.expect ( Registry.loadAgent ( AGENT ) is ScriptedAI, AGENT + " doesn't load the scripted agent" )
+    Registry.registerAgent ( "Scripted", AGENT )
+    check.expect ( Registry.loadAgent ( "Scripted" ) is ScriptedAI, "a registered name doesn't load its agent" )
+    check.expect ( Registry.loadAgent ( "RandomAI" ).__name__ == "RandomAI", "RandomAI doesn't load RandomAI.py's agent" )
+
+    for name in ( "Conformance", ":ScriptedAI", "Conformance:NoSuchAI", "NoSuchModule:NoSuchAI" ):
+        try:
+            Registry.loadAgent ( name )
+            check.expect ( False, repr(name) + " loads an agent" )
+        except ImportError:
+            pass
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 4 )
+        average        = sum ( scores ) / len(scores)
+
+        status, output = runMain ( [ "-f", corpus ] )
+        played = printed ( output, "The agent's average score: " )
+        check.expect ( status == 0 and played != None and math.isclose ( float(played), average ),
+                       "-a " + AGENT + ": the average is " + str(played) + ", not " + str(average) )
+
+        status, output = runMain ( [ "-f", corpus ], "Conformance:NoSuchAI" )
+        check.expect ( printed ( output, "[ERROR] Failed to load agent" ) != None and printed ( output, "The agent's average score: " ) == None,
+                       "-a Conformance:NoSuchAI prints " + output[-200:] )
+
+    # Which of the shell's agents a run imports
+    for options, expected in ( ( [ "-r" ], "['RandomAI']" ), ( [ "-a", AGENT ], "[]" ) ):
+        script = "import sys; sys.argv = " + repr ( [ "Main.py" ] + options + [ "-n", "3" ] ) + "; import Main; Main.main(); " + \
+                 "print ( [ name for name in ( 'MyAI', 'RandomAI', 'ManualAI' ) if name in sys.modules ] )"
+        run    = subprocess.run ( [ sys.executable, "-c", script ], cwd=SOURCE, stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, universal_newlines=True )
+        lines  = run.stdout.splitlines()
+        check.expect ( lines != [] and lines[-1] == expected,
+                       " ".join ( options ) + " imports " + ( lines[-1] if lines != [] else "nothing" ) + ", not " + expected )
+
+    return check
+
+def checkOracleOption ( games, rng ):
+    # --oracle prints the average of the oracle's scores, and the gap to
+    # them, with one worker and many, from a new cache and a filled one
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 4 )
+        average        = sum ( scores ) / len(scores)
+        with Corpus ( corpus ) as packed:
+            best = [ bestScores ( packed[i] ) for i in range ( len(packed) ) ]
+        full = sum ( score[0] for score in best ) / len(best)
+        safe = sum ( score[1] for score in best ) / len(best)
+
+        cache = os.path.join ( folder, "oracle.db" )
+        for jobs in ( "1", "3", "1" ):
+            where  = "--oracle -j " + jobs + ( ", cached" if os.path.exists ( cache ) else "" )
+            status, output = runMain ( [ "--oracle", cache, "-j", jobs, "-f", corpus ] )
+            achievable = printed ( output, "The achievable average score: " )
+            gap        = printed ( output, "The agent's gap to the achievable score: " )
+            expected   = str(full) + " with full knowledge, " + str(safe) + " with safe exploration"
+            check.expect ( status == 0 and achievable != None and
+                           [ float ( part.split()[0] ) for part in achievable.split ( ", " ) ] == [ full, safe ],
+                           where + ": the achievable average is " + str(achievable) + ", not " + expected )
+            check.expect ( gap != None and math.isclose ( float ( gap.split()[0] ), full - average ),
+                           where + ": the gap is " + str(gap) + ", not " + str(full - average) )
+
+        outputFile     = os.path.join ( folder, "results.txt" )
+        status, output = runMain ( [ "--oracle", cache, "-f", corpus, outputFile ] )
+        with open ( outputFile ) as file:
+            written = file.read().splitlines()
+        check.expect ( "ORACLE: " + str(full) + " " + str(safe) in written,
+                       "the output file holds " + str(written) + ", not ORACLE: " + str(full) + " " + str(safe) )
+
+        status, output = runMain ( [ "--oracle", cache, "-n", "3" ] )
+        check.expect ( printed ( output, "[WARNING] --oracle only works" ) != None and printed ( output, "The achievable" ) == None,
+                       "--oracle with -n prints " + output[-200:] )
+
+    return check
+
+CHECKS = [ ( "jobs", checkJobs ), ( "seeded", checkRandomWorlds ), ( "adaptive", checkAdaptive ), ( "board", checkBoardOption ), ( "agents", checkAgents ), ( "achievable", checkOracleOption ) ]
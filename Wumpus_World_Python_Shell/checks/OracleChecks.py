@@ -0,0 +1,64 @@
+# ======================================================================
+# FILE:        OracleChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the scores of Oracle.py. The full score
+#              of a random world has to match a shortest path search over
+#              the World's own snapshots, and the safe score can never be
+#              above the full score.
+# ======================================================================
+
+import heapq
+import itertools
+from Common import Check, ACTIONS, ScriptedAI, randomWorld
+from Agent import Agent
+from World import World
+from Oracle import bestScores
+
+def searchBest ( record ):
+    # The best score of a world with full knowledge, by a shortest path
+    # search over the World's own snapshots; climbing out with nothing
+    # scores -1
+    world   = World ( agent=ScriptedAI(), record=record )
+    order   = itertools.count()
+    queue   = [ ( 0, next ( order ), world.snapshot() ) ]
+    visited = set()
+
+    while queue:
+        cost, _, snapshot = heapq.heappop ( queue )
+        world.restore ( snapshot )
+
+        # The state without the score, the last action and the percepts
+        key = repr ( snapshot[1:6] + snapshot[9:] )
+        if key in visited:
+            continue
+        visited.add ( key )
+
+        state = world.state()
+        if state["goldLooted"] and ( state["agentX"], state["agentY"] ) == ( 0, 0 ):
+            return max ( -1, 1000 - cost - 1 )
+
+        for action in ACTIONS:
+            if action == Agent.Action.CLIMB:
+                continue
+            world.restore ( snapshot )
+            percepts, change, done = world.step ( action )
+            if not done:
+                heapq.heappush ( queue, ( cost - change, next ( order ), world.snapshot() ) )
+
+    return -1
+
+def checkOracle ( games, rng ):
+    check = Check()
+
+    for i in range ( games // 4 ):
+        record = randomWorld ( rng, 5 )
+        full, safe = bestScores ( record )
+        best = searchBest ( record )
+        check.expect ( full == best and safe <= full,
+                       "world " + str(i) + ": Oracle scores " + str(( full, safe )) + ", search finds " + str(best) )
+
+    return check
+
+CHECKS = [ ( "oracle", checkOracle ) ]
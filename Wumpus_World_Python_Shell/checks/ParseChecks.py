@@ -0,0 +1,35 @@
+# ======================================================================
+# FILE:        ParseChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the world file parser of Worlds.py. A
+#              random world written with "\n" or "\r\n" newlines, as
+#              str or bytes, has to parse back to the same world, and a
+#              World built from the file has to play the same game as
+#              one built from the record.
+# ======================================================================
+
+from Common import Check, ScriptedAI, randomWorld, worldText, fields, play, WorldFile
+from World import World
+from Worlds import parseWorld
+
+def checkParse ( games, rng ):
+    check = Check()
+
+    for i in range ( games ):
+        record = randomWorld ( rng, 12 )
+
+        for newline in ( "\n", "\r\n" ):
+            text = worldText ( record, newline )
+            for source in ( text, text.encode() ):
+                check.expect ( fields ( parseWorld ( source ) ) == fields ( record ),
+                               "world " + str(i) + " parses differently as " + repr(source[:12]) )
+
+        fromFile = play ( World ( agent=ScriptedAI(), file=WorldFile ( worldText ( record, "\r\n" ) ) ), i )
+        check.expect ( fromFile == play ( World ( agent=ScriptedAI(), record=record ), i ),
+                       "world " + str(i) + " plays differently from its world file" )
+
+    return check
+
+CHECKS = [ ( "parse", checkParse ) ]
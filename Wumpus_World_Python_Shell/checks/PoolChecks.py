@@ -0,0 +1,61 @@
+# ======================================================================
+# FILE:        PoolChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks World.reset() with a new world, the way
+#              a folder run reuses one World. It resets a World onto
+#              random worlds, given a new agent or keeping its own, and
+#              compares it, and the game played after, with a new World.
+#
+# NOTES:       - An agent is only reused when its class sets reusable;
+#                StaleAI has a reset() that forgets nothing, so a World
+#                that called it instead of building a new agent would
+#                play a different game.
+# ======================================================================
+
+import itertools
+
+from Common import Check, BOARDS, ScriptedAI, randomWorld, grid, play
+from World import World
+
+class ResettingAI ( ScriptedAI ):
+
+    # The scripted agent, reused by World.reset() through its reset()
+
+    reusable = True
+
+    def reset ( self ):
+        ScriptedAI.__init__ ( self )
+
+class StaleAI ( ScriptedAI ):
+
+    # The scripted agent, with a reset() but no reusable
+
+    def reset ( self ):
+        pass
+
+def checkPool ( games, rng ):
+    check  = Check()
+    worlds = [ randomWorld ( rng, 12 ) for i in range ( games // 4 ) ]
+
+    for board, turbo, agentClass in itertools.product ( BOARDS, ( True, False ), ( ScriptedAI, ResettingAI, StaleAI ) ):
+        pool = World ( agent=agentClass(), record=worlds[0], board=board, turbo=turbo )
+        pool.run()
+
+        for i, record in enumerate ( worlds ):
+            fresh = World ( agent=agentClass(), record=record, board=board, turbo=turbo )
+            if rng.random() < 0.5:
+                percepts = pool.reset ( record )
+            else:
+                percepts = pool.reset ( record, agentClass() )
+
+            where = board.__name__ + ", " + agentClass.__name__ + ", world " + str(i)
+            check.expect ( percepts == fresh.percepts() and pool.state() == fresh.state() and grid ( pool ) == grid ( fresh ),
+                           where + ": reset doesn't match a new World" )
+            check.expect ( play ( pool, i ) == play ( fresh, i ),
+                           where + ": game after reset doesn't match a new World" )
+
+    return check
+
+CHECKS = [ ( "pool", checkPool ) ]
@@ -0,0 +1,47 @@
+# ======================================================================
+# FILE:        ProbabilityChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the chances of Probability.py. The
+#              explorer of KnowledgeChecks.py walks small random worlds,
+#              updating a Probability after every percept, and the chance
+#              of a pit and of the wumpus in every cell is checked
+#              against a brute force count of every layout that fits the
+#              percepts.
+# ======================================================================
+
+from Common import Check
+from World import World
+from Probability import Probability
+from KnowledgeChecks import Explorer, smallWorld, bruteForce
+
+def checkProbability ( games, rng ):
+    check = Check()
+
+    for i in range ( games // 4 ):
+        record = smallWorld ( rng )
+        odds   = []
+
+        def againstLayouts ( explorer ):
+            # The Probability is built on the explorer's knowledge base,
+            # and updated after every percept, as an agent would
+            if not odds:
+                odds.append ( Probability ( explorer.knowledge, record.colDimension, record.rowDimension ) )
+            odds[0].update()
+            if rng.random() >= 0.3:
+                return
+
+            pits, wumpus = bruteForce ( record.colDimension, record.rowDimension, explorer.percepts )
+            where        = "after " + str(sorted ( explorer.percepts.items() ))
+            for cell in pits:
+                found = ( odds[0].pit ( *cell ), odds[0].wumpus ( *cell ) )
+                check.expect ( abs ( found[0] - pits[cell] ) < 1e-9 and abs ( found[1] - wumpus[cell] ) < 1e-9,
+                               "the chances of " + str(cell) + " are " + str(found) + ", not " +
+                               str(( pits[cell], wumpus[cell] )) + " " + where )
+
+        World ( agent=Explorer ( record, rng, False, againstLayouts ), record=record ).run()
+
+    return check
+
+CHECKS = [ ( "probability", checkProbability ) ]
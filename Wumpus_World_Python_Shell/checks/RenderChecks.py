@@ -0,0 +1,106 @@
+# ======================================================================
+# FILE:        RenderChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the debug renderer. It walks random
+#              worlds with step(), restore() and reset(), drawing every
+#              step with one Renderer, and compares every frame with one
+#              drawn by a new Renderer, which has nothing cached, and
+#              every viewport with the same cells cut out of a frame of
+#              the whole board. It also checks which steps --every and
+#              --events draw.
+# ======================================================================
+
+import io
+
+from Common import Check, ACTIONS, ScriptedAI, randomWorld
+from World import World
+from Render import Renderer, CELL
+
+def frame ( world, viewport, renderer = None ):
+    # Returns the text of a frame, drawn by renderer or a new Renderer
+    out = io.StringIO()
+    if renderer == None:
+        renderer = Renderer ( viewport = viewport, out = out )
+    else:
+        renderer._Renderer__out = out
+    renderer.draw ( world )
+    return out.getvalue()
+
+def cutFrame ( full, viewport ):
+    # Returns the board of a full frame, cut to the columns and rows a
+    # viewport frame says it shows
+    header = viewport.split ( "\n" )[0]
+    columns, rows = header[len("Viewport: columns "):].split ( ", rows " )
+    c0, c1 = [ int(number) for number in columns.split ( "-" ) ]
+    r0, r1 = [ int(number) for number in rows.split ( "-" ) ]
+
+    board = full.split ( "\n\n" )
+    last  = len(board) - 2
+    return [ board[last - r][c0 * CELL : (c1 + 1) * CELL] for r in range ( r1, r0 - 1, -1 ) ]
+
+def checkRender ( games, rng ):
+    check = Check()
+
+    for i in range ( games // 10 ):
+        records   = [ randomWorld ( rng, 12 ) for j in range ( 3 ) ]
+        viewport  = rng.choice ( ( 0, 1, 2, 3 ) )
+        renderer  = Renderer ( viewport = viewport )
+        world     = World ( agent=ScriptedAI(), record=records[0], renderer=renderer )
+        snapshots = [ world.snapshot() ]
+
+        for step in range ( 40 ):
+            roll = rng.random()
+            if roll < 0.1:
+                world.restore ( rng.choice ( snapshots ) )
+            elif roll < 0.15:
+                world.reset ( rng.choice ( records ), ScriptedAI() )
+            else:
+                world.step ( rng.choice ( ACTIONS[:5] ) )
+            if rng.random() < 0.2:
+                snapshots.append ( world.snapshot() )
+
+            where = "world " + str(i) + ", step " + str(step) + ", viewport " + str(viewport)
+            drawn = frame ( world, viewport, renderer )
+            check.expect ( drawn == frame ( world, viewport ), where + ": the frame differs from a new Renderer's" )
+
+            if viewport > 0:
+                board = drawn.split ( "\n\n" )
+                shown = [ board[0].split ( "\n" )[1] ] + board[1:-1]
+                check.expect ( shown == cutFrame ( frame ( world, 0 ), drawn ),
+                               where + ": the viewport differs from the cells of the whole board" )
+
+    return check
+
+def checkFrames ( games, rng ):
+    # --every draws every Nth step, and --events the steps where the
+    # gold is grabbed or the wumpus screams, and every Nth with --every
+    check = Check()
+
+    for i in range ( games // 4 ):
+        every    = rng.randint ( 1, 5 )
+        events   = rng.random() < 0.5
+        renderer = Renderer ( every, events )
+        world    = World ( agent=ScriptedAI(), record=randomWorld ( rng, 6 ) )
+        gold     = False
+
+        for step in range ( 30 ):
+            wanted = renderer.wants ( world )
+            state  = world.state()
+            event  = state["scream"] or state["goldLooted"] != gold
+            gold   = state["goldLooted"]
+            if step == 0:
+                expected = True
+            elif events:
+                expected = event or ( every > 1 and step % every == 0 )
+            else:
+                expected = step % every == 0
+            check.expect ( wanted == expected, "every " + str(every) + ", events " + str(events) + ", step " + str(step) +
+                           ": the step is " + ( "" if wanted else "not " ) + "drawn" )
+
+            world.step ( rng.choice ( ACTIONS[:6] ) )
+
+    return check
+
+CHECKS = [ ( "render", checkRender ), ( "frames", checkFrames ) ]
@@ -0,0 +1,116 @@
+# ======================================================================
+# FILE:        ResultsChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the per-world results. It checks the
+#              online statistics, merged from many parts, against the
+#              exact mean, deviation and percentiles of random scores,
+#              and the rows and summary Main.py -o writes, as CSV and
+#              as JSON Lines, with one worker and many, against the same
+#              games played with World.
+# ======================================================================
+
+import os
+import csv
+import json
+import math
+import statistics
+import tempfile
+
+from Common import Check, ScriptedAI, randomWorld
+from World import World
+from Corpus import Corpus
+from Results import OnlineStats, ResultStats
+from MainChecks import runMain, writeWorlds
+
+def checkStats ( games, rng ):
+    check = Check()
+
+    for i in range ( games // 4 ):
+        values = [ rng.randint ( -1100, 1000 ) for j in range ( rng.randint ( 1, 300 ) ) ]
+        total  = OnlineStats()
+        start  = 0
+        while start < len(values):
+            # Parts of any size, some of them empty
+            part = OnlineStats()
+            end  = start + rng.randint ( 0, 50 )
+            for value in values[start:end]:
+                part.add ( value )
+            total.merge ( part )
+            start = end
+
+        summary = total.summary()
+        ordered = sorted ( values )
+        exact   = { "p" + str(p): ordered[max ( 1, math.ceil ( p / 100 * len(values) ) ) - 1] for p in ( 5, 50, 95 ) }
+        check.expect ( summary["count"] == len(values) and summary["min"] == ordered[0] and summary["max"] == ordered[-1] and
+                       all ( summary[name] == value for name, value in exact.items() ),
+                       "scores " + str(i) + ": the count, min, max or percentiles are wrong" )
+        check.expect ( math.isclose ( summary["mean"], statistics.mean ( values ), abs_tol=1e-6 ) and
+                       math.isclose ( summary["stdev"], statistics.pstdev ( values ), rel_tol=1e-9, abs_tol=1e-6 ),
+                       "scores " + str(i) + ": the mean or deviation is wrong" )
+
+    return check
+
+def readRows ( filename ):
+    # Returns the rows of a results file, by world, as (score, steps,
+    # outcome, gold), and the summary of a JSON Lines file
+    rows    = {}
+    summary = None
+    with open ( filename, newline="" ) as file:
+        if filename.endswith ( ".csv" ):
+            for row in csv.DictReader ( file ):
+                rows[row["world"]] = ( int(row["score"]), int(row["steps"]), row["outcome"], bool(int(row["gold"])) )
+        else:
+            for line in file:
+                row = json.loads ( line )
+                if "summary" in row:
+                    summary = row["summary"]
+                else:
+                    rows[row["world"]] = ( row["score"], row["steps"], row["outcome"], row["gold"] )
+    return rows, summary
+
+def sameSummary ( one, other ):
+    # Compares two summaries, with the means and deviations, which
+    # depend on the order the scores are merged in, to within rounding
+    if isinstance ( one, dict ) and isinstance ( other, dict ):
+        return one.keys() == other.keys() and all ( sameSummary ( one[key], other[key] ) for key in one )
+    if isinstance ( one, float ) and isinstance ( other, float ):
+        return math.isclose ( one, other, rel_tol=1e-9, abs_tol=1e-9 )
+    return one == other
+
+def checkResultsFile ( games, rng ):
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 4 )
+
+        expected = {}
+        stats    = ResultStats()
+        with Corpus ( corpus ) as worlds:
+            for i in range ( len(worlds) ):
+                record = worlds[i]
+                world  = World ( agent=ScriptedAI(), record=record )
+                score  = world.run()
+                state  = world.state()
+                expected[record.name] = ( score, state["steps"], world.outcome(), state["goldLooted"] )
+                stats.add ( score, state["steps"], world.outcome(), state["goldLooted"] )
+
+        for name in ( "results.csv", "results.jsonl" ):
+            for jobs in ( "1", "3" ):
+                where    = name + ", -j " + jobs
+                filename = os.path.join ( folder, jobs + "_" + name )
+                status, output = runMain ( [ "-j", jobs, "-o", filename, "-f", corpus ] )
+                check.expect ( status == 0 and os.path.isfile ( filename ), where + ": Main.py -o writes no file: " + output[-200:] )
+                if status != 0 or not os.path.isfile ( filename ):
+                    continue
+
+                rows, summary = readRows ( filename )
+                check.expect ( rows == expected, where + ": the rows differ from the games played with World" )
+                if name.endswith ( ".jsonl" ):
+                    check.expect ( sameSummary ( summary, json.loads ( json.dumps ( stats.summary() ) ) ),
+                                   where + ": the summary differs from the games played with World" )
+
+    return check
+
+CHECKS = [ ( "stats", checkStats ), ( "results", checkResultsFile ) ]
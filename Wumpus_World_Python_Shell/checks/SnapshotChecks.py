@@ -0,0 +1,54 @@
+# ======================================================================
+# FILE:        SnapshotChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks World.snapshot(), restore() and reset().
+#              It walks random worlds with step(), restoring earlier
+#              snapshots and resetting at random, and compares every
+#              step with a new World that plays the same moves from the
+#              start.
+# ======================================================================
+
+from Common import Check, BOARDS, ACTIONS, ScriptedAI, randomWorld, grid
+from World import World
+
+def checkSnapshot ( games, rng ):
+    check = Check()
+
+    for i in range ( games // 4 ):
+        record = randomWorld ( rng, 6 )
+        board  = BOARDS[i % len(BOARDS)]
+        world  = World ( agent=ScriptedAI(), record=record, board=board )
+
+        # The moves since the start of the game, at every snapshot
+        paths     = [ [] ]
+        snapshots = [ world.snapshot() ]
+        path      = []
+
+        for step in range ( 60 ):
+            if rng.random() < 0.2:
+                j = rng.randrange ( len(snapshots) )
+                world.restore ( snapshots[j] )
+                path = list ( paths[j] )
+
+            action = rng.choice ( ACTIONS if rng.random() < 0.05 else ACTIONS[:5] )
+            result = world.step ( action )
+            path.append ( action )
+
+            fresh = World ( agent=ScriptedAI(), record=record, board=board )
+            for move in path:
+                expected = fresh.step ( move )
+
+            check.expect ( result == expected and world.state() == fresh.state() and grid ( world ) == grid ( fresh ),
+                           board.__name__ + ", world " + str(i) + ": differs after " + str(len(path)) + " moves" )
+
+            if result[2]:
+                world.reset()
+                path = []
+            snapshots.append ( world.snapshot() )
+            paths.append ( list ( path ) )
+
+    return check
+
+CHECKS = [ ( "snapshot", checkSnapshot ) ]
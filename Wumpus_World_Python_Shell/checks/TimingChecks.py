@@ -0,0 +1,114 @@
+# ======================================================================
+# FILE:        TimingChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the step timer. It checks the latency
+#              histogram against the exact mean, max and percentiles of
+#              random latencies, times games with World and with
+#              Main.py -t and checks that every step is counted, and
+#              does the same with the clock of Pythons older than 3.7.
+# ======================================================================
+
+import os
+import math
+import json
+import time
+import tempfile
+import importlib
+
+from Common import Check, ScriptedAI, randomWorld
+from World import World
+import Timing
+from MainChecks import runMain, writeWorlds
+
+def checkHistogram ( games, rng ):
+    # Percentiles are the upper bound of a bucket, so they are never
+    # below the exact one, nor more than 25% above it
+    check = Check()
+
+    for i in range ( games // 4 ):
+        values  = [ int ( 2 ** rng.uniform ( 0, 30 ) ) for j in range ( rng.randint ( 1, 200 ) ) ]
+        half    = len(values) // 2
+        first   = Timing.LatencyHistogram()
+        second  = Timing.LatencyHistogram()
+        for value in values[:half]:
+            first.record ( value )
+        for value in values[half:]:
+            second.record ( value )
+        first.merge ( second )
+
+        summary = first.summary()
+        check.expect ( summary["count"] == len(values) and summary["max_ns"] == max ( values ) and
+                       math.isclose ( summary["mean_ns"], sum ( values ) / len(values) ),
+                       "histogram " + str(i) + ": the count, max or mean is wrong" )
+
+        ordered = sorted ( values )
+        for p in ( 50, 99 ):
+            exact = ordered[max ( 0, math.ceil ( p / 100 * len(values) ) - 1 )]
+            got   = summary["p" + str(p) + "_ns"]
+            check.expect ( exact <= got <= exact * 1.25,
+                           "histogram " + str(i) + ": p" + str(p) + " is " + str(got) + ", not within 25% above " + str(exact) )
+
+    return check
+
+def timeGames ( check, games, rng, where ):
+    # Times games with World, and checks that every step is counted
+    total = Timing.StepTimer()
+    steps = 0
+
+    for i in range ( games // 4 ):
+        timer = Timing.StepTimer()
+        world = World ( agent=ScriptedAI(), record=randomWorld ( rng, 8 ), timer=timer )
+        world.run()
+        summary = timer.summary()
+        check.expect ( summary["agent"]["count"] == summary["engine"]["count"] == world.state()["steps"],
+                       where + ", world " + str(i) + ": the timer counts " + str(summary["agent"]["count"]) +
+                       " steps, not " + str(world.state()["steps"]) )
+        check.expect ( isinstance ( summary["agent"]["max_ns"], int ) and summary["engine"]["p50_ns"] >= 0,
+                       where + ", world " + str(i) + ": the latencies aren't whole nanoseconds" )
+        total.merge ( timer )
+        steps += world.state()["steps"]
+
+    check.expect ( total.agent.count == steps, where + ": merged timers count " + str(total.agent.count) + " steps, not " + str(steps) )
+
+def checkTiming ( games, rng ):
+    check = Check()
+    timeGames ( check, games, rng, "perf_counter_ns" )
+
+    # Without perf_counter_ns, as before Python 3.7, the clock falls
+    # back to perf_counter
+    if hasattr ( time, "perf_counter_ns" ):
+        saved = time.perf_counter_ns
+        del time.perf_counter_ns
+        try:
+            importlib.reload ( Timing )
+            check.expect ( Timing.clock is not saved and isinstance ( Timing.clock(), int ),
+                           "Timing.py doesn't fall back to perf_counter" )
+            timeGames ( check, games, rng, "perf_counter" )
+        finally:
+            time.perf_counter_ns = saved
+            importlib.reload ( Timing )
+
+    # Main.py -t writes every world's latencies, and all of them
+    with tempfile.TemporaryDirectory() as folder:
+        corpus, scores = writeWorlds ( folder, rng, games // 10 )
+        timingFile     = os.path.join ( folder, "timing.json" )
+        status, output = runMain ( [ "-t", timingFile, "-f", corpus ] )
+
+        try:
+            with open ( timingFile ) as file:
+                timing = json.load ( file )
+        except ( OSError, ValueError ):
+            timing = None
+
+        check.expect ( status == 0 and timing != None, "Main.py -t writes no timing file: " + output[-200:] )
+        if timing != None:
+            counts = [ world["agent"]["count"] for world in timing["worlds"] ]
+            check.expect ( len(counts) == len(scores) and timing["total"]["agent"]["count"] == sum ( counts ) and
+                           all ( world["agent"]["count"] == world["engine"]["count"] for world in timing["worlds"] ),
+                           "Main.py -t times " + str(len(counts)) + " worlds, or counts their steps differently" )
+
+    return check
+
+CHECKS = [ ( "histogram", checkHistogram ), ( "timing", checkTiming ) ]
@@ -0,0 +1,76 @@
+# ======================================================================
+# FILE:        TournamentChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks the tournament runner. It plays the
+#              scripted agent, with one and two worker processes, next
+#              to entrants that can't be loaded, and checks the scores
+#              against World, that the broken entrants are reported and
+#              the rest still play, and that the cache is only used for
+#              games played under the same time limits.
+# ======================================================================
+
+import os
+import tempfile
+
+from Common import Check, ScriptedAI, randomWorld, worldText
+from World import World
+import Tournament
+from Tournament import Entrant, runTournament, leaderboard
+
+ENTRANTS = {
+    "scripted.py": "from Conformance import ScriptedAI as MyAI\n",
+    "broken.py":   "class MyAI (:\n",
+    "nameless.py": "from Conformance import ScriptedAI\n"
+}
+
+def checkTournament ( games, rng ):
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        worlds = os.path.join ( folder, "worlds" )
+        os.mkdir ( worlds )
+
+        expected = {}
+        for i in range ( games // 10 ):
+            record = randomWorld ( rng, 8 )
+            name   = "world_" + str(i) + ".txt"
+            with open ( os.path.join ( worlds, name ), "w" ) as file:
+                file.write ( worldText ( record ) )
+            expected[name] = World ( agent=ScriptedAI(), record=record ).run()
+
+        for name, source in ENTRANTS.items():
+            with open ( os.path.join ( folder, name ), "w" ) as file:
+                file.write ( source )
+        entrants = [ Entrant ( os.path.join ( folder, name ) ) for name in sorted ( ENTRANTS ) ]
+        scripted = [ entrant for entrant in entrants if entrant.name == "scripted.py" ][0]
+
+        runs = [
+            # jobs, cache, move limit, games played
+            ( 2, "first.db",  0,  len(expected) ),
+            ( 1, "first.db",  0,  0 ),
+            ( 2, "first.db",  60, len(expected) ),
+            ( 1, "first.db",  60, 0 ),
+            ( 1, "second.db", 60, len(expected) )
+        ]
+
+        for jobs, cache, moveLimit, played in runs:
+            # Every run loads the agents again, like a new process
+            Tournament.loadedAgents.clear()
+            where = "-j " + str(jobs) + ", move limit " + str(moveLimit) + ", " + cache
+
+            found, scores, count, failed = runTournament ( worlds, entrants, jobs, os.path.join ( folder, cache ), moveLimit )
+            check.expect ( count == played, where + ": played " + str(count) + " games, not " + str(played) )
+            check.expect ( sorted ( failed ) == sorted ( entrant.digest for entrant in entrants if entrant is not scripted ),
+                           where + ": the failed entrants are " + str(len(failed)) + ", not the broken and nameless ones" )
+            check.expect ( { name: scores[scripted.digest, digest] for key, name, digest in found } == expected,
+                           where + ": the scripted agent scores differently than with World" )
+
+            board = leaderboard ( entrants, found, scores, failed )
+            check.expect ( [ row[0] for row in board ] == [ "scripted.py" ],
+                           where + ": the leaderboard lists " + str([ row[0] for row in board ]) )
+
+    return check
+
+CHECKS = [ ( "tournament", checkTournament ) ]
@@ -0,0 +1,102 @@
+# ======================================================================
+# FILE:        TraceChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks episode traces. It records games, some
+#              of them forfeited and some with moves that aren't
+#              actions, with TraceRecorder, and checks that every
+#              episode replays to the same percepts and score, and that
+#              seeking to any step gives the same World as a fresh
+#              replay. It also records a run of Main.py with -x, and
+#              replays its traces the same way.
+# ======================================================================
+
+import os
+import sys
+import subprocess
+import tempfile
+
+from Common import Check, SOURCE, ScriptedAI, InvalidAI, randomWorld, grid, worldText
+from World import World
+from Budget import Forfeit
+from Trace import TraceRecorder, TraceFile, Replay
+
+class ForfeitingAI ( InvalidAI ):
+
+    # The invalid agent, running out of time on a move now and then
+
+    def __init__ ( self, rng ):
+        super().__init__()
+        self.__rng = rng
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        if self.__rng.random() < 0.01:
+            raise Forfeit()
+        return super().getAction ( stench, breeze, glitter, bump, scream )
+
+def checkReplays ( check, filename, scores ):
+    # Checks the episodes of a trace file against the scores of the
+    # games, by world name, and replays each
+    with TraceFile ( filename ) as traces:
+        check.expect ( { episode.name: episode.score for episode in traces.episodes } == scores and len(traces.episodes) == len(scores),
+                       "the trace holds " + str(len(traces.episodes)) + " episodes, or different scores" )
+
+        for number, episode in enumerate ( traces.episodes ):
+            check.expect ( Replay ( episode ).verify(), episode.name + " doesn't replay to its percepts and score" )
+
+            replay = Replay ( episode )
+            for step in ( number % ( episode.steps + 1 ), episode.steps // 2, 0, episode.steps ):
+                world = replay.seek ( step )
+                fresh = Replay ( episode ).seek ( step )
+                check.expect ( world.state() == fresh.state() and grid ( world ) == grid ( fresh ),
+                               episode.name + ": seeking to step " + str(step) + " differs from a fresh replay" )
+
+def checkTraces ( games, rng ):
+    check = Check()
+
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join ( folder, "traces.wwt" )
+        recorder = TraceRecorder ( filename )
+        scores   = {}
+        for i in range ( games // 2 ):
+            recorder.label = "world_" + str(i)
+            world = World ( agent=ForfeitingAI ( rng ), record=randomWorld ( rng, 12 ), recorder=recorder )
+            scores[recorder.label] = world.run()
+        recorder.close()
+
+        checkReplays ( check, filename, scores )
+
+    return check
+
+def checkRecordedRun ( games, rng ):
+    # Runs Main.py -x on a folder of worlds with the invalid agent, and
+    # checks its traces against the same games played here
+    check   = Check()
+    records = [ randomWorld ( rng, 8 ) for i in range ( games // 10 ) ]
+
+    with tempfile.TemporaryDirectory() as folder:
+        worlds = os.path.join ( folder, "worlds" )
+        traces = os.path.join ( folder, "traces" )
+        os.mkdir ( worlds )
+        os.mkdir ( traces )
+        scores = {}
+        for i, record in enumerate ( records ):
+            name = "world_" + str(i) + ".txt"
+            with open ( os.path.join ( worlds, name ), "w" ) as file:
+                file.write ( worldText ( record ) )
+            scores[name] = World ( agent=InvalidAI(), record=record ).run()
+
+        environment = dict ( os.environ, PYTHONPATH = os.path.dirname ( os.path.abspath ( __file__ ) ) )
+        run = subprocess.run ( [ sys.executable, os.path.join ( SOURCE, "Main.py" ), "-a", "Common:InvalidAI", "-x", traces, "-f", worlds ],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=environment, universal_newlines=True )
+        check.expect ( run.returncode == 0, "Main.py -x exits with " + str(run.returncode) + ": " + run.stdout[-200:] )
+
+        files = os.listdir ( traces )
+        check.expect ( len(files) == 1, "Main.py -x writes " + str(len(files)) + " trace files, not 1" )
+        if len(files) == 1:
+            checkReplays ( check, os.path.join ( traces, files[0] ), scores )
+
+    return check
+
+CHECKS = [ ( "traces", checkTraces ), ( "recording", checkRecordedRun ) ]
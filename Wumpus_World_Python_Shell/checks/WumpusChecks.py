@@ -0,0 +1,72 @@
+# ======================================================================
+# FILE:        WumpusChecks.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file checks worlds with more than one wumpus. Arrows
+#              shot on every board have to kill exactly the wumpus a
+#              scan of the arrow's line finds, and world files have to
+#              read their extra wumpus, and reject anything else after
+#              the pits.
+# ======================================================================
+
+from Common import Check, BOARDS, randomWorld, worldText, fields
+from Worlds import parseWorld
+
+def inLine ( wumpus, c, r, direction ):
+    # Whether the arrow from (c, r) in the direction passes the cell
+    wc, wr = wumpus
+    return ( ( direction == 0 and wr == r and wc >= c ) or ( direction == 1 and wc == c and wr <= r ) or
+             ( direction == 2 and wr == r and wc <= c ) or ( direction == 3 and wc == c and wr >= r ) )
+
+def checkArrows ( games, rng ):
+    check = Check()
+
+    for i in range ( games ):
+        record     = randomWorld ( rng, 12 )
+        cols, rows = record.colDimension, record.rowDimension
+        c, r       = rng.randrange ( cols ), rng.randrange ( rows )
+        direction  = rng.randrange ( 4 )
+        living     = { cell for cell in record.wumpus if 0 <= cell[0] < cols and 0 <= cell[1] < rows }
+        hit        = { cell for cell in living if inLine ( cell, c, r, direction ) }
+
+        for boardClass in BOARDS:
+            board = boardClass ( cols, rows )
+            for cell in record.wumpus:
+                board.addWumpus ( *cell )
+
+            scream = board.shoot ( c, r, direction )
+            left   = { ( x, y ) for x in range ( cols ) for y in range ( rows ) if board.tile ( x, y ).wumpus }
+            check.expect ( scream == bool ( hit ) and left == living - hit,
+                           boardClass.__name__ + ", world " + str(i) + ": the arrow from " + str(( c, r, direction )) +
+                           " left " + str(sorted ( left )) + ", not " + str(sorted ( living - hit )) )
+
+    return check
+
+def checkWumpusFiles ( games, rng ):
+    check = Check()
+
+    for i in range ( games ):
+        record = randomWorld ( rng, 12 )
+        text   = worldText ( record )
+        check.expect ( fields ( parseWorld ( text ) ) == fields ( record ), "world " + str(i) + " reads its wumpus differently" )
+
+        # The extra wumpus section, cut short, run over, or followed by
+        # anything else
+        extra  = text if len(record.wumpus) > 1 else text + "0\n"
+        broken = [ extra + "1\n", extra + "0 0\n", text + str(len(record.wumpus)) + "\n" ]
+        if len(record.wumpus) > 1:
+            broken.append ( text.rsplit ( "\n", 2 )[0] + "\n" )
+        for source in broken:
+            check.expect ( raisesValueError ( source ), "world " + str(i) + " reads with trailing data: " + repr(source[-20:]) )
+
+    return check
+
+def raisesValueError ( text ):
+    try:
+        parseWorld ( text )
+    except ValueError:
+        return True
+    return False
+
+CHECKS = [ ( "arrows", checkArrows ), ( "wumpus", checkWumpusFiles ) ]
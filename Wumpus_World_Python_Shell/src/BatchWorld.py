@@ -0,0 +1,252 @@
+# ======================================================================
+# FILE:        BatchWorld.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the batch world class, which plays
+#              many worlds in lockstep. The boards, agent positions,
+#              directions, arrow and gold flags, and scores of every
+#              world are kept in NumPy arrays, and each step applies one
+#              action per world as array operations. The rules are the
+#              same as World.run(), so every world scores the same as it
+#              would on its own.
+#
+# NOTES:       - Requires NumPy. Only Main.py's -b option imports this
+#                file, so the rest of the shell runs without it.
+#
+#              - Worlds are given as open world files, or as records
+#                such as a WorldRecord from Corpus.py.
+#
+#              - Agents are still asked for their moves one at a time;
+#                only the engine work is vectorized.
+#
+#              - An action that isn't an Agent.Action costs a point and
+#                does nothing, as in World.run().
+#
+#              - It is only used with -b. Since World.run() plays in
+#                its turbo loop, one World at a time is faster on small
+#                boards, where the agents' moves take most of the time,
+#                and the batch engine only pulls ahead on boards of
+#                about 16x16 and up.
+# ======================================================================
+
+from Agent import Agent
+from Registry import loadAgent
+from Worlds import parseWorld
+import numpy as np
+
+class BatchWorld():
+
+    # Direction Tables (Right, Down, Left, Up)
+    __DX = np.array ( [ 1,  0, -1, 0 ], dtype=np.int64 )
+    __DY = np.array ( [ 0, -1,  0, 1 ], dtype=np.int64 )
+
+    # Action codes; anything else is 0, a move that does nothing
+    __CODES = { action: action.value for action in Agent.Action }
+
+    # ===============================================================
+    # =                 Constructor
+    # ===============================================================
+
+    def __init__ ( self, worlds, randomAI = False, agent = None ):
+        # agent is the name of an agent in the registry, or module:Class,
+        # which overrides randomAI
+        worlds = [ self.__readWorld ( world ) for world in worlds ]
+        size   = len(worlds)
+
+        agentClass    = loadAgent ( agent or ( "RandomAI" if randomAI else "MyAI" ) )
+        self.__agents = [ agentClass() for i in range(size) ]
+
+        # Boards are padded to the largest world in the batch
+        self.__colDimension = np.array ( [ w[0] for w in worlds ], dtype=np.int64 )
+        self.__rowDimension = np.array ( [ w[1] for w in worlds ], dtype=np.int64 )
+        cols = int(self.__colDimension.max()) if size else 1
+        rows = int(self.__rowDimension.max()) if size else 1
+
+        self.__pit    = np.zeros ( (size, cols, rows), dtype=bool )
+        self.__wumpus = np.zeros ( (size, cols, rows), dtype=bool )
+        self.__gold   = np.zeros ( (size, cols, rows), dtype=bool )
+
+        for i, (colDimension, rowDimension, wumpus, gold, pits) in enumerate(worlds):
+            for feature, cells in ( (self.__pit, pits), (self.__wumpus, wumpus), (self.__gold, gold) ):
+                for c, r in cells:
+                    if self.__isInBounds ( c, r, colDimension, rowDimension ):
+                        feature[i, c, r] = True
+
+        self.__breeze = self.__neighbors ( self.__pit )
+        self.__stench = self.__neighbors ( self.__wumpus )
+
+        # Column and row index of every tile, for the arrow line scan
+        self.__tileC = np.arange(cols).reshape ( 1, cols, 1 )
+        self.__tileR = np.arange(rows).reshape ( 1, 1, rows )
+
+        # Agent State
+        self.__goldLooted = np.zeros ( size, dtype=bool )
+        self.__hasArrow   = np.ones  ( size, dtype=bool )
+        self.__bump       = np.zeros ( size, dtype=bool )
+        self.__scream     = np.zeros ( size, dtype=bool )
+        self.__done       = np.zeros ( size, dtype=bool )
+        self.__climbed    = np.zeros ( size, dtype=bool )
+        self.__score      = np.zeros ( size, dtype=np.int64 )
+        self.__agentDir   = np.zeros ( size, dtype=np.int64 )
+        self.__agentX     = np.zeros ( size, dtype=np.int64 )
+        self.__agentY     = np.zeros ( size, dtype=np.int64 )
+
+    # ===============================================================
+    # =                 Engine Function
+    # ===============================================================
+
+    def run ( self ):
+        while True:
+            # A world stops once its score falls below -1000
+            self.__done |= self.__score < -1000
+            live = np.flatnonzero ( ~self.__done )
+            if live.size == 0:
+                break
+
+            x = self.__agentX[live]
+            y = self.__agentY[live]
+
+            # Get the moves
+            stench = self.__stench[live, x, y].tolist()
+            breeze = self.__breeze[live, x, y].tolist()
+            gold   = self.__gold  [live, x, y].tolist()
+            bump   = self.__bump  [live].tolist()
+            scream = self.__scream[live].tolist()
+            agents = self.__agents
+            codes  = self.__CODES
+
+            action = np.fromiter (
+                ( codes.get ( agents[i].getAction ( stench[k], breeze[k], gold[k], bump[k], scream[k] ), 0 )
+                  for k, i in enumerate(live.tolist()) ),
+                dtype=np.int64, count=live.size
+            )
+
+            # Make the moves
+            self.__score [live] -= 1
+            self.__bump  [live]  = False
+            self.__scream[live]  = False
+
+            self.__turn    ( live[action == Agent.Action.TURN_LEFT.value],  -1 )
+            self.__turn    ( live[action == Agent.Action.TURN_RIGHT.value],  1 )
+            self.__forward ( live[action == Agent.Action.FORWARD.value] )
+            self.__shoot   ( live[action == Agent.Action.SHOOT.value] )
+            self.__grab    ( live[action == Agent.Action.GRAB.value] )
+            self.__climb   ( live[action == Agent.Action.CLIMB.value] )
+
+        return self.__score.tolist()
+
+    def results ( self ):
+        # Returns a (score, steps, outcome, goldLooted) tuple for every
+        # world, after run(). Steps are worked out from the score like
+        # World.state() does, so the loop doesn't count them.
+        size = self.__score.size
+        died = self.__pit[np.arange(size), self.__agentX, self.__agentY] | \
+               self.__wumpus[np.arange(size), self.__agentX, self.__agentY]
+
+        steps = -self.__score - 10 * ~self.__hasArrow - 1000 * died + \
+                1000 * (self.__climbed & self.__goldLooted)
+
+        outcome = np.where ( died, "died", np.where ( self.__climbed, "climbed", "timeout" ) )
+        return list ( zip ( self.__score.tolist(), steps.tolist(), outcome.tolist(), self.__goldLooted.tolist() ) )
+
+    # ===============================================================
+    # =                 Action Functions
+    # ===============================================================
+
+    def __turn ( self, idx, step ):
+        self.__agentDir[idx] = (self.__agentDir[idx] + step) % 4
+
+    def __forward ( self, idx ):
+        if idx.size == 0:
+            return
+
+        direction = self.__agentDir[idx]
+        x = self.__agentX[idx] + self.__DX[direction]
+        y = self.__agentY[idx] + self.__DY[direction]
+
+        inBounds = (x >= 0) & (y >= 0) & (x < self.__colDimension[idx]) & (y < self.__rowDimension[idx])
+
+        self.__agentX[idx[inBounds]] = x[inBounds]
+        self.__agentY[idx[inBounds]] = y[inBounds]
+        self.__bump  [idx[~inBounds]] = True
+
+        x = self.__agentX[idx]
+        y = self.__agentY[idx]
+        dead = idx[self.__pit[idx, x, y] | self.__wumpus[idx, x, y]]
+
+        self.__score[dead] -= 1000
+        self.__done [dead]  = True
+
+    def __shoot ( self, idx ):
+        idx = idx[self.__hasArrow[idx]]
+        if idx.size == 0:
+            return
+
+        self.__hasArrow[idx] = False
+        self.__score   [idx] -= 10
+
+        # Every tile from the agent to the edge of the board, in the
+        # direction it faces, is in the arrow's path
+        direction = self.__agentDir[idx].reshape ( -1, 1, 1 )
+        x = self.__agentX[idx].reshape ( -1, 1, 1 )
+        y = self.__agentY[idx].reshape ( -1, 1, 1 )
+        c = self.__tileC
+        r = self.__tileR
+
+        path = ( ((direction == 0) & (c >= x) & (r == y))
+               | ((direction == 1) & (c == x) & (r <= y))
+               | ((direction == 2) & (c <= x) & (r == y))
+               | ((direction == 3) & (c == x) & (r >= y)) )
+
+        hit = path & self.__wumpus[idx]
+        self.__wumpus[idx] &= ~hit
+        self.__stench[idx] |=  hit
+        self.__scream[idx]  =  hit.any ( axis=(1, 2) )
+
+    def __grab ( self, idx ):
+        if idx.size == 0:
+            return
+
+        x = self.__agentX[idx]
+        y = self.__agentY[idx]
+        idx = idx[self.__gold[idx, x, y]]
+
+        self.__gold[idx, self.__agentX[idx], self.__agentY[idx]] = False
+        self.__goldLooted[idx] = True
+
+    def __climb ( self, idx ):
+        idx = idx[(self.__agentX[idx] == 0) & (self.__agentY[idx] == 0)]
+
+        self.__score  [idx[self.__goldLooted[idx]]] += 1000
+        self.__done   [idx] = True
+        self.__climbed[idx] = True
+
+    # ===============================================================
+    # =             World Generation Functions
+    # ===============================================================
+
+    @staticmethod
+    def __readWorld ( world ):
+        # Returns (colDimension, rowDimension, wumpus, gold, pits) for a
+        # record or an open world file
+        if hasattr ( world, "colDimension" ):
+            return world.colDimension, world.rowDimension, world.wumpus, world.gold, world.pits
+
+        record = parseWorld ( world.read() )
+        world.close()
+        return record.colDimension, record.rowDimension, record.wumpus, record.gold, record.pits
+
+    @staticmethod
+    def __neighbors ( feature ):
+        # Marks the four neighbors of every tile with the feature
+        result = np.zeros_like ( feature )
+        result[:, 1:,  :] |= feature[:, :-1,  :]
+        result[:, :-1, :] |= feature[:, 1:,   :]
+        result[:, :, 1: ] |= feature[:, :,  :-1]
+        result[:, :, :-1] |= feature[:, :,  1: ]
+        return result
+
+    @staticmethod
+    def __isInBounds ( c, r, colDimension, rowDimension ):
+        return c < colDimension and r < rowDimension and c >= 0 and r >= 0
@@ -0,0 +1,446 @@
+# ======================================================================
+# FILE:        Benchmark.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains benchmarks for the shell. It is run
+#              from the src folder:
+#
+#                   python3 Benchmark.py run [OutputFile] [-q]
+#                   python3 Benchmark.py compare BaselineFile NewFile [Tolerance]
+#                   python3 Benchmark.py boards
+#                   python3 Benchmark.py pool
+#
+#              - run times the shell on boards from 4x4 to 256x256:
+#
+#                   engine.random  World.run() with the RandomAI, in
+#                                  worlds/sec and steps/sec
+#                   engine.myai    World.run() with MyAI, in
+#                                  worlds/sec and steps/sec
+#                   parse          building a World from a world file,
+#                                  which parses it in __addFeatures
+#                   generate       world_generator.genWorld, writing
+#                                  the world file
+#                   render         one debug frame from
+#                                  World.printWorld
+#
+#                The results are printed, and saved as a JSON baseline
+#                if an OutputFile is given. -q runs each benchmark for
+#                a shorter time.
+#
+#              - compare reads two JSON files written by run, and flags
+#                every rate that dropped by more than Tolerance (a
+#                fraction, 0.10 by default). It exits with status 1 if
+#                there was a regression, so nightly runs can fail on it.
+#
+#              - boards compares the board classes from Board.py. For
+#                each board size it reports the memory used per world
+#                and the steps per second of World.run(), with the
+#                plain game loop and with the turbo loop.
+#
+#              - pool plays the same 4x4 world files the way a folder
+#                run did before, with a new World for every world, and
+#                with one World reset for every world, given a new agent
+#                (reset) or keeping its own (reuse), the way a folder
+#                run does now. It does so with the RandomAI, which
+#                isn't reusable, so reuse builds a new one, and with a
+#                reusable agent that climbs out at once. For each it
+#                reports the worlds per second, the memory
+#                blocks and bytes allocated per world to set it up, from
+#                tracemalloc snapshots of the first 500 worlds, and the
+#                garbage collections, and the time spent in them, of the
+#                fastest of three runs.
+#
+# NOTES:       - Random worlds and the RandomAI are seeded, so every run
+#                plays the same games.
+#
+#              - Steps are counted by wrapping the agent, so the step
+#                rates include one extra function call per step.
+# ======================================================================
+
+import sys
+import os
+import io
+import json
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+import gc
+import importlib.util
+import contextlib
+from Agent import Agent
+from World import World
+from RandomAI import RandomAI
+from MyAI import MyAI
+from Board import TileBoard, BitBoard, SparseBoard
+from Worlds import parseWorld
+
+SIZES     = [ 4, 16, 64, 256 ]
+BOARDS    = [ ( "tile", TileBoard ), ( "bit", BitBoard ), ( "sparse", SparseBoard ) ]
+GENERATOR = os.path.join ( os.path.dirname ( os.path.abspath ( __file__ ) ),
+                           "..", "..", "Wumpus_World_World_Generator", "world_generator.py" )
+
+class WallAgent ( Agent ):
+
+    # Turns around and walks into the wall at the start tile until the
+    # game runs out of points. Every step reads the percepts and checks
+    # the tile it is on, and no world ends early.
+
+    def __init__ ( self ):
+        self.__actions = [ Agent.Action.TURN_LEFT, Agent.Action.TURN_LEFT ]
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        if self.__actions:
+            return self.__actions.pop()
+        return Agent.Action.FORWARD
+
+class ClimbingAgent ( Agent ):
+
+    # Climbs out at once, so a game is all setup. It keeps no state, so
+    # it is reusable and reset() has nothing to do; a reused World calls
+    # it instead of building a new agent.
+
+    reusable = True
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        return Agent.Action.CLIMB
+
+    def reset ( self ):
+        pass
+
+class CountingAgent ( Agent ):
+
+    # Counts the moves of the agent it wraps
+
+    def __init__ ( self, agent ):
+        self.agent = agent
+        self.steps = 0
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        self.steps += 1
+        return self.agent.getAction ( stench, breeze, glitter, bump, scream )
+
+# ======================================================================
+# =                 Helper Functions
+# ======================================================================
+
+def worldText ( colDimension, rowDimension, rng ):
+    # Returns the text of a world file, drawn like world_generator.py
+    pits = [ (c, r) for r in range(rowDimension) for c in range(colDimension)
+             if (c != 0 or r != 0) and rng.randrange(10) < 2 ]
+
+    wc, wr = 0, 0
+    while wc == 0 and wr == 0:
+        wc = rng.randrange(colDimension)
+        wr = rng.randrange(rowDimension)
+
+    gc, gr = 0, 0
+    while gc == 0 and gr == 0:
+        gc = rng.randrange(colDimension)
+        gr = rng.randrange(rowDimension)
+
+    lines = [ str(colDimension) + "\t" + str(rowDimension), str(wc) + "\t" + str(wr),
+              str(gc) + "\t" + str(gr), str(len(pits)) ]
+    lines += [ str(c) + "\t" + str(r) for c, r in pits ]
+    return "\n".join(lines) + "\n"
+
+def worldTexts ( size, count, seed = 0 ):
+    rng = random.Random ( seed )
+    return [ worldText ( size, size, rng ) for i in range(count) ]
+
+def repeat ( function, minTime ):
+    # Calls function until minTime seconds have passed. function returns
+    # the amount of work it did (worlds, steps, ...) as a tuple. Returns
+    # each amount per second for the fastest call, which is steadier
+    # than the mean on a busy machine.
+    best    = None
+    elapsed = 0.0
+    while best == None or elapsed < minTime:
+        start    = time.perf_counter()
+        amount   = function()
+        seconds  = time.perf_counter() - start
+        elapsed += seconds
+
+        rates = tuple ( a / seconds for a in amount )
+        if best == None or rates[0] > best[0]:
+            best = rates
+    return best
+
+def loadGenerator ( ):
+    spec   = importlib.util.spec_from_file_location ( "world_generator", GENERATOR )
+    module = importlib.util.module_from_spec ( spec )
+    spec.loader.exec_module ( module )
+    return module
+
+# ======================================================================
+# =                 Benchmarks
+# ======================================================================
+
+def benchEngine ( size, makeAgent, minTime ):
+    texts = worldTexts ( size, 20 )
+
+    def play ( ):
+        random.seed ( 0 )
+        steps = 0
+        for text in texts:
+            agent = CountingAgent ( makeAgent() )
+            World ( file=io.StringIO(text), agent=agent ).run()
+            steps += agent.steps
+        return len(texts), steps
+
+    worlds, steps = repeat ( play, minTime )
+    return { "worlds_per_sec": worlds, "steps_per_sec": steps }
+
+def benchParse ( size, minTime ):
+    texts = worldTexts ( size, 20 )
+    agent = WallAgent()
+
+    def parse ( ):
+        for text in texts:
+            World ( file=io.StringIO(text), agent=agent )
+        return len(texts),
+
+    worlds, = repeat ( parse, minTime )
+    return { "worlds_per_sec": worlds }
+
+def benchGenerate ( size, minTime, generator, folder ):
+    filename = os.path.join ( folder, "world.txt" )
+
+    def generate ( ):
+        random.seed ( 0 )
+        for i in range(5):
+            generator.genWorld ( size, size, filename )
+        return 5,
+
+    worlds, = repeat ( generate, minTime )
+    return { "worlds_per_sec": worlds }
+
+def benchRender ( size, minTime ):
+    world = World ( file=io.StringIO(worldTexts ( size, 1 )[0]), agent=WallAgent() )
+    sink  = io.StringIO()
+
+    def render ( ):
+        with contextlib.redirect_stdout ( sink ):
+            world.printWorld()
+        sink.seek ( 0 )
+        sink.truncate ( 0 )
+        return 1,
+
+    frames, = repeat ( render, minTime )
+    return { "frames_per_sec": frames }
+
+def runSuite ( minTime ):
+    generator = loadGenerator()
+    results   = {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        for size in SIZES:
+            name = str(size) + "x" + str(size)
+            results["engine.random." + name] = benchEngine ( size, RandomAI, minTime )
+            results["engine.myai."   + name] = benchEngine ( size, MyAI, minTime )
+            results["parse."         + name] = benchParse ( size, minTime )
+            results["generate."      + name] = benchGenerate ( size, minTime, generator, folder )
+            results["render."        + name] = benchRender ( size, minTime )
+
+    return {
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "time":     time.strftime ( "%Y-%m-%d %H:%M:%S" ),
+        "results":  results
+    }
+
+def printResults ( report ):
+    for name, metrics in report["results"].items():
+        for metric, rate in sorted ( metrics.items() ):
+            print ( name.ljust(24) + metric.ljust(16) + str(round(rate, 1)).rjust(14) )
+
+def compareResults ( baseline, current, tolerance ):
+    # Prints every rate in both reports; returns the number of rates
+    # that dropped by more than tolerance
+    regressions = 0
+
+    for name, metrics in current["results"].items():
+        for metric, rate in sorted ( metrics.items() ):
+            old = baseline["results"].get ( name, {} ).get ( metric )
+            if old == None or old == 0:
+                continue
+
+            change = rate / old - 1
+            flag   = ""
+            if change < -tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+
+            print ( name.ljust(24) + metric.ljust(16) + str(round(old, 1)).rjust(14) +
+                    str(round(rate, 1)).rjust(14) + ( "%+.1f%%" % (100 * change) ).rjust(10) + flag )
+
+    return regressions
+
+def benchBoards ( sizes = ( 4, 64 ), count = 50, seed = 0 ):
+    for size in sizes:
+        texts = worldTexts ( size, count, seed )
+        print ( str(size) + "x" + str(size) + ":" )
+
+        for name, board in BOARDS:
+            # Bytes allocated per world while the worlds are alive
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            worlds = [ World ( file=io.StringIO(text), board=board, agent=WallAgent() ) for text in texts ]
+            memory = (tracemalloc.get_traced_memory()[0] - before) / len(worlds)
+            tracemalloc.stop()
+
+            # The WallAgent loses exactly one point per step; the
+            # turbo loop plays the same games as the plain one
+            plain = [ World ( file=io.StringIO(text), board=board, agent=WallAgent(), turbo=False ) for text in texts ]
+            speeds = []
+            for games in ( plain, worlds ):
+                start = time.perf_counter()
+                steps = -sum ( world.run() for world in games )
+                speeds.append ( steps / (time.perf_counter() - start) )
+
+            print ( "\t" + name.ljust(6) +
+                    str(int(memory)).rjust(10) + " bytes/world" +
+                    str(int(speeds[0])).rjust(12) + " steps/sec plain" +
+                    str(int(speeds[1])).rjust(12) + " steps/sec turbo" )
+
+def benchPool ( count = 20000, size = 4, seed = 0, sample = 500 ):
+    texts = worldTexts ( size, count, seed )
+
+    # Time spent in garbage collection, from the collector's callbacks
+    pauses = []
+    def collecting ( phase, info ):
+        pauses.append ( time.perf_counter() )
+
+    def setUp ( world, record, makeAgent, mode ):
+        # Returns the World for the next world: "new" builds one, "reset"
+        # resets the last one with a new agent, and "reuse" resets it
+        # and keeps the agent, the way a folder run does
+        if world == None or mode == "new":
+            return World ( agent=makeAgent(), record=record )
+        if mode == "reset":
+            world.reset ( record, makeAgent() )
+        else:
+            world.reset ( record )
+        return world
+
+    def play ( makeAgent, mode, texts ):
+        world = None
+        score = 0
+        for text in texts:
+            world  = setUp ( world, parseWorld ( text ), makeAgent, mode )
+            score += world.run()
+        return score
+
+    def allocated ( makeAgent, mode ):
+        # The memory blocks and bytes allocated to set up a world, and
+        # still held once it is set up, from tracemalloc snapshots of
+        # the first worlds
+        world  = None
+        blocks = 0
+        size   = 0
+        tracemalloc.start()
+        for text in texts[:sample]:
+            record = parseWorld ( text )
+            before = tracemalloc.take_snapshot()
+            new    = setUp ( world, record, makeAgent, mode )
+            after  = tracemalloc.take_snapshot()
+            for stat in after.compare_to ( before, "lineno" ):
+                blocks += max ( 0, stat.count_diff )
+                size   += max ( 0, stat.size_diff )
+            world  = new
+            world.run()
+        tracemalloc.stop()
+        n = min ( sample, len(texts) )
+        return blocks / n, size / n
+
+    gc.callbacks.append ( collecting )
+    try:
+        for agentName, makeAgent in ( ( "random", RandomAI ), ( "climb", ClimbingAgent ) ):
+            print ( agentName + ":" )
+            scores = []
+            for mode in ( "new", "reset", "reuse" ):
+                blocks, size = allocated ( makeAgent, mode )
+
+                # The RandomAI is seeded the same way, so every mode
+                # plays the same games. The fastest of three runs is
+                # kept, with its collections.
+                best = None
+                for run in range ( 3 ):
+                    random.seed ( seed )
+                    gc.collect()
+                    del pauses[:]
+                    before  = sum ( stats["collections"] for stats in gc.get_stats() )
+                    start   = time.perf_counter()
+                    score   = play ( makeAgent, mode, texts )
+                    seconds = time.perf_counter() - start
+                    collections = sum ( stats["collections"] for stats in gc.get_stats() ) - before
+                    paused      = sum ( pauses[i+1] - pauses[i] for i in range ( 0, len(pauses) - 1, 2 ) )
+                    if best == None or seconds < best[0]:
+                        best = ( seconds, collections, paused )
+                scores.append ( score )
+                seconds, collections, paused = best
+
+                print ( "\t" + mode.ljust(6) +
+                        str(int(count / seconds)).rjust(10) + " worlds/sec" +
+                        ( "%.1f" % blocks ).rjust(8) + " blocks/world" +
+                        str(int(size)).rjust(8) + " bytes/world" +
+                        str(collections).rjust(6) + " collections" +
+                        ( "%.1f" % ( paused * 1000 ) ).rjust(8) + " ms collecting" )
+
+            if len ( set ( scores ) ) != 1:
+                print ( "[WARNING] A reset World scored differently." )
+    finally:
+        gc.callbacks.remove ( collecting )
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def main ( ):
+    args = sys.argv
+
+    if len(args) >= 2 and args[1] == "run":
+        quick  = "-q" in args[2:]
+        files  = [ arg for arg in args[2:] if arg != "-q" ]
+        report = runSuite ( 0.05 if quick else 0.5 )
+        printResults ( report )
+
+        if files:
+            with open ( files[0], "w" ) as file:
+                json.dump ( report, file, indent=2, sort_keys=True )
+        return
+
+    if len(args) in ( 4, 5 ) and args[1] == "compare":
+        try:
+            with open ( args[2] ) as file:
+                baseline = json.load ( file )
+            with open ( args[3] ) as file:
+                current = json.load ( file )
+            tolerance = float(args[4]) if len(args) == 5 else 0.10
+        except ( OSError, ValueError ) as error:
+            print ( "[ERROR] " + str(error) )
+            sys.exit ( 2 )
+
+        regressions = compareResults ( baseline, current, tolerance )
+        if regressions:
+            print ( "[WARNING] " + str(regressions) + " regression(s) beyond " + str(tolerance) + "." )
+            sys.exit ( 1 )
+        return
+
+    if len(args) >= 2 and args[1] == "boards":
+        benchBoards ( )
+        return
+
+    if len(args) >= 2 and args[1] == "pool":
+        benchPool ( )
+        return
+
+    print ( "Benchmark run [OutputFile] [-q]" )
+    print ( "Benchmark compare BaselineFile NewFile [Tolerance]" )
+    print ( "Benchmark boards" )
+    print ( "Benchmark pool" )
+
+if __name__ == "__main__":
+    main()
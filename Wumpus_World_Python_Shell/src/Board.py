@@ -0,0 +1,480 @@
+# ======================================================================
+# FILE:        Board.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the board classes, which store the
+#              features of a world for the World class. Every board
+#              offers the same functions, so the World can use any of
+#              them:
+#
+#              - TileBoard keeps one tile object per cell, each with a
+#                pit, wumpus, gold, breeze and stench attribute.
+#
+#              - BitBoard keeps one integer bitmask per feature, where
+#                bit (c * rowDimension + r) stands for the cell (c, r).
+#                It uses far less memory, and every percept is a single
+#                mask test.
+#
+#              - SparseBoard keeps only the cells with a pit, wumpus or
+#                gold, as sets of cell numbers, and works out breezes
+#                and stenches from the neighbors of a cell when asked.
+#                Its memory and setup time grow with the number of
+#                features rather than with the board area, so it is the
+#                one for very large worlds with few features.
+#
+#              Every board keeps a WumpusIndex of its wumpus by row and
+#              by column, so a shot only looks at the wumpus in its
+#              line, however large the board or many the wumpus.
+#
+#              Only the gold and the wumpus change during a game, so
+#              snapshot() returns just their state, which restore()
+#              puts back. World.snapshot() uses them to branch games.
+#
+#              clear() empties a board in place for another world, of
+#              any size, so World.reset() can reuse it instead of
+#              building a new one for every world of a folder.
+#
+# NOTES:       - Directions follow the World class: 0 is right, 1 is
+#                down, 2 is left and 3 is up.
+#
+#              - A TileBoard snapshot holds the gold, wumpus and stench
+#                flags of every cell that had gold or a wumpus, usually
+#                two cells. A BitBoard snapshot holds its masks, which
+#                are immutable ints, so it costs the same on any board.
+#                A SparseBoard snapshot is its gold and wumpus sets,
+#                which are frozensets for the same reason.
+#
+#              - A TileBoard keeps a list of the cells it put a pit,
+#                wumpus or gold in, and clear() only empties those and
+#                their neighbors; its grid of tiles only grows, to the
+#                largest world it has held.
+# ======================================================================
+
+class WumpusIndex():
+
+    # The cells of every wumpus added to a board, by row and by column.
+    # A killed wumpus stays in the index; the board checks whether each
+    # one it is given is still alive, so the index never changes during
+    # a game and snapshots don't need it.
+
+    def __init__ ( self ):
+        self.__byRow = {}
+        self.__byCol = {}
+
+    def add ( self, c, r ):
+        self.__byRow.setdefault ( r, [] ).append ( c )
+        self.__byCol.setdefault ( c, [] ).append ( r )
+
+    def clear ( self ):
+        self.__byRow.clear()
+        self.__byCol.clear()
+
+    def inLine ( self, c, r, direction ):
+        # Returns the (c, r) of every wumpus from (c, r) to the edge of
+        # the board in the given direction
+        if direction == 0:
+            return [ (x, r) for x in self.__byRow.get ( r, () ) if x >= c ]
+        if direction == 1:
+            return [ (c, y) for y in self.__byCol.get ( c, () ) if y <= r ]
+        if direction == 2:
+            return [ (x, r) for x in self.__byRow.get ( r, () ) if x <= c ]
+        if direction == 3:
+            return [ (c, y) for y in self.__byCol.get ( c, () ) if y >= r ]
+        return []
+
+class TileBoard():
+
+    # Tile Structure
+    class __Tile:
+        pit    = False;
+        wumpus = False;
+        gold   = False;
+        breeze = False;
+        stench = False;
+
+    def __init__ ( self, colDimension, rowDimension ):
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+        self.__tiles        = [[self.__Tile() for j in range(rowDimension)] for i in range(colDimension)]
+
+        # The tiles a game can change: every gold and wumpus tile
+        self.__changing     = []
+        self.__index        = WumpusIndex()
+
+        # Every cell a pit, wumpus or gold was put in, for clear()
+        self.__features     = []
+
+    # ===============================================================
+    # =                 Feature Functions
+    # ===============================================================
+
+    def addPit ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__tiles[c][r].pit = True
+            self.__features.append ( (c, r) )
+            self.__addBreeze ( c+1, r )
+            self.__addBreeze ( c-1, r )
+            self.__addBreeze ( c, r+1 )
+            self.__addBreeze ( c, r-1 )
+
+    def addWumpus ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__tiles[c][r].wumpus = True
+            self.__changing.append ( self.__tiles[c][r] )
+            self.__features.append ( (c, r) )
+            self.__index.add ( c, r )
+            self.__addStench ( c+1, r )
+            self.__addStench ( c-1, r )
+            self.__addStench ( c, r+1 )
+            self.__addStench ( c, r-1 )
+
+    def addGold ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__tiles[c][r].gold = True
+            self.__changing.append ( self.__tiles[c][r] )
+            self.__features.append ( (c, r) )
+
+    def __addStench ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__tiles[c][r].stench = True
+
+    def __addBreeze ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__tiles[c][r].breeze = True
+
+    def __isInBounds ( self, c, r ):
+        return c < self.__colDimension and r < self.__rowDimension and c >= 0 and r >= 0
+
+    # ===============================================================
+    # =                 Engine Functions
+    # ===============================================================
+
+    def percepts ( self, c, r ):
+        # Returns the (stench, breeze, glitter) percepts of a cell
+        tile = self.__tiles[c][r]
+        return tile.stench, tile.breeze, tile.gold
+
+    def isDeadly ( self, c, r ):
+        tile = self.__tiles[c][r]
+        return tile.pit or tile.wumpus
+
+    def takeGold ( self, c, r ):
+        # Removes the gold from a cell; returns whether there was any
+        if self.__tiles[c][r].gold:
+            self.__tiles[c][r].gold = False
+            return True
+        return False
+
+    def shoot ( self, c, r, direction ):
+        # Kills every wumpus from (c, r) to the edge of the board in
+        # the given direction; returns whether one was hit
+        scream = False
+
+        for x, y in self.__index.inLine ( c, r, direction ):
+            tile = self.__tiles[x][y]
+            if tile.wumpus:
+                tile.wumpus = False
+                tile.stench = True
+                scream = True
+
+        return scream
+
+    def tile ( self, c, r ):
+        # Returns an object with the five feature attributes of a cell
+        return self.__tiles[c][r]
+
+    # ===============================================================
+    # =                 Snapshot Functions
+    # ===============================================================
+
+    def snapshot ( self ):
+        return tuple ( ( tile.gold, tile.wumpus, tile.stench ) for tile in self.__changing )
+
+    def restore ( self, snapshot ):
+        for tile, ( gold, wumpus, stench ) in zip ( self.__changing, snapshot ):
+            tile.gold   = gold
+            tile.wumpus = wumpus
+            tile.stench = stench
+
+    def clear ( self, colDimension, rowDimension ):
+        # Only the cells with a feature, and the neighbors given their
+        # breezes and stenches, were set. A tile's features are its own
+        # attributes over the class's defaults, so dropping them
+        # empties it. With features in most cells, it is quicker to
+        # empty every tile.
+        if len(self.__features) * 5 < self.__colDimension * self.__rowDimension:
+            for c, r in self.__features:
+                for x, y in ( (c, r), (c+1, r), (c-1, r), (c, r+1), (c, r-1) ):
+                    if self.__isInBounds(x, y):
+                        self.__tiles[x][y].__dict__.clear()
+        else:
+            for column in self.__tiles[:self.__colDimension]:
+                for tile in column[:self.__rowDimension]:
+                    tile.__dict__.clear()
+        self.__features.clear()
+        self.__changing.clear()
+        self.__index.clear()
+
+        # Grow the grid if the world is larger than any before
+        rows = max ( rowDimension, len(self.__tiles[0]) if self.__tiles else 0 )
+        for column in self.__tiles:
+            column.extend ( self.__Tile() for j in range ( len(column), rows ) )
+        while len(self.__tiles) < colDimension:
+            self.__tiles.append ( [ self.__Tile() for j in range(rows) ] )
+
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+
+class BitBoard():
+
+    # Tile Structure, only built for printing
+    class __Tile:
+        def __init__ ( self, pit, wumpus, gold, breeze, stench ):
+            self.pit    = pit
+            self.wumpus = wumpus
+            self.gold   = gold
+            self.breeze = breeze
+            self.stench = stench
+
+    def __init__ ( self, colDimension, rowDimension ):
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+        self.__pit          = 0
+        self.__wumpus       = 0
+        self.__gold         = 0
+        self.__breeze       = 0
+        self.__stench       = 0
+        self.__deadly       = 0
+        self.__index        = WumpusIndex()
+
+    # ===============================================================
+    # =                 Feature Functions
+    # ===============================================================
+
+    def addPit ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__pit    |= self.__bit ( c, r )
+            self.__deadly |= self.__bit ( c, r )
+            self.__breeze |= self.__neighbors ( c, r )
+
+    def addWumpus ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__wumpus |= self.__bit ( c, r )
+            self.__deadly |= self.__bit ( c, r )
+            self.__stench |= self.__neighbors ( c, r )
+            self.__index.add ( c, r )
+
+    def addGold ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__gold |= self.__bit ( c, r )
+
+    def __bit ( self, c, r ):
+        return 1 << (c * self.__rowDimension + r)
+
+    def __neighbors ( self, c, r ):
+        # Moving one column is a shift by rowDimension, one row by 1
+        bit  = self.__bit ( c, r )
+        mask = 0
+        if c+1 < self.__colDimension: mask |= bit << self.__rowDimension
+        if c-1 >= 0:                  mask |= bit >> self.__rowDimension
+        if r+1 < self.__rowDimension: mask |= bit << 1
+        if r-1 >= 0:                  mask |= bit >> 1
+        return mask
+
+    def __isInBounds ( self, c, r ):
+        return c < self.__colDimension and r < self.__rowDimension and c >= 0 and r >= 0
+
+    # ===============================================================
+    # =                 Engine Functions
+    # ===============================================================
+
+    def percepts ( self, c, r ):
+        # Returns the (stench, breeze, glitter) percepts of a cell
+        bit = 1 << (c * self.__rowDimension + r)
+        return self.__stench & bit != 0, self.__breeze & bit != 0, self.__gold & bit != 0
+
+    def isDeadly ( self, c, r ):
+        return self.__deadly & (1 << (c * self.__rowDimension + r)) != 0
+
+    def takeGold ( self, c, r ):
+        # Removes the gold from a cell; returns whether there was any
+        bit = self.__bit ( c, r )
+        if self.__gold & bit:
+            self.__gold &= ~bit
+            return True
+        return False
+
+    def shoot ( self, c, r, direction ):
+        # Kills every wumpus from (c, r) to the edge of the board in
+        # the given direction; returns whether one was hit
+        hit = 0
+        for x, y in self.__index.inLine ( c, r, direction ):
+            hit |= self.__bit ( x, y )
+
+        hit &= self.__wumpus
+        if hit:
+            self.__wumpus &= ~hit
+            self.__deadly  = self.__pit | self.__wumpus
+            self.__stench |= hit
+            return True
+        return False
+
+    def tile ( self, c, r ):
+        # Returns an object with the five feature attributes of a cell
+        bit = self.__bit ( c, r )
+        return self.__Tile (
+            self.__pit    & bit != 0,
+            self.__wumpus & bit != 0,
+            self.__gold   & bit != 0,
+            self.__breeze & bit != 0,
+            self.__stench & bit != 0
+        )
+
+    # ===============================================================
+    # =                 Snapshot Functions
+    # ===============================================================
+
+    def snapshot ( self ):
+        return self.__gold, self.__wumpus, self.__stench, self.__deadly
+
+    def restore ( self, snapshot ):
+        self.__gold, self.__wumpus, self.__stench, self.__deadly = snapshot
+
+    def clear ( self, colDimension, rowDimension ):
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+        self.__pit          = 0
+        self.__wumpus       = 0
+        self.__gold         = 0
+        self.__breeze       = 0
+        self.__stench       = 0
+        self.__deadly       = 0
+        self.__index.clear()
+
+class SparseBoard():
+
+    # Tile Structure, only built for printing
+    class __Tile:
+        def __init__ ( self, pit, wumpus, gold, breeze, stench ):
+            self.pit    = pit
+            self.wumpus = wumpus
+            self.gold   = gold
+            self.breeze = breeze
+            self.stench = stench
+
+    def __init__ ( self, colDimension, rowDimension ):
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+
+        # Cell (c, r) is numbered c * rowDimension + r, like a BitBoard
+        # bit. Every wumpus ever added stays in __wumpusCells, since its
+        # stench outlives it; __wumpus only holds the living ones.
+        self.__pits         = set()
+        self.__wumpusCells  = set()
+        self.__wumpus       = frozenset()
+        self.__gold         = frozenset()
+        self.__index        = WumpusIndex()
+
+    # ===============================================================
+    # =                 Feature Functions
+    # ===============================================================
+
+    def addPit ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__pits.add ( c * self.__rowDimension + r )
+
+    def addWumpus ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__wumpusCells.add ( c * self.__rowDimension + r )
+            self.__wumpus = self.__wumpus | { c * self.__rowDimension + r }
+            self.__index.add ( c, r )
+
+    def addGold ( self, c, r ):
+        if self.__isInBounds(c, r):
+            self.__gold = self.__gold | { c * self.__rowDimension + r }
+
+    def __isNear ( self, cells, c, r ):
+        # Returns whether a neighbor of (c, r) is in cells
+        if not cells:
+            return False
+        rows = self.__rowDimension
+        cell = c * rows + r
+        return ( ( c+1 < self.__colDimension and cell + rows in cells ) or
+                 ( c-1 >= 0                  and cell - rows in cells ) or
+                 ( r+1 < rows                and cell + 1    in cells ) or
+                 ( r-1 >= 0                  and cell - 1    in cells ) )
+
+    def __isInBounds ( self, c, r ):
+        return c < self.__colDimension and r < self.__rowDimension and c >= 0 and r >= 0
+
+    # ===============================================================
+    # =                 Engine Functions
+    # ===============================================================
+
+    def percepts ( self, c, r ):
+        # Returns the (stench, breeze, glitter) percepts of a cell
+        cell = c * self.__rowDimension + r
+        return self.__isStench ( c, r, cell ), self.__isNear ( self.__pits, c, r ), cell in self.__gold
+
+    def __isStench ( self, c, r, cell ):
+        # A killed wumpus leaves a stench in its own cell too
+        if cell in self.__wumpusCells and cell not in self.__wumpus:
+            return True
+        return self.__isNear ( self.__wumpusCells, c, r )
+
+    def isDeadly ( self, c, r ):
+        cell = c * self.__rowDimension + r
+        return cell in self.__pits or cell in self.__wumpus
+
+    def takeGold ( self, c, r ):
+        # Removes the gold from a cell; returns whether there was any
+        cell = c * self.__rowDimension + r
+        if cell in self.__gold:
+            self.__gold = self.__gold - { cell }
+            return True
+        return False
+
+    def shoot ( self, c, r, direction ):
+        # Kills every wumpus from (c, r) to the edge of the board in
+        # the given direction; returns whether one was hit
+        rows = self.__rowDimension
+        hit  = { x * rows + y for x, y in self.__index.inLine ( c, r, direction ) } & self.__wumpus
+
+        if hit:
+            self.__wumpus = self.__wumpus - hit
+            return True
+        return False
+
+    def tile ( self, c, r ):
+        # Returns an object with the five feature attributes of a cell
+        cell = c * self.__rowDimension + r
+        return self.__Tile (
+            cell in self.__pits,
+            cell in self.__wumpus,
+            cell in self.__gold,
+            self.__isNear ( self.__pits, c, r ),
+            self.__isStench ( c, r, cell )
+        )
+
+    # ===============================================================
+    # =                 Snapshot Functions
+    # ===============================================================
+
+    def snapshot ( self ):
+        return self.__gold, self.__wumpus
+
+    def restore ( self, snapshot ):
+        self.__gold, self.__wumpus = snapshot
+
+    def clear ( self, colDimension, rowDimension ):
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+        self.__pits.clear()
+        self.__wumpusCells.clear()
+        self.__wumpus       = frozenset()
+        self.__gold         = frozenset()
+        self.__index.clear()
+
+# The boards by name, for Main.py's --board
+BOARDS = { "tile": TileBoard, "bit": BitBoard, "sparse": SparseBoard }
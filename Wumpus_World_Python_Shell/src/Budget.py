@@ -0,0 +1,106 @@
+# ======================================================================
+# FILE:        Budget.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the time budget, which World.run() can
+#              hold an agent to. A budget has a limit per move and a
+#              limit per game, in seconds of wall-clock time spent in
+#              the agent's getAction; either can be 0 for no limit.
+#
+#              An agent that goes over a limit forfeits the game: the
+#              game ends at once, the agent loses PENALTY points, like
+#              dying, and the World's outcome() is "forfeit".
+#
+#              The World enforces a budget by wrapping its agent in a
+#              BudgetAgent for the run, like the StepTimer in Timing.py,
+#              so a World without a budget pays nothing.
+#
+# NOTES:       - A move that runs over is interrupted with SIGALRM, so
+#                an agent stuck in a loop can't hold up a run. The
+#                interruption is raised as Forfeit, which is not an
+#                Exception, so "except Exception" in an agent doesn't
+#                swallow it.
+#
+#              - Without SIGALRM (on Windows, or off the main thread),
+#                moves can't be interrupted; the agent forfeits after
+#                the move that went over.
+# ======================================================================
+
+import signal
+import threading
+import time
+from Agent import Agent
+
+PENALTY = 1000
+
+class Forfeit ( BaseException ):
+    pass
+
+class TimeBudget():
+
+    def __init__ ( self, moveLimit = 0, gameLimit = 0 ):
+        self.moveLimit = moveLimit
+        self.gameLimit = gameLimit
+
+        # Seconds the agent has spent this game
+        self.used      = 0.0
+        self.__handler = None
+
+    def wrap ( self, agent ):
+        self.used = 0.0
+
+        alarm = hasattr ( signal, "setitimer" ) and threading.current_thread() is threading.main_thread()
+        if alarm:
+            self.__handler = signal.signal ( signal.SIGALRM, self.__expire )
+        return BudgetAgent ( agent, self, alarm )
+
+    def finish ( self ):
+        if self.__handler != None:
+            signal.setitimer ( signal.ITIMER_REAL, 0 )
+            signal.signal ( signal.SIGALRM, self.__handler )
+            self.__handler = None
+
+    def limit ( self ):
+        # Returns the seconds the next move may take, or None if there
+        # is no limit
+        limit = None
+        if self.moveLimit > 0:
+            limit = self.moveLimit
+        if self.gameLimit > 0:
+            remaining = self.gameLimit - self.used
+            limit     = remaining if limit == None else min ( limit, remaining )
+        return limit
+
+    @staticmethod
+    def __expire ( signum, frame ):
+        raise Forfeit()
+
+class BudgetAgent ( Agent ):
+
+    def __init__ ( self, agent, budget, alarm ):
+        self.__agent  = agent
+        self.__budget = budget
+        self.__alarm  = alarm
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        limit = self.__budget.limit()
+        if limit == None:
+            return self.__agent.getAction ( stench, breeze, glitter, bump, scream )
+        if limit <= 0:
+            raise Forfeit()
+
+        start = time.perf_counter()
+        if self.__alarm:
+            signal.setitimer ( signal.ITIMER_REAL, limit )
+        try:
+            action = self.__agent.getAction ( stench, breeze, glitter, bump, scream )
+        finally:
+            if self.__alarm:
+                signal.setitimer ( signal.ITIMER_REAL, 0 )
+
+        elapsed = time.perf_counter() - start
+        self.__budget.used += elapsed
+        if elapsed > limit:
+            raise Forfeit()
+        return action
@@ -0,0 +1,320 @@
+# ======================================================================
+# FILE:        Conformance.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the conformance harness, which checks
+#              that the Python shell and the C++ shell score the same,
+#              and times both. It is run from the src folder:
+#
+#                   python3 Conformance.py [Options] Worlds
+#
+#              Worlds is a folder of world files, or a packed corpus
+#              made by Corpus.py. The C++ shell is copied to a temporary
+#              folder, its MyAI is replaced by the scripted agent below,
+#              and it is built there with its own Makefile, so the
+#              shell itself is never touched. Then both shells play
+#              every world with the scripted agent:
+#
+#              - Every world is played once by each shell, and the
+#                scores are compared. The C++ shell is run on one world
+#                file at a time, as "Wumpus_World File".
+#
+#              - Each shell plays the whole set of worlds at once, the
+#                way "-f" does, to time it in worlds/sec. The C++ time
+#                is of a whole "Wumpus_World -f Folder" run.
+#
+#              Options:
+#                   --cpp DIR  The C++ shell (../../Wumpus_World_Cpp_Shell)
+#                   -j N       Runs the C++ shell on N worlds at a time
+#                   -o FILE    Writes every world's two scores to FILE
+#                              as CSV
+#
+#              It exits with status 1 if any world scores differently,
+#              so it can be run as a check.
+#
+# NOTES:       - The scripted agent has no randomness of its own: it
+#                steps a linear congruential generator, mixing in the
+#                percepts, and picks its action from the result. The
+#                same world and the same percepts give the same game in
+#                both shells, and a percept that differs changes the
+#                rest of the game, and almost always the score.
+#
+#              - The C++ shell reads only one wumpus from a world file,
+#                so worlds with extra wumpus (see Worlds.py) are
+#                expected to differ. So are worlds with pits off the
+#                board, if the two read them differently.
+#
+#              - Requires g++ and make, like the C++ shell.
+# ======================================================================
+
+import sys
+import os
+import csv
+import time
+import shutil
+import tempfile
+import subprocess
+import concurrent.futures
+from Agent import Agent
+from World import World
+from Corpus import Corpus, isCorpus
+from Worlds import readWorld
+
+CPP_SHELL = os.path.join ( os.path.dirname ( os.path.abspath ( __file__ ) ), "..", "..", "Wumpus_World_Cpp_Shell" )
+
+# Timed runs are repeated for at least this many seconds, and the
+# fastest is kept
+MIN_TIME = 1.0
+
+# The scripted agent's actions, picked by the generator
+ACTIONS = [ Agent.Action.FORWARD ] * 8 + [ Agent.Action.TURN_LEFT ] * 3 + \
+          [ Agent.Action.TURN_RIGHT ] * 3 + [ Agent.Action.SHOOT, Agent.Action.CLIMB ]
+
+class ScriptedAI ( Agent ):
+
+    def __init__ ( self ):
+        self.__seed = 12345
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        percepts    = stench | breeze << 1 | glitter << 2 | bump << 3 | scream << 4
+        self.__seed = ( ( self.__seed ^ percepts ) * 1103515245 + 12345 ) & 0x7fffffff
+
+        if glitter:
+            return Agent.Action.GRAB
+        return ACTIONS[( self.__seed >> 16 ) % 16]
+
+# The same agent for the C++ shell, as its MyAI
+SCRIPTED_HPP = """
+#ifndef MYAI_LOCK
+#define MYAI_LOCK
+
+#include "Agent.hpp"
+
+class MyAI : public Agent
+{
+public:
+	MyAI ( void );
+
+	Action getAction
+	(
+		bool stench,
+		bool breeze,
+		bool glitter,
+		bool bump,
+		bool scream
+	);
+
+private:
+	unsigned int seed;
+};
+
+#endif
+"""
+
+SCRIPTED_CPP = """
+#include "MyAI.hpp"
+
+static const Agent::Action ACTIONS[16] =
+{
+	Agent::FORWARD, Agent::FORWARD, Agent::FORWARD, Agent::FORWARD,
+	Agent::FORWARD, Agent::FORWARD, Agent::FORWARD, Agent::FORWARD,
+	Agent::TURN_LEFT, Agent::TURN_LEFT, Agent::TURN_LEFT,
+	Agent::TURN_RIGHT, Agent::TURN_RIGHT, Agent::TURN_RIGHT,
+	Agent::SHOOT, Agent::CLIMB
+};
+
+MyAI::MyAI() : Agent()
+{
+	seed = 12345;
+}
+
+Agent::Action MyAI::getAction
+(
+	bool stench,
+	bool breeze,
+	bool glitter,
+	bool bump,
+	bool scream
+)
+{
+	unsigned int percepts = stench | breeze << 1 | glitter << 2 | bump << 3 | scream << 4;
+	seed = ( ( seed ^ percepts ) * 1103515245u + 12345u ) & 0x7fffffffu;
+
+	if ( glitter )
+		return GRAB;
+	return ACTIONS[( seed >> 16 ) % 16];
+}
+"""
+
+# ======================================================================
+# =                 Shells
+# ======================================================================
+
+def buildCpp ( shell, folder ):
+    # Copies the C++ shell into folder with the scripted agent as its
+    # MyAI, and builds it with its Makefile; returns the executable
+    shutil.copytree ( os.path.join ( shell, "src" ), os.path.join ( folder, "src" ) )
+    shutil.copy ( os.path.join ( shell, "Makefile" ), folder )
+
+    with open ( os.path.join ( folder, "src", "MyAI.hpp" ), "w" ) as file:
+        file.write ( SCRIPTED_HPP )
+    with open ( os.path.join ( folder, "src", "MyAI.cpp" ), "w" ) as file:
+        file.write ( SCRIPTED_CPP )
+
+    build = subprocess.run ( [ "make", "-C", folder, "all" ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT )
+    if build.returncode != 0:
+        raise OSError ( "make failed:\n" + build.stdout.decode ( errors="replace" ) )
+    return os.path.join ( folder, "bin", "Wumpus_World" )
+
+def listWorldFiles ( source, folder ):
+    # Returns the (name, path) of every world, in the order the C++
+    # shell skips them: files starting with "." are left out. A corpus
+    # is written out to folder as world files first.
+    if not isCorpus ( source ):
+        return [ ( name, os.path.join ( source, name ) ) for name in sorted ( os.listdir ( source ) )
+                 if not name.startswith ( "." ) ]
+
+    worlds = []
+    with Corpus ( source ) as corpus:
+        for i, record in enumerate ( corpus ):
+            path = os.path.join ( folder, "world_" + str(i) + ".txt" )
+            writeWorld ( path, record )
+            worlds.append ( ( record.name or str(i), path ) )
+    return worlds
+
+def writeWorld ( path, record ):
+    # Writes a world file, with any extra wumpus after the pits
+    wumpus = list ( record.wumpus )
+    lines  = [ str(record.colDimension) + "\t" + str(record.rowDimension),
+               str(wumpus[0][0]) + "\t" + str(wumpus[0][1]),
+               str(record.gold[0][0]) + "\t" + str(record.gold[0][1]),
+               str(len(record.pits)) ]
+    lines += [ str(c) + "\t" + str(r) for c, r in record.pits ]
+    if len(wumpus) > 1:
+        lines += [ str(len(wumpus) - 1) ] + [ str(c) + "\t" + str(r) for c, r in wumpus[1:] ]
+    with open ( path, "w" ) as file:
+        file.write ( "\n".join ( lines ) + "\n" )
+
+def playPython ( worlds ):
+    # Reads and plays every world; returns the scores
+    return [ World ( agent=ScriptedAI(), record=readWorld ( path, name ) ).run() for name, path in worlds ]
+
+def playCpp ( executable, path ):
+    # Plays one world file; returns the score, or None if it failed
+    run = subprocess.run ( [ executable, path ], stdout=subprocess.PIPE )
+    for line in run.stdout.decode ( errors="replace" ).splitlines():
+        if line.startswith ( "The agent scored: " ):
+            return int ( line.split()[-1] )
+    return None
+
+def timeRuns ( function ):
+    # Calls function until MIN_TIME seconds have passed; returns the
+    # fastest call's time in seconds
+    best    = None
+    elapsed = 0.0
+    while best == None or elapsed < MIN_TIME:
+        start    = time.perf_counter()
+        function()
+        seconds  = time.perf_counter() - start
+        elapsed += seconds
+        best     = seconds if best == None else min ( best, seconds )
+    return best
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def printHelp ( ):
+    print ( "Conformance [Options] Worlds" )
+    print ( )
+    print ( "Options:" )
+    print ( "\t--cpp DIR The C++ shell to build, instead of" )
+    print ( "\t   ../../Wumpus_World_Cpp_Shell." )
+    print ( "\t-j N Runs the C++ shell on N worlds at a time." )
+    print ( "\t-o FILE Writes every world's score in each shell" )
+    print ( "\t   to FILE as CSV." )
+    print ( )
+    print ( "Worlds: A folder of world files, or a packed corpus." )
+    print ( )
+
+def main ( ):
+    args       = sys.argv
+    shell      = CPP_SHELL
+    jobs       = 1
+    outputFile = ""
+    positional = []
+
+    index = 1
+    while index < len(args):
+        token  = args[index]
+        index += 1
+
+        if token[0] != '-':
+            positional.append ( token )
+        elif token == "--cpp" and index < len(args):
+            shell  = args[index]
+            index += 1
+        elif token == "-j" and index < len(args) and args[index].isdigit():
+            jobs   = max ( 1, int(args[index]) )
+            index += 1
+        elif token == "-o" and index < len(args):
+            outputFile = args[index]
+            index     += 1
+        else:
+            printHelp()
+            return 0
+
+    if len(positional) != 1:
+        printHelp()
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        try:
+            executable = buildCpp ( shell, os.path.join ( folder, "cpp" ) )
+        except OSError as error:
+            print ( "[ERROR] Failed to build the C++ shell: " + str(error) )
+            return 1
+
+        try:
+            os.mkdir ( os.path.join ( folder, "worlds" ) )
+            worlds = listWorldFiles ( positional[0], os.path.join ( folder, "worlds" ) )
+            pythonScores = playPython ( worlds )
+        except ( OSError, ValueError ) as error:
+            print ( "[ERROR] Failed to read worlds: " + str(error) )
+            return 1
+
+        with concurrent.futures.ThreadPoolExecutor ( jobs ) as pool:
+            cppScores = list ( pool.map ( lambda world: playCpp ( executable, world[1] ), worlds ) )
+
+        # The C++ -f run reads a folder; a corpus was written out to one
+        worldFolder = positional[0] if not isCorpus ( positional[0] ) else os.path.join ( folder, "worlds" )
+        pythonTime  = timeRuns ( lambda: playPython ( worlds ) )
+        cppTime     = timeRuns ( lambda: subprocess.run ( [ executable, "-f", worldFolder ], stdout=subprocess.DEVNULL ) )
+
+    mismatches = [ ( name, p, c ) for ( name, path ), p, c in zip ( worlds, pythonScores, cppScores ) if p != c ]
+
+    print ( "Worlds: " + str(len(worlds)) )
+    print ( "Python: " + ( "%.1f" % ( len(worlds) / pythonTime ) ) + " worlds/sec" )
+    print ( "C++:    " + ( "%.1f" % ( len(worlds) / cppTime ) ) + " worlds/sec" )
+    print ( "The C++ shell is " + ( "%.1f" % ( pythonTime / cppTime ) ) + " times as fast." )
+    print ( "Worlds scored differently: " + str(len(mismatches)) )
+    for name, p, c in mismatches[:20]:
+        print ( "\t" + str(name) + ": Python " + str(p) + ", C++ " + str(c) )
+    if len(mismatches) > 20:
+        print ( "\t..." )
+
+    if outputFile != "":
+        try:
+            with open ( outputFile, "w", newline="" ) as file:
+                writer = csv.writer ( file )
+                writer.writerow ( [ "world", "python", "cpp" ] )
+                for ( name, path ), p, c in zip ( worlds, pythonScores, cppScores ):
+                    writer.writerow ( [ name, p, c ] )
+        except OSError:
+            print ( "[ERROR] Failure to write to output file." )
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit ( main() )
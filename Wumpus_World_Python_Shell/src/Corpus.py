@@ -0,0 +1,258 @@
+# ======================================================================
+# FILE:        Corpus.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the packed corpus format, which holds
+#              a whole folder of worlds in a single file. A corpus is
+#              read through mmap, and every world is a WorldRecord view
+#              into the mapped file, so nothing is copied or parsed until
+#              the World asks for it.
+#
+#              To convert a folder of world files into a corpus, run:
+#
+#                   python3 Corpus.py InputFolder OutputFile
+#
+#              The corpus can then be given to Main.py in place of the
+#              folder, e.g. "python3 Main.py -f worlds.wwc".
+#
+# NOTES:       - Layout, all little-endian:
+#
+#                   Header  magic "WWPC", version (uint32),
+#                           number of worlds (uint64)
+#
+#                   Index   one uint64 file offset per world
+#
+#                   Record  colDimension, rowDimension, number of
+#                           wumpus, number of gold, number of pits,
+#                           length of the name in bytes (all int32),
+#                           followed by a (c, r) int32 pair for every
+#                           wumpus, gold and pit, followed by the name,
+#                           padded to 4 bytes
+#
+#              - Records are read with memoryview casts, which use the
+#                byte order of the machine, so corpora are only read on
+#                little-endian machines; Corpus raises ValueError on any
+#                other.
+#
+#              - A file that is too short for its header and index, or
+#                doesn't start with the magic, raises ValueError.
+# ======================================================================
+
+import sys
+import os
+import mmap
+import hashlib
+import struct
+from Worlds import readWorld
+
+MAGIC   = b"WWPC"
+VERSION = 1
+
+HEADER  = struct.Struct ( "<4sIQ" )
+FIELDS  = 6
+
+class WorldRecord():
+
+    def __init__ ( self, view, start ):
+        # view is the whole corpus cast to int32; start is the index of
+        # the record's first int32
+        self.__view  = view
+        self.__start = start
+
+    @property
+    def colDimension ( self ):
+        return self.__view[self.__start]
+
+    @property
+    def rowDimension ( self ):
+        return self.__view[self.__start + 1]
+
+    @property
+    def wumpus ( self ):
+        return self.__pairs ( 0, self.__view[self.__start + 2] )
+
+    @property
+    def gold ( self ):
+        return self.__pairs ( self.__view[self.__start + 2], self.__view[self.__start + 3] )
+
+    @property
+    def pits ( self ):
+        skip = self.__view[self.__start + 2] + self.__view[self.__start + 3]
+        return self.__pairs ( skip, self.__view[self.__start + 4] )
+
+    @property
+    def name ( self ):
+        start = self.__start + FIELDS + 2 * self.__numOfPairs()
+        return self.__view[start:].cast ( 'B' )[:self.__view[self.__start + 5]].tobytes().decode ( "utf-8" )
+
+    def __numOfPairs ( self ):
+        return self.__view[self.__start + 2] + self.__view[self.__start + 3] + self.__view[self.__start + 4]
+
+    def __pairs ( self, skip, count ):
+        start  = self.__start + FIELDS + 2 * skip
+        values = self.__view[start : start + 2 * count]
+        return [ (values[i], values[i+1]) for i in range(0, 2 * count, 2) ]
+
+class Corpus():
+
+    def __init__ ( self, filename ):
+        if sys.byteorder != "little":
+            raise ValueError ( "Packed world corpora can only be read on little-endian machines" )
+
+        self.__index   = None
+        self.__records = None
+        self.__map     = None
+        self.__file    = open ( filename, "rb" )
+
+        try:
+            # mmap can't map an empty file
+            size = os.fstat ( self.__file.fileno() ).st_size
+            if size < HEADER.size:
+                raise ValueError ( "Not a packed world corpus: " + filename )
+
+            self.__map = mmap.mmap ( self.__file.fileno(), 0, access=mmap.ACCESS_READ )
+            magic, version, count = HEADER.unpack_from ( self.__map, 0 )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError ( "Not a packed world corpus: " + filename )
+            if size < HEADER.size + 8 * count:
+                raise ValueError ( "Truncated world corpus: " + filename )
+        except:
+            self.close()
+            raise
+
+        view = memoryview ( self.__map )
+        self.__count   = count
+        self.__index   = view[HEADER.size : HEADER.size + 8 * count].cast ( 'Q' )
+        self.__records = view[: len(view) - len(view) % 4].cast ( 'i' )
+
+    def __len__ ( self ):
+        return self.__count
+
+    def __getitem__ ( self, i ):
+        if i < 0 or i >= self.__count:
+            raise IndexError ( "World index out of range" )
+        return WorldRecord ( self.__records, self.__index[i] // 4 )
+
+    def __iter__ ( self ):
+        for i in range(self.__count):
+            yield self[i]
+
+    def close ( self ):
+        # Views have to be released before the map can be closed
+        if self.__index != None:
+            self.__index.release()
+            self.__records.release()
+        if self.__map != None:
+            self.__map.close()
+        self.__file.close()
+
+    def __enter__ ( self ):
+        return self
+
+    def __exit__ ( self, *args ):
+        self.close()
+
+# ======================================================================
+# =                 Reading Functions
+# ======================================================================
+
+def isCorpus ( filename ):
+    try:
+        with open ( filename, "rb" ) as file:
+            return file.read ( len(MAGIC) ) == MAGIC
+    except OSError:
+        return False
+
+def readWorlds ( source, listOfWorlds, batchSize ):
+    # Yields the worlds of listOfWorlds in lists of up to batchSize
+    # (name, record) entries. The source is a folder, a packed corpus,
+    # or an indexable stream of records such as RandomWorlds. For a
+    # folder, listOfWorlds holds file names; otherwise it holds record
+    # numbers. Records are only valid until the next list is asked for.
+    if not isinstance ( source, str ):
+        for i in range ( 0, len(listOfWorlds), batchSize ):
+            records = [ source[j] for j in listOfWorlds[i:i+batchSize] ]
+            yield [ ( record.name, record ) for record in records ]
+        return
+
+    if os.path.isfile ( source ):
+        with Corpus ( source ) as corpus:
+            for i in range ( 0, len(listOfWorlds), batchSize ):
+                records = [ corpus[j] for j in listOfWorlds[i:i+batchSize] ]
+                yield [ ( record.name, record ) for record in records ]
+        return
+
+    for i in range ( 0, len(listOfWorlds), batchSize ):
+        yield [ ( file, readWorld ( source + "/" + file, file ) ) for file in listOfWorlds[i:i+batchSize] ]
+
+# ======================================================================
+# =                 Writing Functions
+# ======================================================================
+
+def writeCorpus ( filename, worlds ):
+    # Writes worlds, a list of (name, colDimension, rowDimension, wumpus,
+    # gold, pits) tuples where the last three are lists of (c, r)
+    # pairs, to a packed corpus. Records are written as they are packed
+    # and the index is filled in at the end.
+    index  = []
+    offset = HEADER.size + 8 * len(worlds)
+
+    with open ( filename, "wb" ) as file:
+        file.write ( HEADER.pack ( MAGIC, VERSION, len(worlds) ) )
+        file.write ( b"\0" * (8 * len(worlds)) )
+
+        for world in worlds:
+            record = packRecord ( *world )
+            file.write ( record )
+            index.append ( offset )
+            offset += len(record)
+
+        file.seek ( HEADER.size )
+        file.write ( struct.pack ( "<" + str(len(index)) + "Q", *index ) )
+
+def packRecord ( name, colDimension, rowDimension, wumpus, gold, pits ):
+    # Returns the bytes of one record; its length is a multiple of 4
+    name   = name.encode ( "utf-8" )
+    values = [ colDimension, rowDimension, len(wumpus), len(gold), len(pits), len(name) ]
+    for c, r in list(wumpus) + list(gold) + list(pits):
+        values += [ c, r ]
+
+    return struct.pack ( "<" + str(len(values)) + "i", *values ) + name + b"\0" * (-len(name) % 4)
+
+def worldDigest ( record ):
+    # Returns a hash of a world's contents, the same for a world file
+    # and its record in a corpus, whatever its name
+    return hashlib.sha256 ( packRecord ( "", record.colDimension, record.rowDimension,
+                                         record.wumpus, record.gold, record.pits ) ).hexdigest()
+
+def readWorldFile ( filename ):
+    # Returns a world file as a (name, colDimension, rowDimension,
+    # wumpus, gold, pits) tuple
+    world = readWorld ( filename )
+
+    return ( os.path.basename(filename), world.colDimension, world.rowDimension,
+             world.wumpus, world.gold, world.pits )
+
+def convertFolder ( folder, filename ):
+    names = sorted ( os.listdir ( folder ) )
+    writeCorpus ( filename, [ readWorldFile ( os.path.join ( folder, name ) ) for name in names ] )
+    return len(names)
+
+def main ( ):
+    args = sys.argv
+
+    if len(args) != 3:
+        print ( "Usage: python3 Corpus.py InputFolder OutputFile" )
+        return
+
+    try:
+        count = convertFolder ( args[1], args[2] )
+    except Exception as error:
+        print ( "[ERROR] Failed to convert folder: " + str(error) )
+        return
+
+    print ( "Packed " + str(count) + " worlds into " + args[2] + "." )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# ======================================================================
+# FILE:        Knowledge.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the knowledge base, a reusable
+#              inference engine for agents. It follows the agent's
+#              position from its own actions, and works out what the
+#              percepts say about the cells around it, so an agent can
+#              ask which cells are safe, which are deadly, and which safe
+#              cells it hasn't visited yet (the safe frontier):
+#
+#                   def getAction ( self, stench, breeze, glitter, bump, scream ):
+#                       self.knowledge.perceive ( stench, breeze, glitter, bump, scream )
+#                       action = ...
+#                       self.knowledge.act ( action )
+#                       return action
+#
+#              Every cell's facts (visited, breeze, stench, no pit, no
+#              wumpus, pit, wumpus) are kept as one small bitset. A
+#              percept only touches the facts of the agent's cell and
+#              its neighbors, and the rules below are only re-checked
+#              for the cells whose facts changed, so a move costs the
+#              same on any board, and every query is a lookup:
+#
+#              - A visited cell has no pit and no living wumpus.
+#
+#              - No breeze (stench) in a visited cell: none of its
+#                neighbors has a pit (wumpus).
+#
+#              - A breeze (stench) in a visited cell, with every
+#                neighbor but one known to be clear: that one has a pit
+#                (wumpus).
+#
+#              - With one wumpus, it is in every stench cell's
+#                neighborhood; once only one cell fits them all, every
+#                other cell is clear of it.
+#
+#              - A bump is the edge of the board: the agent learns the
+#                number of columns or rows, and cells past the edge stop
+#                counting as neighbors.
+#
+#              - The arrow kills every wumpus in its line, so the cells
+#                in the line are clear after a shot. With one wumpus, a
+#                scream means it is dead, and every cell is clear of it.
+#
+# NOTES:       - Directions follow the World class: 0 is right, 1 is
+#                down, 2 is left and 3 is up. The agent starts at (0, 0)
+#                facing right, with the arrow.
+#
+#              - Pass singleWumpus=False for worlds with more than one
+#                wumpus; the rules that count on one wumpus are skipped,
+#                and since a killed wumpus keeps its stench, stenches
+#                stop pointing to a wumpus after a scream.
+#
+#              - The facts are kept per cell, in a dict keyed by (c, r),
+#                rather than as board-wide bitsets. A board-wide mask is
+#                a Python int, which is copied whole on every change, so
+#                every update would cost as much as the board's area.
+#
+#              - Any agent can import this file, including one entered
+#                in Tournament.py, which runs from this folder.
+# ======================================================================
+
+from Agent import Agent
+
+# Facts about a cell, as bits
+VISITED   = 1
+BREEZE    = 2
+STENCH    = 4
+NO_PIT    = 8
+NO_WUMPUS = 16
+PIT       = 32
+WUMPUS    = 64
+
+# Where a step forward goes, by direction
+STEPS = ( ( 1, 0 ), ( 0, -1 ), ( -1, 0 ), ( 0, 1 ) )
+
+class Knowledge():
+
+    def __init__ ( self, singleWumpus = True ):
+        # The agent
+        self.x        = 0
+        self.y        = 0
+        self.facing   = 0
+        self.hasArrow = True
+        self.looted   = False
+        self.glitter  = False
+
+        # The board, as far as it is known; None until a bump
+        self.cols     = None
+        self.rows     = None
+
+        # The facts of every cell anything is known about, by (c, r)
+        self.__facts      = {}
+        self.__breezes    = set()
+        self.__stenches   = set()
+
+        # Safe cells not visited yet, and cells known to have no pit
+        # that may still have a wumpus
+        self.__frontier   = set()
+        self.__pending    = set()
+
+        # The wumpus: where it can be, where it is, whether it is dead,
+        # and the line the arrow cleared
+        self.__single     = singleWumpus
+        self.__candidates = None
+        self.__wumpus     = None
+        self.__dead       = False
+        self.__shot       = None
+        self.__screamed   = False
+
+        # The last action, and where a move forward started
+        self.__last       = None
+        self.__from       = None
+
+    # ===============================================================
+    # =                 Agent Functions
+    # ===============================================================
+
+    def perceive ( self, stench, breeze, glitter, bump, scream ):
+        # Takes in the percepts of a turn, before the agent acts
+        if self.__last == Agent.Action.FORWARD and bump:
+            self.x, self.y = self.__from
+            self.__learnEdge()
+
+        if self.__last == Agent.Action.SHOOT:
+            self.__shot     = ( self.x, self.y, self.facing )
+            self.__screamed = scream
+            if scream and self.__single:
+                self.__dead = True
+            self.__wake()
+
+        self.glitter = glitter
+        self.__last  = None
+        self.__visit ( ( self.x, self.y ), stench, breeze )
+
+    def act ( self, action ):
+        # Takes in the action the agent chose this turn
+        self.__last = action
+
+        if action == Agent.Action.TURN_LEFT:
+            self.facing = (self.facing + 3) % 4
+
+        elif action == Agent.Action.TURN_RIGHT:
+            self.facing = (self.facing + 1) % 4
+
+        elif action == Agent.Action.FORWARD:
+            # Known edges bump without moving; unknown ones are found
+            # by the bump in the next percepts
+            self.__from = ( self.x, self.y )
+            dx, dy = STEPS[self.facing]
+            if self.__inBounds ( self.x + dx, self.y + dy ):
+                self.x += dx
+                self.y += dy
+
+        elif action == Agent.Action.SHOOT:
+            if self.hasArrow:
+                self.hasArrow = False
+            else:
+                self.__last = None
+
+        elif action == Agent.Action.GRAB:
+            if self.glitter:
+                self.looted = True
+
+    # ===============================================================
+    # =                 Queries
+    # ===============================================================
+
+    def isVisited ( self, c, r ):
+        return self.__facts.get ( ( c, r ), 0 ) & VISITED != 0
+
+    def isSafe ( self, c, r ):
+        # Whether the cell is known to have no pit and no living wumpus
+        cell  = ( c, r )
+        facts = self.__facts.get ( cell, 0 )
+        return facts & NO_PIT != 0 and self.__inBounds ( c, r ) and self.__noWumpus ( cell, facts )
+
+    def isDeadly ( self, c, r ):
+        # Whether the cell is known to have a pit or a living wumpus
+        cell  = ( c, r )
+        facts = self.__facts.get ( cell, 0 )
+        if facts & PIT:
+            return True
+        if facts & WUMPUS or cell == self.__wumpus:
+            return not self.__dead and not self.__inShot ( cell )
+        return False
+
+    def frontier ( self ):
+        # The safe cells the agent hasn't visited, as a set of (c, r);
+        # it is the knowledge base's own set, so don't change it
+        return self.__frontier
+
+    def wumpus ( self ):
+        # Where the wumpus is, if it is known and alive; with more than
+        # one wumpus, always None
+        if self.__wumpus == None or self.__dead or self.__inShot ( self.__wumpus ):
+            return None
+        return self.__wumpus
+
+    def isWumpusDead ( self ):
+        return self.__dead
+
+    def isPitFree ( self, c, r ):
+        return self.__facts.get ( ( c, r ), 0 ) & NO_PIT != 0
+
+    def isWumpusFree ( self, c, r ):
+        # Whether the cell is known to have no living wumpus
+        return self.__noWumpus ( ( c, r ), self.__facts.get ( ( c, r ), 0 ) )
+
+    def wumpusCandidates ( self ):
+        # The cells the one wumpus can be in, as a set of (c, r), once a
+        # stench has narrowed them down; otherwise None. Some of them may
+        # since have been cleared by the arrow
+        return self.__candidates
+
+    def breezes ( self ):
+        # The visited cells with a breeze; don't change the set
+        return self.__breezes
+
+    def stenches ( self ):
+        # The visited cells with a stench; don't change the set
+        return self.__stenches
+
+    def neighbors ( self, c, r ):
+        # The cells next to (c, r), without the ones known to be off the
+        # board
+        return [ ( c + dx, r + dy ) for dx, dy in STEPS if self.__inBounds ( c + dx, r + dy ) ]
+
+    # ===============================================================
+    # =                 Inference
+    # ===============================================================
+
+    def __visit ( self, cell, stench, breeze ):
+        facts = self.__facts.get ( cell, 0 )
+        if facts & VISITED:
+            return
+        self.__facts[cell] = facts | VISITED
+        self.__frontier.discard ( cell )
+        self.__pending.discard ( cell )
+        self.__mark ( cell, NO_PIT )
+        self.__mark ( cell, NO_WUMPUS )
+
+        neighbors = self.neighbors ( *cell )
+        if breeze:
+            self.__facts[cell] |= BREEZE
+            self.__breezes.add ( cell )
+            self.__checkBreeze ( cell )
+        else:
+            for neighbor in neighbors:
+                self.__mark ( neighbor, NO_PIT )
+
+        if stench:
+            self.__facts[cell] |= STENCH
+            self.__stenches.add ( cell )
+            if self.__single:
+                near = { n for n in neighbors if not self.__noWumpus ( n, self.__facts.get ( n, 0 ) ) }
+                self.__candidates = near if self.__candidates == None else self.__candidates & near
+                self.__settle()
+            else:
+                self.__checkStench ( cell )
+        else:
+            for neighbor in neighbors:
+                self.__mark ( neighbor, NO_WUMPUS )
+
+    def __mark ( self, cell, fact ):
+        # Adds a fact to a cell, and re-checks what depends on it
+        facts = self.__facts.get ( cell, 0 )
+        if facts & fact:
+            return
+        self.__facts[cell] = facts | fact
+
+        if fact == NO_PIT:
+            for neighbor in self.neighbors ( *cell ):
+                if neighbor in self.__breezes:
+                    self.__checkBreeze ( neighbor )
+
+        elif fact == NO_WUMPUS:
+            if self.__candidates != None and cell in self.__candidates:
+                self.__candidates.discard ( cell )
+                self.__settle()
+            if not self.__single:
+                for neighbor in self.neighbors ( *cell ):
+                    if neighbor in self.__stenches:
+                        self.__checkStench ( neighbor )
+
+        self.__place ( cell )
+
+    def __checkBreeze ( self, cell ):
+        unknown = [ n for n in self.neighbors ( *cell ) if not self.__facts.get ( n, 0 ) & NO_PIT ]
+        if len(unknown) == 1:
+            self.__facts[unknown[0]] = self.__facts.get ( unknown[0], 0 ) | PIT
+
+    def __checkStench ( self, cell ):
+        # A killed wumpus leaves its stench, so once one has died a
+        # stench no longer points to a living wumpus
+        if self.__screamed:
+            return
+        unknown = [ n for n in self.neighbors ( *cell ) if not self.__noWumpus ( n, self.__facts.get ( n, 0 ) ) ]
+        if len(unknown) == 1:
+            self.__facts[unknown[0]] = self.__facts.get ( unknown[0], 0 ) | WUMPUS
+
+    def __settle ( self ):
+        # With one wumpus, once only one cell can hold it, it is there
+        if self.__wumpus == None and self.__candidates != None and len(self.__candidates) == 1:
+            self.__wumpus = next ( iter ( self.__candidates ) )
+            self.__facts[self.__wumpus] = self.__facts.get ( self.__wumpus, 0 ) | WUMPUS
+            self.__wake()
+
+    def __wake ( self ):
+        # Something cleared many cells of the wumpus at once; only the
+        # cells waiting on it can join the frontier
+        for cell in list ( self.__pending ):
+            self.__place ( cell )
+
+    def __place ( self, cell ):
+        # Puts a cell in the frontier, or the pending set, or neither
+        facts = self.__facts.get ( cell, 0 )
+        if facts & VISITED or not facts & NO_PIT or not self.__inBounds ( *cell ):
+            self.__frontier.discard ( cell )
+            self.__pending.discard ( cell )
+        elif self.__noWumpus ( cell, facts ):
+            self.__frontier.add ( cell )
+            self.__pending.discard ( cell )
+        else:
+            self.__pending.add ( cell )
+
+    def __noWumpus ( self, cell, facts ):
+        if facts & NO_WUMPUS or self.__dead:
+            return True
+        if self.__wumpus != None and self.__wumpus != cell:
+            return True
+        return self.__inShot ( cell )
+
+    def __inShot ( self, cell ):
+        if self.__shot == None:
+            return False
+        x, y, facing = self.__shot
+        c, r = cell
+        if facing == 0: return r == y and c >= x
+        if facing == 1: return c == x and r <= y
+        if facing == 2: return r == y and c <= x
+        return c == x and r >= y
+
+    # ===============================================================
+    # =                 Edges
+    # ===============================================================
+
+    def __learnEdge ( self ):
+        # The agent bumped into the right or top edge
+        if self.facing == 0:
+            self.cols = self.x + 1
+        elif self.facing == 3:
+            self.rows = self.y + 1
+        else:
+            return
+
+        # Cells past the edge leave the frontier and the wumpus's
+        # candidates, and breeze and stench cells on the edge have
+        # fewer neighbors to blame
+        for cell in list ( self.__frontier ) + list ( self.__pending ):
+            self.__place ( cell )
+        if self.__candidates != None:
+            self.__candidates = { cell for cell in self.__candidates if self.__inBounds ( *cell ) }
+            self.__settle()
+        for cell in list ( self.__breezes ):
+            self.__checkBreeze ( cell )
+        if not self.__single:
+            for cell in list ( self.__stenches ):
+                self.__checkStench ( cell )
+
+    def __inBounds ( self, c, r ):
+        return ( c >= 0 and r >= 0 and ( self.cols == None or c < self.cols )
+                 and ( self.rows == None or r < self.rows ) )
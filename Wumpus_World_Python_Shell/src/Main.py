@@ -17,16 +17,93 @@
 #                  Options:
 #                       -m Use the ManualAI instead of MyAI.
 #                       -r Use the RandomAI instead of MyAI.
+#                      -a AGENT Use another agent instead of MyAI, named
+#                         by module:Class (e.g. agents.planner:PlannerAI)
+#                         or by a name in Registry.py. Only that agent's
+#                         module is imported.
 #                      -d Debug mode, which displays the game board
 #                         after every mode. Useless with -m.
 #                      -h Displays help menu and quits.
 #                      -v Verbose mode displays world file names before
-#                         loading them.
+#                         loading them, and how long starting up took:
+#                         importing the shell, and loading the agent in
+#                         every process.
 #                      -f treats the InputFile as a folder containing
 #                         worlds. This will trigger the program to
 #                         display the average score and standard
 #                         deviation instead of a single score. InputFile
-#                         must be entered with this option.
+#                         must be entered with this option. A packed
+#                         corpus made by Corpus.py can be given in
+#                         place of the folder.
+#                      -j N Runs the worlds of a folder across N worker
+#                         processes. Only useful with -f.
+#                      -b N Plays the worlds of a folder N at a time in
+#                         lockstep with the BatchWorld engine, which is
+#                         faster on boards of about 16x16 and up; on 4x4
+#                         boards one World at a time is faster. Requires
+#                         NumPy. Only useful with -f or -n; useless with
+#                         -d and -m.
+#                      -n N Plays N random worlds generated in memory,
+#                         and displays the average score and standard
+#                         deviation like -f. No InputFile is used, so
+#                         the only argument is the OutputFile.
+#                      --seed S Seeds the random worlds of -n. World i
+#                         is the same for a given seed, whatever -j and
+#                         -b are.
+#                      -t FILE Times every step, splitting the time the
+#                         agent's getAction takes from the time the
+#                         engine takes, and writes the latencies (mean,
+#                         p50, p99, max) of every world, and of all of
+#                         them together, to FILE as JSON. Useless with
+#                         -b.
+#                      -x DIR Records every game as a binary trace in
+#                         DIR, one traces_<time>_<run>_<pid>.wwt file
+#                         per process, named by when the run started,
+#                         so every run has its own files. Traces are
+#                         read and replayed with Trace.py.
+#                         Useless with -b.
+#                      -o FILE Writes one row per world to FILE as soon
+#                         as the world is over: its name, score, steps,
+#                         outcome (died, climbed or timeout) and whether
+#                         the gold was looted. FILE is written as CSV if
+#                         its name ends in .csv, and as JSON Lines
+#                         otherwise, ending with a summary of the score
+#                         distribution, which is also displayed.
+#                      --tolerance T Adaptive mode: plays the worlds in a
+#                         random order, a round at a time, and stops once
+#                         the 95% confidence interval of the average
+#                         score is within T points either side. The
+#                         interval and the number of worlds played are
+#                         displayed with the average. Only useful with
+#                         -f or -n.
+#                      --budget N Plays at most N worlds, drawn at random,
+#                         with or without --tolerance.
+#                      --move-limit S Gives the agent S seconds for each
+#                         move. An agent that goes over its time
+#                         forfeits the game, losing 1000 points, and the
+#                         world's outcome is "forfeit". Turns off -b.
+#                      --game-limit S Gives the agent S seconds for all
+#                         its moves in a game, the same way.
+#                      --every N Debug mode only draws every Nth step.
+#                      --events Debug mode only draws the steps where
+#                         the gold is grabbed or the wumpus screams,
+#                         and the first and last step. With --every,
+#                         every Nth step is drawn as well.
+#                      --viewport R Debug mode only draws the cells
+#                         within R columns and rows of the agent, for
+#                         large boards.
+#                      --board B Keeps the worlds in a tile, bit or
+#                         sparse board from Board.py (tile by default).
+#                         sparse is the one for very large worlds with
+#                         few features. Useless with -b.
+#                      --oracle FILE Works out the best achievable score
+#                         of every world with Oracle.py, caching them in
+#                         FILE, and displays the achievable averages
+#                         with full knowledge and with safe exploration,
+#                         how far the agent's average is below each, and
+#                         the agent's average as a fraction of each,
+#                         which is nan unless both are positive. Only
+#                         useful with -f.
 #
 #                  InputFile: A path to a valid Wumpus World File, or
 #                             folder with -f. This is optional unless
@@ -36,14 +113,49 @@
 #                              be written. This is optional.
 #
 #              - If -m and -r are turned on, -m will be turned off.
+#                With -a, both are turned off.
 #
-#              - Don't make changes to this file.
+#              - Options that take a value (-a, -j, -b, -n, -t, -x, -o, --seed,
+#                --tolerance, --budget, --move-limit, --game-limit,
+#                --every, --viewport, --board, --oracle) read it from the
+#                next argument, e.g. "-fj 8 Worlds".
+#
+#              - The order of the worlds in adaptive mode is drawn from
+#                --seed, so a run can be repeated.
+#
+#              - Agents are written in MyAI.py, or loaded with -a, not
+#                here. This file is only the command line and the
+#                runners that spread the worlds across processes and
+#                batches; the games themselves are played by World.py.
 # ======================================================================
 
+import time
+
+# When the shell started importing, to report how long starting up took
+STARTED = time.perf_counter()
+
 import sys
 import os
 import math
+import random
+import json
+import multiprocessing
+import Registry
 from World import World
+from Board import TileBoard, BOARDS
+from Corpus import Corpus, isCorpus, readWorlds
+from Worlds import RandomWorlds, readWorld, isNumber
+from Timing import StepTimer
+from Trace import TraceRecorder
+from Render import Renderer
+from Results import ResultStream, ResultStats
+from Budget import TimeBudget
+
+# How long importing the shell took, in seconds
+IMPORTED = time.perf_counter() - STARTED
+
+# Adaptive mode plays at least this many worlds before it stops
+MIN_WORLDS = 30
 
 def main ( ):
     args = sys.argv
@@ -60,15 +172,88 @@ def main ( ):
     verbose    = False
     randomAI   = False
     manualAI   = False
+    agent      = ""
     folder     = False
+    jobs       = 1
+    batchSize  = 1
+    numOfRandomWorlds = 0
+    seed       = None
+    timingFile = ""
+    traceFolder = ""
+    resultsFile = ""
+    tolerance  = 0
+    budget     = 0
+    moveLimit  = 0
+    gameLimit  = 0
+    every      = 1
+    events     = False
+    viewport   = 0
+    board      = None
+    oracleFile = ""
     worldFile  = ""
     outputFile = ""
-    firstToken = args[1]
+    positional = []
+
+    # Parse Options and Arguments
+    index = 1
+    while index < len(args):
+        token  = args[index]
+        index += 1
+
+        if token[0] != '-':
+            positional.append ( token )
+            continue
+
+        if token == "--seed" and index < len(args) and args[index].isdigit():
+            seed   = int(args[index])
+            index += 1
+            continue
+
+        if token == "--tolerance" and index < len(args) and isNumber ( args[index] ):
+            tolerance = float(args[index])
+            index    += 1
+            continue
+
+        if token == "--budget" and index < len(args) and args[index].isdigit():
+            budget = int(args[index])
+            index += 1
+            continue
+
+        if token == "--move-limit" and index < len(args) and isNumber ( args[index] ):
+            moveLimit = float(args[index])
+            index    += 1
+            continue
+
+        if token == "--game-limit" and index < len(args) and isNumber ( args[index] ):
+            gameLimit = float(args[index])
+            index    += 1
+            continue
+
+        if token == "--every" and index < len(args) and args[index].isdigit():
+            every  = max ( 1, int(args[index]) )
+            index += 1
+            continue
+
+        if token == "--viewport" and index < len(args) and args[index].isdigit():
+            viewport = int(args[index])
+            index   += 1
+            continue
+
+        if token == "--board" and index < len(args) and args[index] in BOARDS:
+            board  = BOARDS[args[index]]
+            index += 1
+            continue
+
+        if token == "--events":
+            events = True
+            continue
+
+        if token == "--oracle" and index < len(args):
+            oracleFile = args[index]
+            index     += 1
+            continue
 
-    # If there are options
-    if firstToken[0] == '-':
-        # Parse Options
-        for char in firstToken[1:]:
+        for char in token[1:]:
             if char == '-':
                 continue
             elif char == 'f' or char == 'F':
@@ -81,49 +266,142 @@ def main ( ):
                 manualAI = True
             elif char == 'd' or char == 'D':
                 debug = True
+            elif ( char == 'a' or char == 'A' ) and index < len(args):
+                agent  = args[index]
+                index += 1
+            elif ( char == 'j' or char == 'J' ) and index < len(args) and args[index].isdigit():
+                jobs   = max ( 1, int(args[index]) )
+                index += 1
+            elif ( char == 'b' or char == 'B' ) and index < len(args) and args[index].isdigit():
+                batchSize = max ( 1, int(args[index]) )
+                index    += 1
+            elif ( char == 'n' or char == 'N' ) and index < len(args) and args[index].isdigit():
+                numOfRandomWorlds = int(args[index])
+                index += 1
+            elif ( char == 't' or char == 'T' ) and index < len(args):
+                timingFile = args[index]
+                index     += 1
+            elif ( char == 'x' or char == 'X' ) and index < len(args):
+                traceFolder = args[index]
+                index      += 1
+            elif ( char == 'o' or char == 'O' ) and index < len(args):
+                resultsFile = args[index]
+                index      += 1
             else:
-                print ( "Wumpus_World [Options] [InputFile] [OutputFile]" )
-                print ( )
-                print ( "Options:" )
-                print ( "\t-m Use the ManualAI instead of MyAI." )
-                print ( "\t-r Use the RandomAI instead of MyAI." )
-                print ( "\t-d Debug mode, which displays the game board" )
-                print ( "\t   after every mode. Useless with -m." )
-                print ( "\t-h Displays help menu and quits." )
-                print ( "\t-f treats the InputFile as a folder containing" )
-                print ( "\t   worlds. This will trigger the program to" )
-                print ( "\t   display the average score and standard" )
-                print ( "\t   deviation instead of a single score. InputFile" )
-                print ( "\t   must be entered with this option." )
-                print ( )
-                print ( "InputFile: A path to a valid Wumpus World File, or" )
-                print ( "           folder with -f. This is optional unless" )
-                print ( "           used with -f." )
-                print ( )
-                print ( "OutputFile: A path to a file where the results will" )
-                print ( "            be written. This is optional." )
-                print ( )
+                printHelp()
                 return;
 
-        if randomAI and manualAI:
-            # If both AI's on, turn one off and let the user know.
-            manualAI = False
-            print("[WARNING] Manual AI and Random AI both on; Manual AI was turned off.")
+    if randomAI and manualAI:
+        # If both AI's on, turn one off and let the user know.
+        manualAI = False
+        print("[WARNING] Manual AI and Random AI both on; Manual AI was turned off.")
 
-        if len(args) >= 3:
-            worldFile = args[2]
-        if len(args) >= 4:
-            outputFile = args[3]
-    else:
-        if len(args) >= 2:
-            worldFile = args[1]
-        if len(args) >= 3:
-            outputFile = args[2]
+    if agent != "" and ( randomAI or manualAI ):
+        # The named agent takes the place of both
+        randomAI = False
+        manualAI = False
+        print("[WARNING] An agent was named with -a; Manual AI and Random AI were turned off.")
+
+    if agent == "":
+        agent = "RandomAI" if randomAI else "ManualAI" if manualAI else "MyAI"
+
+    if jobs > 1 and ( debug or manualAI ):
+        # Worker processes can't share the terminal, so run serially.
+        jobs = 1
+        print("[WARNING] Debug mode and Manual AI need a terminal; -j was turned off.")
+
+    if batchSize > 1 and ( debug or manualAI ):
+        # The batch engine has no board display or manual play
+        batchSize = 1
+        print("[WARNING] Debug mode and Manual AI play one world at a time; -b was turned off.")
+
+    if batchSize > 1 and timingFile != "":
+        # The batch engine steps every world at once
+        timingFile = ""
+        print("[WARNING] Steps can't be timed in batches; -t was turned off.")
+
+    if batchSize > 1 and traceFolder != "":
+        # The batch engine doesn't go through the agent wrappers
+        traceFolder = ""
+        print("[WARNING] Games can't be traced in batches; -x was turned off.")
+
+    if batchSize > 1 and ( moveLimit > 0 or gameLimit > 0 ):
+        # The batch engine can't stop one agent without the others
+        batchSize = 1
+        print("[WARNING] Time limits are kept one world at a time; -b was turned off.")
+
+    if batchSize > 1 and board != None:
+        # The batch engine keeps every world in its own arrays
+        print("[WARNING] The batch engine has no boards; --board was ignored.")
+
+    if board == None:
+        board = TileBoard
+
+    if verbose:
+        print ( "Imported the shell in " + milliseconds ( IMPORTED ) )
+
+    # Load the agent up front, so a bad name is reported once; worker
+    # processes load it again only if they don't start as a copy of this
+    try:
+        loadAgentClass ( agent, verbose )
+    except Exception as error:
+        print ( "[ERROR] Failed to load agent: " + str(error) )
+        return
+
+    if traceFolder != "" and not os.path.isdir ( traceFolder ):
+        try:
+            os.makedirs ( traceFolder )
+        except OSError:
+            print ( "[ERROR] Failed to create trace directory." )
+            return
+
+    # Every run writes its own trace files, named by when it started and
+    # by this process, so a later run never appends to them
+    tracePrefix = ""
+    if traceFolder != "":
+        tracePrefix = os.path.join ( traceFolder, "traces_" + time.strftime ( "%Y%m%d-%H%M%S" ) + "_" + str(os.getpid()) + "_" )
+
+    if batchSize > 1:
+        try:
+            import BatchWorld
+        except ImportError:
+            print ( "[ERROR] The -b option requires NumPy." )
+            return
+
+    timeBudget = None
+    if moveLimit > 0 or gameLimit > 0:
+        timeBudget = TimeBudget ( moveLimit, gameLimit )
+
+    renderer = None
+    if every > 1 or events or viewport > 0:
+        if debug:
+            renderer = Renderer ( every, events, viewport )
+        else:
+            print("[WARNING] --every, --events and --viewport only change debug mode.")
+
+    if oracleFile != "" and ( numOfRandomWorlds > 0 or not folder ):
+        # Random worlds aren't kept, so there is nothing to cache
+        oracleFile = ""
+        print("[WARNING] --oracle only works with the worlds of a folder or corpus; it was turned off.")
+
+    if len(positional) >= 1:
+        worldFile = positional[0]
+    if len(positional) >= 2:
+        outputFile = positional[1]
+
+    if numOfRandomWorlds > 0:
+        # Random worlds need no InputFile, so the only argument is the
+        # OutputFile. Without a seed, draw one for all the workers.
+        if seed == None:
+            seed = random.randrange ( 1 << 32 )
+        runWorlds ( RandomWorlds ( seed ), range ( numOfRandomWorlds ), worldFile,
+                    jobs, batchSize, debug, randomAI, manualAI, verbose, timingFile, tracePrefix, resultsFile, renderer, tolerance, budget, seed, timeBudget, agent=agent, board=board )
+        return
 
     if worldFile == "":
         if folder:
             print ( "[WARNING] No folder specified; running on a random world." )
-        world = World ( debug, randomAI, manualAI )
+        world = World ( debug, randomAI, manualAI, board=board, agent=loadAgentClass ( agent )(), renderer=renderer )
         score = world.run()
         print ( "The agent scored: " + str(score) )
         return
@@ -132,66 +410,46 @@ def main ( ):
         listOfWorlds = None
         
         try:
-            listOfWorlds = os.listdir ( worldFile )
+            if isCorpus ( worldFile ):
+                with Corpus ( worldFile ) as corpus:
+                    listOfWorlds = range ( len(corpus) )
+            else:
+                listOfWorlds = os.listdir ( worldFile )
+        except ValueError as error:
+            print ( "[ERROR] Failed to open corpus: " + str(error) )
+            return
         except:
             print ( "[ERROR] Failed to open directory." )
             return
 
-        numOfScores = 0
-        sumOfScores = 0
-        sumOfScoresSquared = 0
-
-        for file in listOfWorlds:
-            if verbose:
-                print ( "Running world: " + str(file) )
-
-            score = None
-            try:
-                newLineDelim = "\n"
-                if "\r\n".encode() in open(worldFile + "/" + file,"rb").read():
-                    newLineDelim = "\r\n"
-                world = World ( debug, randomAI, manualAI, open ( worldFile + "/" + file, 'r', newline=newLineDelim ) )
-                score = world.run()
-            except Exception:
-                numOfScores = 0
-                sumOfScores = 0
-                sumOfScoresSquared = 0
-                break;
-
-            numOfScores += 1
-            sumOfScores += score
-            sumOfScoresSquared += score*score
-
-        avg = None
-        std_dev = None
-        
-        if numOfScores != 0:
-            avg = sumOfScores / numOfScores
-            std_dev = math.sqrt ( (sumOfScoresSquared - ((sumOfScores*sumOfScores) / numOfScores) ) / numOfScores)
-        else:
-            avg = float('nan')
-            std_dev = float('nan')
-
-        if outputFile == "":
-            print ( "The agent's average score: " + str(avg) )
-            print ( "The agent's standard deviation: " + str(std_dev) )
-        else:
-            outFile = open ( outputFile, 'w' )
-            outFile.write ( "SCORE: " + str(avg) + '\n' )
-            outFile.write ( "STDEV: " + str(std_dev) )
-            outFile.close ( )
-
+        runWorlds ( worldFile, listOfWorlds, outputFile, jobs, batchSize, debug, randomAI, manualAI, verbose, timingFile, tracePrefix, resultsFile, renderer, tolerance, budget, seed, timeBudget, oracleFile, agent, board )
         return
 
     try:
         if verbose:
             print ( "Running world: " + worldFile )
 
-        newLineDelim = "\n"
-        if "\r\n".encode() in open(worldFile,"rb").read():
-            newLineDelim = "\r\n"
-        world = World ( debug, randomAI, manualAI, open ( worldFile, 'rt', newline=newLineDelim ) )
+        timer    = StepTimer() if timingFile != "" else None
+        recorder = openTrace ( tracePrefix )
+        world    = World ( debug, randomAI, manualAI, board=board, agent=loadAgentClass ( agent )(), record=readWorld ( worldFile ), timer=timer, recorder=recorder, renderer=renderer, budget=timeBudget )
+        if recorder != None:
+            recorder.label = os.path.basename ( worldFile )
         score = world.run()
+        if recorder != None:
+            recorder.close()
+
+        if timeBudget != None and world.outcome() == "forfeit":
+            print ( "[WARNING] The agent ran out of time; the game was forfeited." )
+
+        if resultsFile != "":
+            state  = world.state()
+            stream = ResultStream ( resultsFile, create=True )
+            stream.write ( os.path.basename ( worldFile ), score, state["steps"], world.outcome(), state["goldLooted"] )
+            stream.writeSummary ( stream.stats )
+            stream.close()
+
+        if timer != None:
+            writeTiming ( timingFile, timer, [ dict ( world=worldFile, **timer.summary() ) ] )
 
         if outputFile == "":
             print ( "The agent scored: " + str(score) )
@@ -205,4 +463,455 @@ def main ( ):
     except Exception:
         print ( "[ERROR] Failure to open file." )
 
-main()
+# ======================================================================
+# =                 Folder Evaluation
+# ======================================================================
+
+def runWorlds ( source, listOfWorlds, outputFile, jobs, batchSize, debug, randomAI, manualAI, verbose, timingFile, tracePrefix, resultsFile, renderer, tolerance = 0, budget = 0, seed = None, timeBudget = None, oracleFile = "", agent = "MyAI", board = TileBoard ):
+    # Plays the worlds of a folder, corpus or stream of random worlds,
+    # and outputs the average score and standard deviation. With a
+    # tolerance or budget, plays them adaptively. With an oracle file,
+    # also outputs the achievable averages over all the worlds. The
+    # agent is named as in Registry.py, and the worlds are kept in the
+    # board class from Board.py.
+    results  = None
+    timing   = timingFile != ""
+    adaptive = tolerance > 0 or budget > 0
+
+    if resultsFile != "":
+        # Start the file once; every process appends its rows to it
+        try:
+            ResultStream ( resultsFile, create=True ).close()
+        except OSError:
+            print ( "[ERROR] Failure to write to results file." )
+            return
+
+    # Adaptive rounds share one pool of workers, so each round doesn't
+    # start its own processes and load the agent again
+    pool = None
+
+    def play ( worlds ):
+        if jobs > 1 and len(worlds) > 1:
+            return runFolderParallel ( source, worlds, jobs, batchSize, debug, randomAI, manualAI, verbose, timing, tracePrefix, resultsFile, timeBudget, agent, board, pool )
+        return runFolder ( source, worlds, batchSize, debug, randomAI, manualAI, verbose, timing, tracePrefix, resultsFile, renderer, timeBudget, agent, board )
+
+    if adaptive:
+        if jobs > 1:
+            pool = multiprocessing.Pool ( jobs )
+        try:
+            results = runAdaptive ( listOfWorlds, play, max ( 100 * jobs, batchSize ), tolerance, budget, seed )
+        finally:
+            if pool != None:
+                pool.terminate()
+    else:
+        results = play ( listOfWorlds )
+
+    numOfScores = 0
+    sumOfScores = 0
+    sumOfScoresSquared = 0
+
+    if results != None:
+        numOfScores, sumOfScores, sumOfScoresSquared, timings, stats = results
+
+        if timing:
+            writeTiming ( timingFile, timings[0], timings[1] )
+
+        if resultsFile != "":
+            writeSummary ( resultsFile, stats )
+
+    avg = None
+    std_dev = None
+    
+    if numOfScores != 0:
+        avg = sumOfScores / numOfScores
+        std_dev = math.sqrt ( (sumOfScoresSquared - ((sumOfScores*sumOfScores) / numOfScores) ) / numOfScores)
+    else:
+        avg = float('nan')
+        std_dev = float('nan')
+
+    oracle = None
+    if oracleFile != "":
+        oracle = runOracleAverages ( source, listOfWorlds, oracleFile, jobs )
+
+    if outputFile == "":
+        print ( "The agent's average score: " + str(avg) )
+        print ( "The agent's standard deviation: " + str(std_dev) )
+        if adaptive:
+            halfWidth = confidence ( numOfScores, sumOfScores, sumOfScoresSquared )
+            print ( "The agent's 95% confidence interval: [" + str(avg - halfWidth) + ", " + str(avg + halfWidth) + "]" )
+            print ( "Worlds played: " + str(numOfScores) + " of " + str(len(listOfWorlds)) )
+        if oracle != None:
+            print ( "The achievable average score: " + str(oracle[0]) + " with full knowledge, " +
+                    str(oracle[1]) + " with safe exploration" )
+            print ( "The agent's gap to the achievable score: " + str(oracle[0] - avg) +
+                    " below full knowledge, " + str(oracle[1] - avg) + " below safe exploration" )
+            print ( "The agent's fraction of the achievable score: " + str(fraction ( avg, oracle[0] )) +
+                    " of full knowledge, " + str(fraction ( avg, oracle[1] )) + " of safe exploration" )
+    else:
+        outFile = open ( outputFile, 'w' )
+        outFile.write ( "SCORE: " + str(avg) + '\n' )
+        outFile.write ( "STDEV: " + str(std_dev) )
+        if adaptive:
+            outFile.write ( "\nCI95: " + str(confidence ( numOfScores, sumOfScores, sumOfScoresSquared )) )
+            outFile.write ( "\nWORLDS: " + str(numOfScores) )
+        if oracle != None:
+            outFile.write ( "\nORACLE: " + str(oracle[0]) + " " + str(oracle[1]) )
+            outFile.write ( "\nGAP: " + str(oracle[0] - avg) + " " + str(oracle[1] - avg) )
+            outFile.write ( "\nFRACTION: " + str(fraction ( avg, oracle[0] )) + " " + str(fraction ( avg, oracle[1] )) )
+        outFile.close ( )
+
+def runOracleAverages ( source, listOfWorlds, oracleFile, jobs ):
+    # Returns the average (full, safe) achievable score over all the
+    # worlds, or None if they couldn't be worked out. The adaptive mode
+    # average estimates the average over all of them too, so both are
+    # over every world.
+    import sqlite3
+    from Oracle import runOracle, averages
+
+    try:
+        return averages ( runOracle ( source, listOfWorlds, oracleFile, jobs ) )
+    except ( OSError, ValueError, sqlite3.Error ):
+        print ( "[ERROR] Failure to work out the achievable scores." )
+        return None
+
+def fraction ( score, achievable ):
+    # A ratio of scores only means something when neither is negative
+    # and the achievable score isn't 0
+    if score < 0 or achievable <= 0:
+        return float('nan')
+    return score / achievable
+
+def runAdaptive ( listOfWorlds, play, roundSize, tolerance, budget, seed ):
+    # Plays the worlds in a random order, roundSize at a time, with
+    # play, until the confidence interval is within tolerance, the
+    # budget is spent or the worlds run out. Returns the merged partial
+    # sums, or None if any world fails.
+    order = list ( listOfWorlds )
+    random.Random ( seed ).shuffle ( order )
+    if budget > 0:
+        order = order[:budget]
+
+    total = None
+    for start in range ( 0, len(order), roundSize ):
+        results = play ( order[start:start+roundSize] )
+        if results == None:
+            return None
+        total = mergeResults ( total, results )
+
+        # The interval is only trusted after enough worlds
+        if tolerance > 0 and total[0] >= MIN_WORLDS and confidence ( total[0], total[1], total[2] ) <= tolerance:
+            break
+
+    return total
+
+def confidence ( numOfScores, sumOfScores, sumOfScoresSquared ):
+    # Returns the half width of the 95% confidence interval of the
+    # average score, from the sample standard deviation
+    if numOfScores < 2:
+        return float('inf')
+    variance = (sumOfScoresSquared - ((sumOfScores*sumOfScores) / numOfScores)) / (numOfScores - 1)
+    return 1.96 * math.sqrt ( max ( 0, variance ) / numOfScores )
+
+def mergeResults ( total, results ):
+    # Adds the partial sums of results to total; returns the new total
+    if total == None:
+        return results
+
+    numOfScores, sumOfScores, sumOfScoresSquared, timings, stats = total
+
+    if timings != None:
+        timings[0].merge ( results[3][0] )
+        timings[1].extend ( results[3][1] )
+
+    if stats != None:
+        stats.merge ( results[4] )
+
+    return ( numOfScores + results[0], sumOfScores + results[1], sumOfScoresSquared + results[2], timings, stats )
+
+def runFolder ( source, listOfWorlds, batchSize, debug, randomAI, manualAI, verbose, timing, tracePrefix = "", resultsFile = "", renderer = None, timeBudget = None, agent = "MyAI", board = TileBoard ):
+    # Plays every world in listOfWorlds and returns the partial sums
+    # (count, sum, sum of squares, timings, stats), or None if any world
+    # fails. With timing, timings is the StepTimer of all the worlds and
+    # the latency summary of each one; otherwise it is None. With a
+    # tracePrefix, every game is appended to this process's trace file.
+    # With a resultsFile, every world's row is appended to it, and stats
+    # is the ResultStats of the worlds; otherwise it is None. Debug mode
+    # draws the worlds with renderer, if there is one, and agents are
+    # held to timeBudget, if there is one. Worlds are kept in the board
+    # class, except in batches.
+    #
+    # One World is reset for every world, instead of building a new one.
+    # An agent whose class sets reusable = True is kept and reset() too;
+    # otherwise every world gets a new agent. Debug and manual mode
+    # still build a new World for every world, since the renderer
+    # follows one World, and so does timing, which gives each world its
+    # own StepTimer.
+    if batchSize > 1:
+        return runFolderBatch ( source, listOfWorlds, batchSize, randomAI, verbose, resultsFile, agent )
+
+    numOfScores = 0
+    sumOfScores = 0
+    sumOfScoresSquared = 0
+    timings = ( StepTimer(), [] ) if timing else None
+    timer   = None
+    recorder = None
+    stream   = None
+    world    = None
+    pooled   = not ( debug or manualAI or timing )
+
+    try:
+        agentClass = loadAgentClass ( agent, verbose )
+        recorder   = openTrace ( tracePrefix )
+        if resultsFile != "":
+            stream = ResultStream ( resultsFile )
+        for batch in readWorlds ( source, listOfWorlds, 1 ):
+            name, record = batch[0]
+            if verbose:
+                print ( "Running world: " + str(name) )
+
+            if timing:
+                timer = StepTimer()
+
+            if recorder != None:
+                recorder.label = str(name)
+
+            if world != None and pooled:
+                world.reset ( record )
+            else:
+                world = World ( debug, randomAI, manualAI, board=board, agent=agentClass(), record=record, timer=timer, recorder=recorder, renderer=renderer, budget=timeBudget )
+            score = world.run()
+
+            if timeBudget != None and world.outcome() == "forfeit":
+                print ( "[WARNING] The agent ran out of time on " + str(name) + "; the game was forfeited." )
+
+            numOfScores += 1
+            sumOfScores += score
+            sumOfScoresSquared += score*score
+
+            if stream != None:
+                state = world.state()
+                stream.write ( name, score, state["steps"], world.outcome(), state["goldLooted"] )
+
+            if timing:
+                timings[0].merge ( timer )
+                timings[1].append ( dict ( world=name, **timer.summary() ) )
+    except Exception:
+        return None
+    finally:
+        if recorder != None:
+            recorder.close()
+        if stream != None:
+            stream.close()
+
+    return numOfScores, sumOfScores, sumOfScoresSquared, timings, stream.stats if stream != None else None
+
+def runFolderBatch ( source, listOfWorlds, batchSize, randomAI, verbose, resultsFile = "", agent = "MyAI" ):
+    # Same as runFolder, but plays batchSize worlds at a time in
+    # lockstep with the BatchWorld engine.
+    from BatchWorld import BatchWorld
+
+    numOfScores = 0
+    sumOfScores = 0
+    sumOfScoresSquared = 0
+    stream = None
+
+    try:
+        loadAgentClass ( agent, verbose )
+        if resultsFile != "":
+            stream = ResultStream ( resultsFile )
+
+        for batch in readWorlds ( source, listOfWorlds, batchSize ):
+            if verbose:
+                for name, record in batch:
+                    print ( "Running world: " + str(name) )
+
+            world  = BatchWorld ( [ record for name, record in batch ], randomAI, agent )
+            scores = world.run()
+
+            for score in scores:
+                numOfScores += 1
+                sumOfScores += score
+                sumOfScoresSquared += score*score
+
+            if stream != None:
+                for ( name, record ), result in zip ( batch, world.results() ):
+                    stream.write ( name, *result )
+    except Exception:
+        return None
+    finally:
+        if stream != None:
+            stream.close()
+
+    return numOfScores, sumOfScores, sumOfScoresSquared, None, stream.stats if stream != None else None
+
+def runFolderParallel ( source, listOfWorlds, jobs, batchSize, debug, randomAI, manualAI, verbose, timing, tracePrefix, resultsFile, timeBudget, agent = "MyAI", board = TileBoard, pool = None ):
+    # Splits the source into chunks, plays them across a pool of worker
+    # processes and merges the partial sums. Scores are integers, so
+    # the merged sums, and the SCORE/STDEV built from them, are the
+    # same as a serial run. Without a pool, one is started for this
+    # call and stopped after it.
+    chunkSize = max ( batchSize, min ( 1000, len(listOfWorlds) // (jobs * 4) ) )
+    chunks    = [ ( source, listOfWorlds[i:i+chunkSize], batchSize, debug, randomAI, manualAI, verbose, timing, tracePrefix, resultsFile, None, timeBudget, agent, board )
+                  for i in range ( 0, len(listOfWorlds), chunkSize ) ]
+
+    total = ( 0, 0, 0, ( StepTimer(), [] ) if timing else None, ResultStats() if resultsFile != "" else None )
+
+    if pool == None:
+        with multiprocessing.Pool ( min ( jobs, len(chunks) ) ) as pool:
+            return mergeChunks ( total, pool.starmap ( runFolder, chunks ) )
+    return mergeChunks ( total, pool.starmap ( runFolder, chunks ) )
+
+def mergeChunks ( total, chunkResults ):
+    # Merges the partial sums of every chunk into total; returns None
+    # if any chunk failed, to match the serial run
+    for results in chunkResults:
+        if results == None:
+            return None
+        total = mergeResults ( total, results )
+    return total
+
+def loadAgentClass ( agent, verbose = False ):
+    # Returns the class of the agent, loading it the first time this
+    # process asks for it; in verbose mode, says how long that took
+    loaded     = agent in Registry.loadedAgents
+    agentClass = Registry.loadAgent ( agent )
+    if verbose and not loaded:
+        print ( "Loaded agent " + agent + " in " + milliseconds ( Registry.loadTimes[agent] ) +
+                " (process " + str(os.getpid()) + ")" )
+    return agentClass
+
+def milliseconds ( seconds ):
+    return "%.1f ms" % ( seconds * 1000 )
+
+def openTrace ( tracePrefix ):
+    # Returns a recorder appending to this process's trace file of the
+    # run, named by tracePrefix and the process, or None without one
+    if tracePrefix == "":
+        return None
+    return TraceRecorder ( tracePrefix + str(os.getpid()) + ".wwt" )
+
+def writeSummary ( resultsFile, stats ):
+    # Displays the score distribution of a run, and ends a JSON Lines
+    # results file with it
+    score = stats.score.summary()
+    print ( "The agent's score percentiles (p5, p50, p95): " +
+            str(score["p5"]) + ", " + str(score["p50"]) + ", " + str(score["p95"]) )
+    print ( "The agent's outcomes: " +
+            ", ".join ( outcome + " " + str(count) for outcome, count in stats.outcomes.items() ) +
+            ", gold looted " + str(stats.gold) )
+
+    try:
+        stream = ResultStream ( resultsFile )
+        stream.writeSummary ( stats )
+        stream.close()
+    except OSError:
+        print ( "[ERROR] Failure to write to results file." )
+
+def writeTiming ( timingFile, total, worlds ):
+    # Writes the step latencies of all the worlds, and of each one
+    try:
+        with open ( timingFile, 'w' ) as file:
+            json.dump ( { "total": total.toJSON(), "worlds": worlds }, file, indent=1 )
+    except OSError:
+        print ( "[ERROR] Failure to write to timing file." )
+
+def printHelp ( ):
+    print ( "Wumpus_World [Options] [InputFile] [OutputFile]" )
+    print ( )
+    print ( "Options:" )
+    print ( "\t-m Use the ManualAI instead of MyAI." )
+    print ( "\t-r Use the RandomAI instead of MyAI." )
+    print ( "\t-a AGENT Use another agent instead of MyAI, named" )
+    print ( "\t   by module:Class or by a name in Registry.py." )
+    print ( "\t   Only that agent's module is imported." )
+    print ( "\t-d Debug mode, which displays the game board" )
+    print ( "\t   after every mode. Useless with -m." )
+    print ( "\t-h Displays help menu and quits." )
+    print ( "\t-v Displays world file names before loading" )
+    print ( "\t   them, and how long starting up took." )
+    print ( "\t-f treats the InputFile as a folder containing" )
+    print ( "\t   worlds. This will trigger the program to" )
+    print ( "\t   display the average score and standard" )
+    print ( "\t   deviation instead of a single score. InputFile" )
+    print ( "\t   must be entered with this option. A packed" )
+    print ( "\t   corpus made by Corpus.py can be given in" )
+    print ( "\t   place of the folder." )
+    print ( "\t-j N Runs the worlds of a folder across N worker" )
+    print ( "\t   processes. Only useful with -f." )
+    print ( "\t-b N Plays the worlds of a folder N at a time in" )
+    print ( "\t   lockstep with the BatchWorld engine, which is" )
+    print ( "\t   faster on boards of about 16x16 and up; on 4x4" )
+    print ( "\t   boards one World at a time is faster. Requires" )
+    print ( "\t   NumPy. Only useful with -f or -n." )
+    print ( "\t-n N Plays N random worlds generated in memory," )
+    print ( "\t   and displays the average score and standard" )
+    print ( "\t   deviation like -f. No InputFile is used, so" )
+    print ( "\t   the only argument is the OutputFile." )
+    print ( "\t--seed S Seeds the random worlds of -n. World i" )
+    print ( "\t   is the same for a given seed, whatever -j and" )
+    print ( "\t   -b are." )
+    print ( "\t-t FILE Times every step, splitting the time the" )
+    print ( "\t   agent's getAction takes from the time the" )
+    print ( "\t   engine takes, and writes the latencies (mean," )
+    print ( "\t   p50, p99, max) of every world, and of all of" )
+    print ( "\t   them together, to FILE as JSON. Useless with" )
+    print ( "\t   -b." )
+    print ( "\t-x DIR Records every game as a binary trace in" )
+    print ( "\t   DIR, one traces_<time>_<run>_<pid>.wwt file" )
+    print ( "\t   per process, named by when the run started," )
+    print ( "\t   so every run has its own files. Traces are" )
+    print ( "\t   read and replayed with Trace.py." )
+    print ( "\t   Useless with -b." )
+    print ( "\t-o FILE Writes one row per world to FILE as soon" )
+    print ( "\t   as the world is over: its name, score, steps," )
+    print ( "\t   outcome (died, climbed or timeout) and whether" )
+    print ( "\t   the gold was looted. FILE is written as CSV if" )
+    print ( "\t   its name ends in .csv, and as JSON Lines" )
+    print ( "\t   otherwise, ending with a summary of the score" )
+    print ( "\t   distribution, which is also displayed." )
+    print ( "\t--tolerance T Adaptive mode: plays the worlds in a" )
+    print ( "\t   random order, a round at a time, and stops once" )
+    print ( "\t   the 95% confidence interval of the average" )
+    print ( "\t   score is within T points either side. The" )
+    print ( "\t   interval and the number of worlds played are" )
+    print ( "\t   displayed with the average. Only useful with" )
+    print ( "\t   -f or -n." )
+    print ( "\t--budget N Plays at most N worlds, drawn at random," )
+    print ( "\t   with or without --tolerance." )
+    print ( "\t--move-limit S Gives the agent S seconds for each" )
+    print ( "\t   move. An agent that goes over its time" )
+    print ( "\t   forfeits the game, losing 1000 points, and the" )
+    print ( "\t   world's outcome is \"forfeit\". Turns off -b." )
+    print ( "\t--game-limit S Gives the agent S seconds for all" )
+    print ( "\t   its moves in a game, the same way." )
+    print ( "\t--every N Debug mode only draws every Nth step." )
+    print ( "\t--events Debug mode only draws the steps where" )
+    print ( "\t   the gold is grabbed or the wumpus screams," )
+    print ( "\t   and the first and last step. With --every," )
+    print ( "\t   every Nth step is drawn as well." )
+    print ( "\t--viewport R Debug mode only draws the cells" )
+    print ( "\t   within R columns and rows of the agent, for" )
+    print ( "\t   large boards." )
+    print ( "\t--board B Keeps the worlds in a tile, bit or" )
+    print ( "\t   sparse board from Board.py (tile by default)." )
+    print ( "\t   sparse is the one for very large worlds with" )
+    print ( "\t   few features. Useless with -b." )
+    print ( "\t--oracle FILE Works out the best achievable score" )
+    print ( "\t   of every world with Oracle.py, caching them in" )
+    print ( "\t   FILE, and displays the achievable averages" )
+    print ( "\t   with full knowledge and with safe exploration," )
+    print ( "\t   how far the agent's average is below each, and" )
+    print ( "\t   the agent's average as a fraction of each," )
+    print ( "\t   which is nan unless both are positive." )
+    print ( "\t   Only useful with -f." )
+    print ( )
+    print ( "InputFile: A path to a valid Wumpus World File, or" )
+    print ( "           folder with -f. This is optional unless" )
+    print ( "           used with -f." )
+    print ( )
+    print ( "OutputFile: A path to a file where the results will" )
+    print ( "            be written. This is optional." )
+    print ( )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+# ======================================================================
+# FILE:        Oracle.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the oracle, which works out the best
+#              score an agent could make on each world of a folder or
+#              corpus, so an agent's average can be read against what
+#              was achievable. It is run from the src folder:
+#
+#                   python3 Oracle.py [Options] Worlds
+#
+#              or through the --oracle option of Main.py, which reports
+#              how far a folder run's average is below the achievable
+#              average, and what fraction of it the agent made.
+#
+#              Every world gets two scores:
+#
+#              - full  The best score of an agent that knows the whole
+#                      board: the shortest way, turns included, to the
+#                      gold and back, shooting the wumpus if that is
+#                      shorter or the only way through. If the gold
+#                      can't be reached, or costs more than it is
+#                      worth, it is -1, for climbing out at once.
+#
+#              - safe  The same, for an agent that only enters cells it
+#                      can prove safe from its percepts: the start, and
+#                      every neighbor of a safe cell with neither a
+#                      breeze nor a stench. Once every wumpus is dead,
+#                      stenches don't matter. It is an upper bound for
+#                      such an agent, as if it knew which safe cell
+#                      held the gold. A world file can put a pit or a
+#                      wumpus on the start, which kills the agent if it
+#                      comes back, so the safe agent never enters a
+#                      cell the full agent can't, and never scores
+#                      more.
+#
+#              Options:
+#                   -j N      Worker processes (1 by default)
+#                   -c FILE   Cache database (oracle.db)
+#                   -o FILE   Writes the scores of every world to FILE
+#                             as CSV
+#
+# NOTES:       - The best way is found with Dijkstra's algorithm over
+#                (cell, direction, arrow, living wumpus, gold) states.
+#                Every action costs 1 and the arrow 10 more, like the
+#                World class.
+#
+#              - Scores are kept in an SQLite cache keyed by a hash of
+#                each world's contents, like the tournament cache, so a
+#                corpus is only solved once, whatever its worlds are
+#                named. ORACLE_VERSION is part of the key.
+#
+#              - Worlds are read and solved in chunks across a pool of
+#                worker processes, which look up their own chunk in the
+#                cache, so only the new scores come back to be saved.
+# ======================================================================
+
+import sys
+import os
+import csv
+import heapq
+import sqlite3
+import multiprocessing
+from Corpus import Corpus, worldDigest, readWorlds
+
+# Bumped when a change to the oracle would change scores, so older
+# cached scores are ignored
+ORACLE_VERSION = 3
+
+CHUNK = 2000
+
+class Solver():
+
+    def __init__ ( self, record ):
+        cols = record.colDimension
+        rows = record.rowDimension
+        self.__rows   = rows
+
+        # Cell (c, r) is numbered c * rows + r. Features off the board
+        # are left out, as the boards leave them out.
+        inBounds      = lambda c, r: c >= 0 and r >= 0 and c < cols and r < rows
+        self.__pits   = { c * rows + r for c, r in record.pits if inBounds ( c, r ) }
+        self.__wumpus = [ ( c, r ) for c, r in record.wumpus if inBounds ( c, r ) ]
+        self.__gold   = { c * rows + r for c, r in record.gold if inBounds ( c, r ) }
+        self.__cells  = [ c * rows + r for c, r in self.__wumpus ]
+        self.__all    = (1 << len(self.__wumpus)) - 1
+
+        # The cell a step away in each direction, or -1 past the edge
+        self.__moves  = [ ( cell + rows if cell // rows + 1 < cols else -1,
+                            cell - 1    if cell % rows > 0         else -1,
+                            cell - rows if cell // rows > 0        else -1,
+                            cell + 1    if cell % rows + 1 < rows  else -1 )
+                          for cell in range ( cols * rows ) ]
+
+        self.__breeze = { move for pit  in self.__pits  for move in self.__moves[pit]  if move >= 0 }
+        self.__stench = { move for cell in self.__cells for move in self.__moves[cell] if move >= 0 }
+
+        # By living wumpus: (cells, blocks) for the full and the safe
+        # agent, where cells are the cells it can't enter if blocks, or
+        # the only cells it can enter if not
+        self.__open   = {}
+        self.__safe   = {}
+        # By (cell, direction): the wumpus in the arrow's line, as a mask
+        self.__lines  = {}
+
+    # ===============================================================
+    # =                 Scores
+    # ===============================================================
+
+    def full ( self ):
+        return self.__best ( self.__openCells )
+
+    def safe ( self ):
+        return self.__best ( self.__safeCells )
+
+    def __best ( self, enterable ):
+        # Dijkstra's algorithm from the start to climbing out with the
+        # gold; returns the score, or -1 if the gold can't be had or
+        # climbing out at once scores better
+        start = ( 0, 0, 0, 1, self.__all, 0 )
+        heap  = [ start ]
+        seen  = set()
+        moves = self.__moves
+        gold  = self.__gold
+
+        while heap:
+            state = heapq.heappop ( heap )
+            cost, cell, facing, arrow, alive, looted = state
+            key = state[1:]
+            if key in seen:
+                continue
+            seen.add ( key )
+
+            if looted and cell == 0:
+                # Climb out
+                return max ( -1, 1000 - cost - 1 )
+
+            cost += 1
+            heapq.heappush ( heap, ( cost, cell, (facing + 3) % 4, arrow, alive, looted ) )
+            heapq.heappush ( heap, ( cost, cell, (facing + 1) % 4, arrow, alive, looted ) )
+
+            move = moves[cell][facing]
+            if move >= 0:
+                cells, blocks = enterable ( alive )
+                if ( move in cells ) != blocks:
+                    heapq.heappush ( heap, ( cost, move, facing, arrow, alive, looted ) )
+
+            if not looted and cell in gold:
+                heapq.heappush ( heap, ( cost, cell, facing, arrow, alive, 1 ) )
+
+            if arrow:
+                hit = self.__line ( cell, facing ) & alive
+                if hit:
+                    heapq.heappush ( heap, ( cost + 10, cell, facing, 0, alive & ~hit, looted ) )
+
+        return -1
+
+    def __line ( self, cell, facing ):
+        key = cell * 4 + facing
+        if key not in self.__lines:
+            c, r = divmod ( cell, self.__rows )
+            mask = 0
+            for i, ( wc, wr ) in enumerate ( self.__wumpus ):
+                if ( ( facing == 0 and wr == r and wc >= c ) or
+                     ( facing == 1 and wc == c and wr <= r ) or
+                     ( facing == 2 and wr == r and wc <= c ) or
+                     ( facing == 3 and wc == c and wr >= r ) ):
+                    mask |= 1 << i
+            self.__lines[key] = mask
+        return self.__lines[key]
+
+    def __openCells ( self, alive ):
+        # The full agent enters any cell but a pit or a living wumpus
+        if alive not in self.__open:
+            living = { cell for i, cell in enumerate ( self.__cells ) if alive >> i & 1 }
+            self.__open[alive] = ( self.__pits | living, True )
+        return self.__open[alive]
+
+    def __safeCells ( self, alive ):
+        # The safe agent enters the cells it can reach through cells
+        # without a breeze or, while a wumpus lives, a stench. A killed
+        # wumpus leaves a stench in its own cell.
+        if alive not in self.__safe:
+            stench = set()
+            if alive:
+                stench = self.__stench | { cell for i, cell in enumerate ( self.__cells ) if not alive >> i & 1 }
+
+            safe  = { 0 }
+            stack = [ 0 ]
+            while stack:
+                cell = stack.pop()
+                if cell in self.__breeze or cell in stench:
+                    continue
+                for move in self.__moves[cell]:
+                    if move >= 0 and move not in safe:
+                        safe.add ( move )
+                        stack.append ( move )
+
+            deadly, blocks = self.__openCells ( alive )
+            self.__safe[alive] = ( safe - deadly, False )
+        return self.__safe[alive]
+
+def bestScores ( record ):
+    # Returns the (full, safe) scores of a world
+    solver = Solver ( record )
+    return solver.full(), solver.safe()
+
+# ======================================================================
+# =                 Cache
+# ======================================================================
+
+class OracleCache():
+
+    def __init__ ( self, filename ):
+        self.__db = sqlite3.connect ( filename, timeout=60 )
+        self.__db.execute ( "CREATE TABLE IF NOT EXISTS oracle ( version INTEGER, world TEXT, full INTEGER, safe INTEGER, "
+                            "PRIMARY KEY ( version, world ) )" )
+
+    def scores ( self, digests ):
+        # Returns the cached (full, safe) scores of some worlds, by digest
+        found = {}
+        for i in range ( 0, len(digests), 500 ):
+            part = digests[i:i+500]
+            rows = self.__db.execute ( "SELECT world, full, safe FROM oracle WHERE version = ? AND world IN ( " +
+                                       ", ".join ( "?" * len(part) ) + " )", [ ORACLE_VERSION ] + part )
+            for world, full, safe in rows:
+                found[world] = ( full, safe )
+        return found
+
+    def add ( self, scores ):
+        # scores is a list of (world digest, full, safe)
+        self.__db.executemany ( "INSERT OR REPLACE INTO oracle VALUES ( ?, ?, ?, ? )",
+                                [ ( ORACLE_VERSION, world, full, safe ) for world, full, safe in scores ] )
+        self.__db.commit()
+
+    def close ( self ):
+        self.__db.close()
+
+# ======================================================================
+# =                 Solving
+# ======================================================================
+
+def solveChunk ( source, keys, cacheFile ):
+    # Returns (name, digest, full, safe, solved) for every world of a
+    # chunk, where solved is False if the scores came from the cache
+    results = []
+    cache   = OracleCache ( cacheFile )
+    try:
+        for batch in readWorlds ( source, keys, len(keys) ):
+            worlds = [ ( name, record, worldDigest ( record ) ) for name, record in batch ]
+            cached = cache.scores ( [ digest for name, record, digest in worlds ] )
+
+            for name, record, digest in worlds:
+                if digest in cached:
+                    results.append ( ( name, digest ) + cached[digest] + ( False, ) )
+                else:
+                    results.append ( ( name, digest ) + bestScores ( record ) + ( True, ) )
+    finally:
+        cache.close()
+    return results
+
+def solveChunkStar ( args ):
+    return solveChunk ( *args )
+
+def runOracle ( source, listOfWorlds, cacheFile, jobs = 1 ):
+    # Returns (name, digest, full, safe, solved) for every world of a
+    # folder or corpus, solving the ones that aren't in the cache
+    listOfWorlds = list ( listOfWorlds )
+    chunks = [ ( source, listOfWorlds[i:i+CHUNK], cacheFile ) for i in range ( 0, len(listOfWorlds), CHUNK ) ]
+    cache  = OracleCache ( cacheFile )
+    scores = []
+
+    def save ( results ):
+        cache.add ( [ ( digest, full, safe ) for name, digest, full, safe, solved in results if solved ] )
+        scores.extend ( results )
+
+    try:
+        if jobs > 1 and len(chunks) > 1:
+            with multiprocessing.Pool ( min ( jobs, len(chunks) ) ) as pool:
+                for results in pool.imap_unordered ( solveChunkStar, chunks ):
+                    save ( results )
+        else:
+            for chunk in chunks:
+                save ( solveChunk ( *chunk ) )
+    finally:
+        cache.close()
+
+    return scores
+
+def averages ( scores ):
+    # Returns the average full and safe score of runOracle's results
+    if not scores:
+        return float('nan'), float('nan')
+    return ( sum ( full for name, digest, full, safe, solved in scores ) / len(scores),
+             sum ( safe for name, digest, full, safe, solved in scores ) / len(scores) )
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def printHelp ( ):
+    print ( "Oracle [Options] Worlds" )
+    print ( )
+    print ( "Options:" )
+    print ( "\t-j N Solves the worlds across N worker processes." )
+    print ( "\t-c FILE Keeps the scores in the FILE cache, instead" )
+    print ( "\t   of oracle.db." )
+    print ( "\t-o FILE Writes the full and safe score of every" )
+    print ( "\t   world to FILE as CSV." )
+    print ( )
+    print ( "Worlds: A folder of world files, or a packed corpus." )
+    print ( )
+
+def main ( ):
+    args       = sys.argv
+    jobs       = 1
+    cacheFile  = "oracle.db"
+    scoresFile = ""
+    positional = []
+
+    index = 1
+    while index < len(args):
+        token  = args[index]
+        index += 1
+
+        if token[0] != '-':
+            positional.append ( token )
+        elif token == "-j" and index < len(args) and args[index].isdigit():
+            jobs   = max ( 1, int(args[index]) )
+            index += 1
+        elif token == "-c" and index < len(args):
+            cacheFile = args[index]
+            index    += 1
+        elif token == "-o" and index < len(args):
+            scoresFile = args[index]
+            index     += 1
+        else:
+            printHelp()
+            return
+
+    if len(positional) != 1:
+        printHelp()
+        return
+
+    source = positional[0]
+    try:
+        if os.path.isfile ( source ):
+            with Corpus ( source ) as corpus:
+                listOfWorlds = range ( len(corpus) )
+        else:
+            listOfWorlds = sorted ( os.listdir ( source ) )
+        scores = runOracle ( source, listOfWorlds, cacheFile, jobs )
+    except ( OSError, ValueError ) as error:
+        print ( "[ERROR] Failed to read worlds: " + str(error) )
+        return
+
+    solved = sum ( 1 for score in scores if score[4] )
+    full, safe = averages ( scores )
+    count = max ( 1, len(scores) )
+
+    print ( "Solved " + str(solved) + " of " + str(len(scores)) + " worlds; " + str(len(scores) - solved) + " from the cache." )
+    print ( "Full knowledge:   average " + str(full) + ", gold in " +
+            str(100 * sum ( 1 for score in scores if score[2] > 0 ) / count) + "% of worlds" )
+    print ( "Safe exploration: average " + str(safe) + ", gold in " +
+            str(100 * sum ( 1 for score in scores if score[3] > 0 ) / count) + "% of worlds" )
+
+    if scoresFile != "":
+        try:
+            with open ( scoresFile, "w", newline="" ) as file:
+                writer = csv.writer ( file )
+                writer.writerow ( [ "world", "full", "safe" ] )
+                for name, digest, full, safe, solved in sorted ( scores ):
+                    writer.writerow ( [ name, full, safe ] )
+        except OSError:
+            print ( "[ERROR] Failure to write to scores file." )
+
+if __name__ == "__main__":
+    main()
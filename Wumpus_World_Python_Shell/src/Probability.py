@@ -0,0 +1,310 @@
+# ======================================================================
+# FILE:        Probability.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the probability engine, for when an
+#              agent has no safe cell left to go to and has to take a
+#              risk. It reads a knowledge base from Knowledge.py, and
+#              works out the chance of a pit and of the wumpus in every
+#              cell the agent could step into next (the fringe):
+#
+#                   self.odds = Probability ( self.knowledge )
+#                   ...
+#                   self.knowledge.perceive ( stench, breeze, glitter, bump, scream )
+#                   self.odds.update()
+#                   if not self.knowledge.frontier():
+#                       cell = self.odds.safest()
+#
+#              The chances are exact under the same model as the
+#              worlds World.py makes: every cell but the start has a
+#              pit 2 times in 10, and there is one wumpus, in any cell
+#              but the start, whether or not it has a pit.
+#
+#              Pits and the wumpus don't depend on each other, and
+#              breezes only tell about pits, so the two are worked out
+#              apart. The wumpus is in one of the cells a stench allows,
+#              all equally likely. For pits, every breeze needs a pit in
+#              one of its neighbors the knowledge base can't clear; two
+#              breezes that share such a neighbor depend on each other,
+#              and the rest don't. The fringe splits into these
+#              independent groups (components), and each component's
+#              pit layouts are counted on their own.
+#
+# NOTES:       - A component's layouts are counted one cell at a time,
+#                keeping only which of its breezes still need a pit, so
+#                the work grows with the length of the fringe, not as
+#                2 to the power of its size.
+#
+#              - The chances of every component are kept from one
+#                update to the next, by the breezes and cells in it, so
+#                only the components a new percept changed are counted
+#                again. counted holds how many were, in the last update.
+#
+#              - A bound of the board the agent hasn't bumped into yet is
+#                taken from cols and rows, if the agent knows it some
+#                other way. Until a stench narrows down the wumpus, its
+#                chance depends on the size of the board; without one,
+#                the board is taken to end one cell past the farthest
+#                cell the agent has been to, which is only a guess.
+#
+#              - Only the one-wumpus model is supported.
+# ======================================================================
+
+# The odds of a pit, as in World.__addFeatures: 2 in 10, so a cell is
+# clear 4 times as often as it has a pit
+PIT_CHANCE   = 0.2
+PIT_WEIGHT   = 1
+CLEAR_WEIGHT = 4
+
+class Probability():
+
+    def __init__ ( self, knowledge, cols = None, rows = None ):
+        self.__knowledge  = knowledge
+        self.__cols       = cols
+        self.__rows       = rows
+
+        # The farthest the agent has been, for guessing the board's size
+        self.__far        = ( 0, 0 )
+
+        # The pit chances of every component, by its breezes' cells
+        self.__components = {}
+        self.__pits       = {}
+        self.__fringe     = set()
+
+        # Where the wumpus can be: a set of cells, or None for anywhere
+        # not cleared, and how many cells that is; worked out when first
+        # asked for
+        self.__wumpus     = None
+
+        self.counted      = 0
+
+    # ===============================================================
+    # =                 Agent Functions
+    # ===============================================================
+
+    def update ( self ):
+        # Reads the knowledge base; call it after every perceive()
+        knowledge  = self.__knowledge
+        self.__far = ( max ( self.__far[0], knowledge.x ), max ( self.__far[1], knowledge.y ) )
+
+        breezes = set()
+        for cell in knowledge.breezes():
+            cells = frozenset ( n for n in knowledge.neighbors ( *cell )
+                                if self.__inBounds ( *n ) and not knowledge.isPitFree ( *n ) )
+            if cells:
+                breezes.add ( cells )
+
+        components   = {}
+        pits         = {}
+        self.counted = 0
+        for component in splitBreezes ( breezes ):
+            chances = self.__components.get ( component )
+            if chances == None:
+                chances       = countPits ( component )
+                self.counted += 1
+            components[component] = chances
+            pits.update ( chances )
+
+        self.__components = components
+        self.__pits       = pits
+        self.__fringe     = set().union ( *breezes )
+        for cell in knowledge.stenches():
+            for n in knowledge.neighbors ( *cell ):
+                if self.__inBounds ( *n ) and not knowledge.isSafe ( *n ):
+                    self.__fringe.add ( n )
+        self.__wumpus     = None
+
+    # ===============================================================
+    # =                 Queries
+    # ===============================================================
+
+    def pit ( self, c, r ):
+        # The chance of a pit in the cell
+        if ( c, r ) == ( 0, 0 ) or not self.__inBounds ( c, r ) or self.__knowledge.isPitFree ( c, r ):
+            return 0.0
+        return self.__pits.get ( ( c, r ), PIT_CHANCE )
+
+    def wumpus ( self, c, r ):
+        # The chance of a living wumpus in the cell
+        if ( c, r ) == ( 0, 0 ) or not self.__inBounds ( c, r ) or self.__knowledge.isWumpusFree ( c, r ):
+            return 0.0
+        if self.__wumpus == None:
+            self.__wumpus = self.__wumpusCells()
+        cells, count = self.__wumpus
+        if count == 0 or ( cells != None and ( c, r ) not in cells ):
+            return 0.0
+        return 1 / count
+
+    def danger ( self, c, r ):
+        # The chance that stepping into the cell kills the agent
+        return 1 - ( 1 - self.pit ( c, r ) ) * ( 1 - self.wumpus ( c, r ) )
+
+    def fringe ( self ):
+        # The cells next to a visited cell that aren't known to be safe,
+        # as a set of (c, r); don't change it
+        return self.__fringe
+
+    def safest ( self ):
+        # The fringe cell least likely to kill the agent, or None
+        if not self.__fringe:
+            return None
+        return min ( self.__fringe, key = lambda cell: ( self.danger ( *cell ), cell ) )
+
+    # ===============================================================
+    # =                 Helper Functions
+    # ===============================================================
+
+    def __wumpusCells ( self ):
+        knowledge  = self.__knowledge
+        candidates = knowledge.wumpusCandidates()
+        if candidates != None:
+            cells = { cell for cell in candidates
+                      if self.__inBounds ( *cell ) and not knowledge.isWumpusFree ( *cell ) }
+            return cells, len(cells)
+
+        # Anywhere on the board that isn't cleared
+        cols, rows = self.__bounds()
+        count = 0
+        for c in range ( cols ):
+            for r in range ( rows ):
+                if ( c, r ) != ( 0, 0 ) and not knowledge.isWumpusFree ( c, r ):
+                    count += 1
+        return None, count
+
+    def __bounds ( self ):
+        knowledge = self.__knowledge
+        cols = knowledge.cols if knowledge.cols != None else self.__cols
+        rows = knowledge.rows if knowledge.rows != None else self.__rows
+        if cols == None:
+            cols = self.__far[0] + 2
+        if rows == None:
+            rows = self.__far[1] + 2
+        return cols, rows
+
+    def __inBounds ( self, c, r ):
+        knowledge = self.__knowledge
+        cols = knowledge.cols if knowledge.cols != None else self.__cols
+        rows = knowledge.rows if knowledge.rows != None else self.__rows
+        return c >= 0 and r >= 0 and ( cols == None or c < cols ) and ( rows == None or r < rows )
+
+# ======================================================================
+# =                 Counting
+# ======================================================================
+
+def splitBreezes ( breezes ):
+    # Splits a set of breezes, each the frozenset of cells that could
+    # hold its pit, into components that share no cell; returns every
+    # component as a frozenset of breezes
+    byCell = {}
+    for breeze in breezes:
+        for cell in breeze:
+            byCell.setdefault ( cell, [] ).append ( breeze )
+
+    components = []
+    seen       = set()
+    for breeze in breezes:
+        if breeze in seen:
+            continue
+        seen.add ( breeze )
+        component = [ breeze ]
+        for member in component:
+            for cell in member:
+                for other in byCell[cell]:
+                    if other not in seen:
+                        seen.add ( other )
+                        component.append ( other )
+        components.append ( frozenset ( component ) )
+    return components
+
+def countPits ( breezes ):
+    # Returns the chance of a pit in every cell of a component, given
+    # that every breeze has at least one pit in its cells
+    #
+    # A breeze whose cells hold all of another's is explained whenever
+    # the other is, so it adds nothing
+    needed = []
+    for breeze in sorted ( breezes, key = len ):
+        if not any ( other <= breeze for other in needed ):
+            needed.append ( breeze )
+
+    # Each breeze is a bit: it opens at its first cell, in this order,
+    # and has to be explained by its last
+    order   = orderCells ( needed )
+    index   = { cell: i for i, cell in enumerate ( order ) }
+    opens   = [ 0 ] * len(order)
+    touches = [ 0 ] * len(order)
+    closes  = [ 0 ] * len(order)
+    for bit, breeze in enumerate ( needed ):
+        places = [ index[cell] for cell in breeze ]
+        opens[min ( places )]  |= 1 << bit
+        closes[max ( places )] |= 1 << bit
+        for place in places:
+            touches[place] |= 1 << bit
+
+    # Forward, the weight of every way to reach each set of open
+    # breezes still waiting for a pit
+    layers = [ { 0: 1 } ]
+    steps  = []
+    for i in range ( len(order) ):
+        layer = {}
+        step  = []
+        for waiting, weight in layers[-1].items():
+            clear = waiting | opens[i]
+            if clear & closes[i]:
+                clear = None
+            else:
+                layer[clear] = layer.get ( clear, 0 ) + weight * CLEAR_WEIGHT
+            pit = waiting & ~touches[i]
+            layer[pit] = layer.get ( pit, 0 ) + weight * PIT_WEIGHT
+            step.append ( ( waiting, clear, pit ) )
+        layers.append ( layer )
+        steps.append ( step )
+
+    # Backward, the weight of every way to finish from each set, and
+    # with both, the weight of the layouts with a pit in each cell
+    after = { 0: 1 }
+    pits  = [ 0 ] * len(order)
+    for i in range ( len(order) - 1, -1, -1 ):
+        before = {}
+        for waiting, clear, pit in steps[i]:
+            withPit = PIT_WEIGHT * after.get ( pit, 0 )
+            before[waiting] = withPit + ( CLEAR_WEIGHT * after.get ( clear, 0 ) if clear != None else 0 )
+            pits[i] += layers[i][waiting] * withPit
+        after = before
+
+    total   = after[0]
+    chances = { cell: pits[i] / total for i, cell in enumerate ( order ) }
+
+    # Cells only in a dropped breeze are as likely as any other
+    for breeze in breezes:
+        for cell in breeze:
+            chances.setdefault ( cell, PIT_CHANCE )
+    return chances
+
+def orderCells ( breezes ):
+    # Orders the cells so that breezes open and close close together,
+    # which keeps the sets of open breezes few: a breadth-first walk
+    # from a cell at one end of each group of linked cells (dropping a
+    # breeze can split a component in two)
+    links = {}
+    for breeze in breezes:
+        for cell in breeze:
+            links.setdefault ( cell, set() ).update ( breeze )
+
+    def walk ( start, seen ):
+        order = [ start ]
+        seen.add ( start )
+        for cell in order:
+            for other in sorted ( links[cell] ):
+                if other not in seen:
+                    seen.add ( other )
+                    order.append ( other )
+        return order
+
+    order = []
+    seen  = set()
+    for cell in sorted ( links ):
+        if cell not in seen:
+            order += walk ( walk ( cell, set ( seen ) )[-1], seen )
+    return order
@@ -0,0 +1,69 @@
+# ======================================================================
+# FILE:        Registry.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the agent registry, which finds the
+#              class of an agent from its name and only imports the
+#              module it is in when it is first asked for. An agent is
+#              named by "module:Class", where module can be in a
+#              package, such as "agents.planner:PlannerAI", or by a
+#              name in the registry:
+#
+#                   MyAI      MyAI.py's MyAI (the default)
+#                   RandomAI  RandomAI.py's RandomAI
+#                   ManualAI  ManualAI.py's ManualAI
+#
+#              Main.py's -a option takes either, so a run only imports
+#              the agent it plays; a heavy MyAI no longer slows down a
+#              run with -r.
+#
+# NOTES:       - Every process loads an agent once, the first time it is
+#                asked for, and keeps the class; loadTimes holds how
+#                long each load took, by name, in seconds, so the cost
+#                of starting up can be reported.
+#
+#              - A module named without a package is found like any
+#                import, so a module next to Main.py, or anywhere on
+#                PYTHONPATH, works.
+#
+#              - registerAgent adds a name, e.g. for a shared set of
+#                agents: registerAgent ( "Planner", "agents.planner:PlannerAI" ).
+# ======================================================================
+
+import time
+import importlib
+
+# Names for agents, and the "module:Class" they stand for
+AGENTS = {
+    "MyAI":     "MyAI:MyAI",
+    "RandomAI": "RandomAI:RandomAI",
+    "ManualAI": "ManualAI:ManualAI"
+}
+
+# Agent classes loaded by this process, and how long each took, by name
+loadedAgents = {}
+loadTimes    = {}
+
+def registerAgent ( name, spec ):
+    AGENTS[name] = spec
+
+def loadAgent ( name ):
+    # Returns the agent class for a name or "module:Class", importing
+    # its module the first time; raises ImportError if there is no such
+    # agent
+    if name not in loadedAgents:
+        start = time.perf_counter()
+        spec  = AGENTS.get ( name, name )
+
+        moduleName, _, className = spec.partition ( ":" )
+        if moduleName == "" or className == "":
+            raise ImportError ( "Agent names are module:Class, not " + repr(name) )
+
+        module = importlib.import_module ( moduleName )
+        if not hasattr ( module, className ):
+            raise ImportError ( "No class " + className + " in " + moduleName )
+
+        loadedAgents[name] = getattr ( module, className )
+        loadTimes[name]    = time.perf_counter() - start
+    return loadedAgents[name]
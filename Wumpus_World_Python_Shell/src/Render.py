@@ -0,0 +1,176 @@
+# ======================================================================
+# FILE:        Render.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the debug renderer, which draws the
+#              board and agent for the World class in debug and manual
+#              mode. Every frame is built in one buffer and written with
+#              a single call, and the board is kept as a list of
+#              rendered rows, so a frame only rebuilds the rows whose
+#              cells changed since the last one: the rows the agent left
+#              and entered, or the whole board after the World changes
+#              it.
+#
+#              A renderer can also skip frames, to keep debug sessions
+#              on large boards interactive:
+#
+#              - every    Draws every Nth step only.
+#
+#              - events   Draws only when something happens: the gold is
+#                         grabbed or the wumpus screams. The first and
+#                         last frame of a game are always drawn.
+#
+#              - viewport Draws only the cells within that many columns
+#                         and rows of the agent, instead of the whole
+#                         board.
+#
+# NOTES:       - With the defaults, every step is drawn in full, and a
+#                frame is the same text the World used to print.
+#
+#              - With a viewport, rows are only built for the columns
+#                it shows, so a frame costs the same on any board. The
+#                cached rows are dropped when it moves to other columns.
+#
+#              - The World calls invalidate() whenever its board changes:
+#                on a grab, a shot, and on restore() and reset(), which
+#                can put back any board, even one of another size.
+# ======================================================================
+
+import sys
+from Agent import Agent
+
+CELL = 8
+
+DIRECTIONS = { 0: "Right", 1: "Down", 2: "Left", 3: "Up" }
+
+ACTIONS = {
+    Agent.Action.TURN_LEFT:  "Turned Left",
+    Agent.Action.TURN_RIGHT: "Turned Right",
+    Agent.Action.FORWARD:    "Moved Forward",
+    Agent.Action.SHOOT:      "Shot the Arrow",
+    Agent.Action.GRAB:       "Grabbed",
+    Agent.Action.CLIMB:      "Climbed"
+}
+
+class Renderer():
+
+    def __init__ ( self, every = 1, events = False, viewport = 0, out = None ):
+        self.__every    = max ( 1, every )
+        self.__events   = events
+        self.__viewport = viewport
+        self.__out      = out
+
+        # The world being drawn, and what it looked like last step
+        self.__world    = None
+        self.__frame    = 0
+        self.__gold     = False
+
+        # The rendered rows of the board, or None when the board has
+        # changed since they were cached, the first and last column
+        # they hold, and where the agent was
+        self.__rows     = None
+        self.__columns  = None
+        self.__agent    = None
+
+    # ===============================================================
+    # =                 Frame Selection
+    # ===============================================================
+
+    def wants ( self, world ):
+        # Called once per step; returns whether the step should be drawn
+        state         = self.__track ( world )
+        event         = state["scream"] or state["goldLooted"] != self.__gold
+        self.__gold   = state["goldLooted"]
+        frame         = self.__frame
+        self.__frame += 1
+
+        if frame == 0:
+            return True
+        if self.__events:
+            return event or ( self.__every > 1 and frame % self.__every == 0 )
+        return frame % self.__every == 0
+
+    def __track ( self, world ):
+        # Starts over when given a new world; returns its state
+        state = world.state()
+        if world is not self.__world:
+            self.__world = world
+            self.__frame = 0
+            self.__gold  = state["goldLooted"]
+            self.invalidate()
+        return state
+
+    def invalidate ( self ):
+        # Drops every cached row; called by the World when its board
+        # changes
+        self.__rows  = None
+        self.__agent = None
+
+    # ===============================================================
+    # =                 Drawing
+    # ===============================================================
+
+    def draw ( self, world ):
+        colDimension, rowDimension = world.dimensions()
+        state = self.__track ( world )
+        agent = ( state["agentX"], state["agentY"] )
+
+        c0, c1, r0, r1 = 0, colDimension - 1, 0, rowDimension - 1
+        if self.__viewport > 0:
+            c0 = max ( 0, agent[0] - self.__viewport )
+            c1 = min ( colDimension - 1, agent[0] + self.__viewport )
+            r0 = max ( 0, agent[1] - self.__viewport )
+            r1 = min ( rowDimension - 1, agent[1] + self.__viewport )
+
+        if self.__rows == None or self.__columns != ( c0, c1 ):
+            self.__rows    = [ None ] * rowDimension
+            self.__columns = ( c0, c1 )
+        elif agent != self.__agent:
+            self.__rows[self.__agent[1]] = None
+            self.__rows[agent[1]] = None
+        self.__agent = agent
+
+        buffer = []
+        if self.__viewport > 0:
+            buffer.append ( "Viewport: columns " + str(c0) + "-" + str(c1) +
+                            ", rows " + str(r0) + "-" + str(r1) + "\n" )
+
+        for r in range ( r1, r0 - 1, -1 ):
+            row = self.__rows[r]
+            if row == None:
+                row = self.__rows[r] = "".join ( [ self.__tileString ( world.tile ( c, r ), c, r, agent )
+                                                   for c in range ( c0, c1 + 1 ) ] )
+            buffer.append ( row )
+            buffer.append ( "\n\n" )
+
+        self.__agentInfo ( buffer, state, world.percepts() )
+
+        out = self.__out if self.__out != None else sys.stdout
+        out.write ( "".join ( buffer ) )
+
+    @staticmethod
+    def __tileString ( tile, c, r, agent ):
+        tileString = ""
+
+        if tile.pit:    tileString += "P"
+        if tile.wumpus: tileString += "W"
+        if tile.gold:   tileString += "G"
+        if tile.breeze: tileString += "B"
+        if tile.stench: tileString += "S"
+
+        if agent[0] == c and agent[1] == r:
+            tileString += "@"
+
+        return ( tileString + "." ).rjust ( CELL )
+
+    @staticmethod
+    def __agentInfo ( buffer, state, percepts ):
+        buffer.append ( "Score: "  + str(state["score"])  + "\n" )
+        buffer.append ( "AgentX: " + str(state["agentX"]) + "\n" )
+        buffer.append ( "AgentY: " + str(state["agentY"]) + "\n" )
+        buffer.append ( "AgentDir: "    + DIRECTIONS.get ( state["agentDir"], "Invalid" ) + "\n" )
+        buffer.append ( "Last Action: " + ACTIONS.get ( state["lastAction"], "Invalid" )  + "\n" )
+
+        names = [ name for name, sensed in zip ( ( "Stench", "Breeze", "Glitter", "Bump", "Scream" ), percepts ) if sensed ]
+        buffer.append ( "Percepts: " + ", ".join ( names ) + "\n" )
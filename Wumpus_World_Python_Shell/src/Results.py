@@ -0,0 +1,155 @@
+# ======================================================================
+# FILE:        Results.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the per-world results of a run. A
+#              ResultStream writes one row per world as soon as the
+#              world is over, so nothing is lost if a long run stops
+#              early, and ResultStats aggregates the rows as they go by,
+#              in constant memory, into a full score distribution.
+#
+# NOTES:       - Every row holds the world name, score, number of steps,
+#                outcome ("died", "climbed", "timeout" or "forfeit")
+#                and whether the gold was looted.
+#
+#              - Files ending in ".csv" are written as CSV, with a
+#                header row; any other file is written as JSON Lines.
+#
+#              - The mean and variance are kept with Welford's method,
+#                and merged with Chan's formula, so they stay accurate
+#                over millions of worlds.
+#
+#              - Scores and steps are bounded integers (a game ends
+#                once its score falls below -1000), so the quantile
+#                sketch is an exact count of each value. Its size does
+#                not grow with the number of worlds, and percentiles
+#                from it are exact.
+# ======================================================================
+
+import csv
+import json
+import math
+
+FIELDS   = [ "world", "score", "steps", "outcome", "gold" ]
+OUTCOMES = [ "died", "climbed", "timeout", "forfeit" ]
+
+class OnlineStats():
+
+    def __init__ ( self ):
+        self.count  = 0
+        self.mean   = 0.0
+        self.m2     = 0.0
+        self.counts = {}
+
+    def add ( self, value ):
+        self.count += 1
+        delta       = value - self.mean
+        self.mean  += delta / self.count
+        self.m2    += delta * (value - self.mean)
+        self.counts[value] = self.counts.get ( value, 0 ) + 1
+
+    def merge ( self, other ):
+        if other.count == 0:
+            return
+        count      = self.count + other.count
+        delta      = other.mean - self.mean
+        self.m2   += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        for value, n in other.counts.items():
+            self.counts[value] = self.counts.get ( value, 0 ) + n
+
+    def stdev ( self ):
+        # The population standard deviation, like Main.py's STDEV
+        return math.sqrt ( self.m2 / self.count ) if self.count else float('nan')
+
+    def percentile ( self, p ):
+        # Returns the smallest value with at least p percent of the
+        # values at or below it
+        if self.count == 0:
+            return float('nan')
+
+        rank = max ( 1, math.ceil ( p / 100 * self.count ) )
+        seen = 0
+        for value in sorted ( self.counts ):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return max ( self.counts )
+
+    def summary ( self ):
+        return {
+            "count": self.count,
+            "mean":  self.mean if self.count else float('nan'),
+            "stdev": self.stdev(),
+            "min":   min ( self.counts ) if self.count else float('nan'),
+            "p5":    self.percentile ( 5 ),
+            "p50":   self.percentile ( 50 ),
+            "p95":   self.percentile ( 95 ),
+            "max":   max ( self.counts ) if self.count else float('nan')
+        }
+
+class ResultStats():
+
+    def __init__ ( self ):
+        self.score    = OnlineStats()
+        self.steps    = OnlineStats()
+        self.outcomes = { outcome: 0 for outcome in OUTCOMES }
+        self.gold     = 0
+
+    def add ( self, score, steps, outcome, gold ):
+        self.score.add ( score )
+        self.steps.add ( steps )
+        self.outcomes[outcome] += 1
+        self.gold += gold
+
+    def merge ( self, other ):
+        self.score.merge ( other.score )
+        self.steps.merge ( other.steps )
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] += count
+        self.gold += other.gold
+
+    def summary ( self ):
+        return {
+            "score":    self.score.summary(),
+            "steps":    self.steps.summary(),
+            "outcomes": dict ( self.outcomes ),
+            "gold":     self.gold
+        }
+
+class ResultStream():
+
+    def __init__ ( self, filename, create = False ):
+        # With create, the file is emptied (and given its CSV header);
+        # otherwise rows are appended, so many processes can share it
+        self.__csv  = filename.lower().endswith ( ".csv" )
+        self.__file = open ( filename, "w" if create else "a", newline="" )
+        self.stats  = ResultStats()
+
+        if self.__csv:
+            self.__writer = csv.writer ( self.__file )
+            if create:
+                self.__writer.writerow ( FIELDS )
+                self.__file.flush()
+
+    def write ( self, name, score, steps, outcome, gold ):
+        # Rows are written whole and flushed at once, so rows from
+        # different processes don't interleave
+        self.stats.add ( score, steps, outcome, gold )
+
+        if self.__csv:
+            self.__writer.writerow ( [ name, score, steps, outcome, int(gold) ] )
+        else:
+            self.__file.write ( json.dumps ( dict ( zip ( FIELDS, [ name, score, steps, outcome, gold ] ) ) ) + "\n" )
+        self.__file.flush()
+
+    def writeSummary ( self, stats ):
+        # JSON Lines files end with a summary of the whole run
+        if not self.__csv:
+            self.__file.write ( json.dumps ( { "summary": stats.summary() } ) + "\n" )
+            self.__file.flush()
+
+    def close ( self ):
+        self.__file.close()
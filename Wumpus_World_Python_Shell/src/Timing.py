@@ -0,0 +1,151 @@
+# ======================================================================
+# FILE:        Timing.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the step timer, which World.run() can
+#              fill in to split the time of a game between the agent
+#              and the engine. Every step records two latencies: the
+#              call to the agent's getAction, and the engine's handling
+#              of the action it returned, up to the next call to the
+#              agent (which includes reading the next percepts).
+#
+#              The World times a game by wrapping its agent in a
+#              TimedAgent for the run, so the game loop is untouched
+#              and a World without a timer pays nothing.
+#
+# NOTES:       - Latencies are kept in nanoseconds, in a histogram with
+#                four buckets per power of two, so percentiles are
+#                within 25% and cost little to keep. The mean
+#                and max are exact.
+#
+#              - Timers can be merged, to aggregate many worlds.
+#
+#              - The clock is time.perf_counter_ns, which is new in
+#                Python 3.7; on older ones, it is time.perf_counter
+#                scaled to nanoseconds.
+# ======================================================================
+
+import time
+from Agent import Agent
+
+try:
+    clock = time.perf_counter_ns
+except AttributeError:
+    def clock ( ):
+        return int ( time.perf_counter() * 1000000000 )
+
+class LatencyHistogram():
+
+    def __init__ ( self ):
+        self.count   = 0
+        self.total   = 0
+        self.max     = 0
+        self.buckets = {}
+
+    def record ( self, ns ):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+        bucket = self.__bucket ( ns )
+        self.buckets[bucket] = self.buckets.get ( bucket, 0 ) + 1
+
+    def merge ( self, other ):
+        self.count += other.count
+        self.total += other.total
+        self.max    = max ( self.max, other.max )
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get ( bucket, 0 ) + count
+
+    def percentile ( self, p ):
+        # Returns the upper bound of the bucket holding the p-th
+        # percentile, capped at the max
+        if self.count == 0:
+            return 0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted ( self.buckets ):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min ( self.max, self.__upperBound ( bucket ) )
+        return self.max
+
+    def summary ( self ):
+        return {
+            "count":   self.count,
+            "mean_ns": self.total / self.count if self.count else 0,
+            "p50_ns":  self.percentile ( 50 ),
+            "p99_ns":  self.percentile ( 99 ),
+            "max_ns":  self.max
+        }
+
+    def toJSON ( self ):
+        result = self.summary()
+        result["histogram"] = { str(self.__upperBound ( bucket )): count
+                                for bucket, count in sorted ( self.buckets.items() ) }
+        return result
+
+    @staticmethod
+    def __bucket ( ns ):
+        # The power of two, plus the next two bits below the top one
+        if ns < 4:
+            return ns
+        exponent = ns.bit_length() - 1
+        return exponent * 4 + ((ns >> (exponent - 2)) & 3)
+
+    @staticmethod
+    def __upperBound ( bucket ):
+        if bucket < 4:
+            return bucket
+        exponent, fraction = divmod ( bucket, 4 )
+        return ((4 + fraction + 1) << (exponent - 2)) - 1
+
+class StepTimer():
+
+    def __init__ ( self ):
+        self.agent  = LatencyHistogram()
+        self.engine = LatencyHistogram()
+        self.__last = None
+
+    def wrap ( self, agent ):
+        return TimedAgent ( agent, self )
+
+    def step ( self, start, end ):
+        # Records one call to the agent, and the engine time since the
+        # last one returned. The clock restarts after the bookkeeping,
+        # so it isn't counted as engine time.
+        if self.__last != None:
+            self.engine.record ( start - self.__last )
+        self.agent.record ( end - start )
+        self.__last = clock()
+
+    def finish ( self ):
+        # Records the engine's handling of the last move of a game
+        if self.__last != None:
+            self.engine.record ( clock() - self.__last )
+            self.__last = None
+
+    def merge ( self, other ):
+        self.agent.merge  ( other.agent )
+        self.engine.merge ( other.engine )
+
+    def summary ( self ):
+        return { "agent": self.agent.summary(), "engine": self.engine.summary() }
+
+    def toJSON ( self ):
+        return { "agent": self.agent.toJSON(), "engine": self.engine.toJSON() }
+
+class TimedAgent ( Agent ):
+
+    def __init__ ( self, agent, timer ):
+        self.__agent = agent
+        self.__timer = timer
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        start  = clock()
+        action = self.__agent.getAction ( stench, breeze, glitter, bump, scream )
+        self.__timer.step ( start, clock() )
+        return action
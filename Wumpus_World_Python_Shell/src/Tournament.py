@@ -0,0 +1,359 @@
+# ======================================================================
+# FILE:        Tournament.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains the tournament runner, which plays
+#              many agents on the same worlds and ranks them. It is run
+#              from the src folder:
+#
+#                   python3 Tournament.py [Options] Worlds Agent...
+#
+#              Worlds is a folder of world files, or a packed corpus
+#              made by Corpus.py. Each Agent is the path to a Python
+#              file holding an agent class, such as a student's
+#              MyAI.py. The class is MyAI unless it is named after the
+#              path, e.g. "submissions/ann.py:AnnAI".
+#
+#              Every (agent, world) pair is played across a pool of
+#              worker processes, and its score is kept in a cache keyed
+#              by a hash of the agent's source and a hash of the world's
+#              contents, and by the time limits it was played under.
+#              Re-running a tournament only plays the pairs that are new
+#              or whose agent or limits changed; renaming or moving
+#              files changes nothing.
+#
+#              Options:
+#                   -j N           Worker processes (1 by default)
+#                   -c FILE        Cache database (tournament.db)
+#                   -o FILE        Writes the score of every agent on
+#                                  every world to FILE as CSV
+#                   --move-limit S
+#                   --game-limit S Time limits, as in Main.py
+#
+#              The leaderboard lists every agent's average score,
+#              standard deviation, and how many worlds were played or
+#              taken from the cache.
+#
+# NOTES:       - The cache is an SQLite database, written after every
+#                chunk of worlds, so an interrupted tournament keeps
+#                what it played.
+#
+#              - Python's random module is seeded from the pair's hashes
+#                before every game, so agents that use it score the same
+#                on every run, and their cached scores stay valid.
+#
+#              - Only the agent's own file is hashed. If it imports
+#                other files that change, clear its results with a new
+#                cache file.
+#
+#              - An agent that raises an exception, or runs out of time,
+#                forfeits the game, as in Budget.py. An agent that can't
+#                be loaded, e.g. with a syntax error or no such class,
+#                is reported and left off the leaderboard, and the
+#                others play on.
+# ======================================================================
+
+import sys
+import os
+import csv
+import math
+import random
+import hashlib
+import sqlite3
+import importlib.util
+import multiprocessing
+from World import World
+from Corpus import Corpus, worldDigest, readWorlds
+from Worlds import isNumber
+from Budget import TimeBudget, PENALTY
+
+# Bumped when a change to the engine would change scores, so older
+# cached scores are ignored
+ENGINE_VERSION = 1
+
+CHUNK = 200
+
+# Agent classes loaded by this process, by path and class name
+loadedAgents = {}
+
+class Entrant():
+
+    def __init__ ( self, spec ):
+        # spec is "path" or "path:ClassName"
+        path, _, className = spec.partition ( ":" )
+        self.path      = path
+        self.className = className or "MyAI"
+        self.name      = os.path.basename ( path ) + ( ":" + className if className else "" )
+
+        with open ( path, "rb" ) as file:
+            source = file.read()
+        self.digest = hashlib.sha256 ( self.className.encode() + b"\0" + source ).hexdigest()
+
+class ResultCache():
+
+    def __init__ ( self, filename, moveLimit = 0, gameLimit = 0 ):
+        # Scores are kept by agent digest, followed by the time limits
+        # if there are any, so scores played under other limits aren't
+        # taken; without limits the key is the digest alone
+        self.__db     = sqlite3.connect ( filename )
+        self.__limits = "" if moveLimit <= 0 and gameLimit <= 0 else ":%r:%r" % ( float(moveLimit), float(gameLimit) )
+        self.__db.execute ( "CREATE TABLE IF NOT EXISTS results ( engine INTEGER, agent TEXT, world TEXT, score INTEGER, "
+                            "PRIMARY KEY ( engine, agent, world ) )" )
+
+    def scores ( self, agent ):
+        # Returns the cached scores of an agent, by world digest
+        rows = self.__db.execute ( "SELECT world, score FROM results WHERE engine = ? AND agent = ?",
+                                   ( ENGINE_VERSION, agent + self.__limits ) )
+        return dict ( rows )
+
+    def add ( self, agent, scores ):
+        # scores is a list of (world digest, score)
+        self.__db.executemany ( "INSERT OR REPLACE INTO results VALUES ( ?, ?, ?, ? )",
+                                [ ( ENGINE_VERSION, agent + self.__limits, world, score ) for world, score in scores ] )
+        self.__db.commit()
+
+    def close ( self ):
+        self.__db.close()
+
+# ======================================================================
+# =                 Playing
+# ======================================================================
+
+def loadAgent ( path, className ):
+    key = ( path, className )
+    if key not in loadedAgents:
+        spec   = importlib.util.spec_from_file_location ( "entrant_" + str(len(loadedAgents)), path )
+        module = importlib.util.module_from_spec ( spec )
+        spec.loader.exec_module ( module )
+        if not hasattr ( module, className ):
+            raise ImportError ( "No class " + className + " in " + path )
+        loadedAgents[key] = getattr ( module, className )
+    return loadedAgents[key]
+
+def listWorlds ( source ):
+    # Returns the (key, name, digest) of every world in a folder or
+    # corpus, where key is what readWorlds needs to find it again
+    if os.path.isfile ( source ):
+        with Corpus ( source ) as corpus:
+            keys = range ( len(corpus) )
+    else:
+        keys = sorted ( os.listdir ( source ) )
+
+    worlds = []
+    for batch, key in zip ( readWorlds ( source, keys, 1 ), keys ):
+        name, record = batch[0]
+        worlds.append ( ( key, name, worldDigest ( record ) ) )
+    return worlds
+
+def playChunk ( path, className, agentDigest, source, worlds, moveLimit, gameLimit ):
+    # Plays one agent on a list of (key, digest) worlds; returns the
+    # agent's digest and a list of (world digest, score), or the message
+    # of the error if the agent can't be loaded
+    try:
+        agentClass = loadAgent ( path, className )
+    except Exception as error:
+        return agentDigest, type(error).__name__ + ": " + str(error)
+
+    budget = TimeBudget ( moveLimit, gameLimit ) if moveLimit > 0 or gameLimit > 0 else None
+    scores = []
+
+    for batch, ( key, digest ) in zip ( readWorlds ( source, [ key for key, digest in worlds ], 1 ), worlds ):
+        name, record = batch[0]
+        random.seed ( agentDigest + digest )
+
+        world = None
+        try:
+            world = World ( agent=agentClass(), record=record, budget=budget )
+            score = world.run()
+        except Exception:
+            # A crashing agent forfeits, like one out of time
+            score = ( world.state()["score"] if world != None else 0 ) - PENALTY
+        scores.append ( ( digest, score ) )
+
+    return agentDigest, scores
+
+def playChunkStar ( args ):
+    return playChunk ( *args )
+
+def runTournament ( source, entrants, jobs, cacheFile, moveLimit = 0, gameLimit = 0 ):
+    # Returns the worlds, the score of every entrant on every world as
+    # a dict by (agent digest, world digest), how many pairs were
+    # played, and the error of every entrant that couldn't be loaded,
+    # by agent digest
+    worlds = listWorlds ( source )
+    cache  = ResultCache ( cacheFile, moveLimit, gameLimit )
+    scores = {}
+    failed = {}
+    chunks = []
+
+    for entrant in entrants:
+        cached  = cache.scores ( entrant.digest )
+        missing = []
+        for key, name, digest in worlds:
+            if digest in cached:
+                scores[entrant.digest, digest] = cached[digest]
+            else:
+                missing.append ( ( key, digest ) )
+
+        chunks += [ ( entrant.path, entrant.className, entrant.digest, source, missing[i:i+CHUNK], moveLimit, gameLimit )
+                    for i in range ( 0, len(missing), CHUNK ) ]
+
+    played = 0
+    try:
+        if jobs > 1 and len(chunks) > 1:
+            with multiprocessing.Pool ( min ( jobs, len(chunks) ) ) as pool:
+                for agent, results in pool.imap_unordered ( playChunkStar, chunks ):
+                    played += addResults ( cache, scores, failed, agent, results )
+        else:
+            for chunk in chunks:
+                agent, results = playChunk ( *chunk )
+                played += addResults ( cache, scores, failed, agent, results )
+    finally:
+        cache.close()
+
+    return worlds, scores, played, failed
+
+def addResults ( cache, scores, failed, agent, results ):
+    # Caches the scores of a chunk; returns how many there were. A chunk
+    # whose agent couldn't be loaded has its error instead
+    if isinstance ( results, str ):
+        failed[agent] = results
+        return 0
+    cache.add ( agent, results )
+    for world, score in results:
+        scores[agent, world] = score
+    return len(results)
+
+# ======================================================================
+# =                 Output
+# ======================================================================
+
+def leaderboard ( entrants, worlds, scores, failed = () ):
+    # Returns (name, average, standard deviation) for every entrant
+    # that was loaded, best first
+    board = []
+    for entrant in entrants:
+        if entrant.digest in failed:
+            continue
+        values = [ scores[entrant.digest, digest] for key, name, digest in worlds ]
+        count  = len(values)
+        if count == 0:
+            board.append ( ( entrant.name, float('nan'), float('nan') ) )
+            continue
+        total   = sum ( values )
+        squares = sum ( v * v for v in values )
+        board.append ( ( entrant.name, total / count, math.sqrt ( (squares - total * total / count) / count ) ) )
+
+    board.sort ( key = lambda row: row[1] if row[1] == row[1] else -math.inf, reverse = True )
+    return board
+
+def writeMatrix ( filename, entrants, worlds, scores ):
+    # An entrant that couldn't be loaded has empty cells
+    with open ( filename, "w", newline="" ) as file:
+        writer = csv.writer ( file )
+        writer.writerow ( [ "world" ] + [ entrant.name for entrant in entrants ] )
+        for key, name, digest in worlds:
+            writer.writerow ( [ name ] + [ scores.get ( ( entrant.digest, digest ), "" ) for entrant in entrants ] )
+
+def printHelp ( ):
+    print ( "Tournament [Options] Worlds Agent..." )
+    print ( )
+    print ( "Options:" )
+    print ( "\t-j N Plays the pairs across N worker processes." )
+    print ( "\t-c FILE Keeps the scores in the FILE cache, instead" )
+    print ( "\t   of tournament.db." )
+    print ( "\t-o FILE Writes the score of every agent on every" )
+    print ( "\t   world to FILE as CSV." )
+    print ( "\t--move-limit S" )
+    print ( "\t--game-limit S Time limits, as in Main.py." )
+    print ( )
+    print ( "Worlds: A folder of world files, or a packed corpus." )
+    print ( )
+    print ( "Agent: A Python file with a MyAI class, or" )
+    print ( "       File:ClassName for another class." )
+    print ( )
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def main ( ):
+    args       = sys.argv
+    jobs       = 1
+    cacheFile  = "tournament.db"
+    matrixFile = ""
+    moveLimit  = 0
+    gameLimit  = 0
+    positional = []
+
+    index = 1
+    while index < len(args):
+        token  = args[index]
+        index += 1
+
+        if token[0] != '-':
+            positional.append ( token )
+        elif token == "-j" and index < len(args) and args[index].isdigit():
+            jobs   = max ( 1, int(args[index]) )
+            index += 1
+        elif token == "-c" and index < len(args):
+            cacheFile = args[index]
+            index    += 1
+        elif token == "-o" and index < len(args):
+            matrixFile = args[index]
+            index     += 1
+        elif token == "--move-limit" and index < len(args) and isNumber ( args[index] ):
+            moveLimit = float(args[index])
+            index    += 1
+        elif token == "--game-limit" and index < len(args) and isNumber ( args[index] ):
+            gameLimit = float(args[index])
+            index    += 1
+        else:
+            printHelp()
+            return
+
+    if len(positional) < 2:
+        printHelp()
+        return
+
+    try:
+        entrants = [ Entrant ( spec ) for spec in positional[1:] ]
+    except OSError as error:
+        print ( "[ERROR] Failed to read agent: " + str(error) )
+        return
+
+    # Agents with the same file name are told apart by their full path
+    names = [ entrant.name for entrant in entrants ]
+    for entrant in entrants:
+        if names.count ( entrant.name ) > 1:
+            entrant.name = entrant.path + ( ":" + entrant.className if entrant.className != "MyAI" else "" )
+
+    try:
+        worlds, scores, played, failed = runTournament ( positional[0], entrants, jobs, cacheFile, moveLimit, gameLimit )
+    except ( OSError, ValueError ) as error:
+        print ( "[ERROR] Failed to read worlds: " + str(error) )
+        return
+
+    for entrant in entrants:
+        if entrant.digest in failed:
+            print ( "[ERROR] Failed to load agent " + entrant.name + ": " + failed[entrant.digest] )
+
+    total = len(worlds) * ( len(entrants) - len(failed) )
+    print ( "Played " + str(played) + " of " + str(total) + " games; " + str(total - played) + " from the cache." )
+    print ( )
+    print ( "Rank".ljust(6) + "Agent".ljust(32) + "Average".rjust(12) + "Std Dev".rjust(12) )
+    for rank, ( name, average, deviation ) in enumerate ( leaderboard ( entrants, worlds, scores, failed ), 1 ):
+        print ( str(rank).ljust(6) + name.ljust(32) + ( "%.2f" % average ).rjust(12) + ( "%.2f" % deviation ).rjust(12) )
+    for entrant in entrants:
+        if entrant.digest in failed:
+            print ( "-".ljust(6) + entrant.name.ljust(32) + "failed".rjust(12) )
+
+    if matrixFile != "":
+        try:
+            writeMatrix ( matrixFile, entrants, worlds, scores )
+        except OSError:
+            print ( "[ERROR] Failure to write to matrix file." )
+
+if __name__ == "__main__":
+    main()
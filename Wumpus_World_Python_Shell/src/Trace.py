@@ -0,0 +1,359 @@
+# ======================================================================
+# FILE:        Trace.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains binary episode traces, and the replay
+#              engine that reads them. A trace holds the world a game
+#              was played on, one byte per action and one byte of
+#              percepts per step, so thousands of games can be kept and
+#              examined after a large run. A Replay rebuilds the full
+#              world state at any step by playing the recorded actions
+#              through World.step(), without the agent, and keeps
+#              World.snapshot() keyframes on the way to seek back fast.
+#
+#              To look at traces, run:
+#
+#                   python3 Trace.py list TraceFile|TraceFolder [MaxScore]
+#                   python3 Trace.py show TraceFile Episode [Step]
+#
+#              - list prints the name, steps and score of every episode,
+#                or only of those that scored MaxScore or less.
+#
+#              - show prints the board and agent at a step of an
+#                episode, given by its number or world name. Without a
+#                step, it shows the end of the game.
+#
+# NOTES:       - A trace file is a list of episodes, little-endian:
+#
+#                   Header   magic "WWEP", length of the rest of the
+#                            episode in bytes, number of steps, final
+#                            score (uint32, uint32, uint32, int32)
+#
+#                   World    one record, as in Corpus.py
+#
+#                   Actions  one byte per step, the Agent.Action value,
+#                            FORFEIT (0) for a move the agent ran out
+#                            of time on, which is always the last, or
+#                            INVALID (255) for anything else the agent
+#                            returned, which the World takes as a move
+#                            that does nothing
+#
+#                   Percepts one byte per step, what the agent sensed
+#                            before the action: stench (1), breeze (2),
+#                            glitter (4), bump (8) and scream (16)
+#
+#                followed by padding to 4 bytes.
+#
+#              - Recording wraps the agent in a RecordingAgent, like
+#                the StepTimer in Timing.py, so games that aren't
+#                recorded pay nothing. It wraps the agent's time budget
+#                too, so a forfeit is recorded as a step, and a replay
+#                takes the penalty with World.forfeit().
+#
+#              - A file that ends in the middle of an episode, or
+#                whose lengths don't add up, raises ValueError.
+# ======================================================================
+
+import sys
+import os
+import mmap
+import struct
+from Agent import Agent
+from World import World
+from Budget import Forfeit
+from Corpus import WorldRecord, packRecord, FIELDS
+
+MAGIC   = b"WWEP"
+EPISODE = struct.Struct ( "<4sIIi" )
+
+STENCH  = 1
+BREEZE  = 2
+GLITTER = 4
+BUMP    = 8
+SCREAM  = 16
+
+# The action byte of a move the agent forfeited
+FORFEIT = 0
+
+# The action byte of a move that wasn't an Agent.Action
+INVALID = 255
+
+ACTIONS = { action.value: action for action in Agent.Action }
+
+def perceptBits ( stench, breeze, glitter, bump, scream ):
+    return ( STENCH  if stench  else 0 ) | ( BREEZE if breeze else 0 ) | \
+           ( GLITTER if glitter else 0 ) | ( BUMP   if bump   else 0 ) | \
+           ( SCREAM  if scream  else 0 )
+
+# ======================================================================
+# =                 Recording
+# ======================================================================
+
+class TraceRecorder():
+
+    def __init__ ( self, filename ):
+        self.__file        = open ( filename, "ab" )
+        self.__description = None
+        self.actions       = bytearray()
+        self.percepts      = bytearray()
+
+        # The name saved with the next episode
+        self.label         = ""
+
+    def wrap ( self, agent, description ):
+        self.__description = description
+        self.actions       = bytearray()
+        self.percepts      = bytearray()
+        return RecordingAgent ( agent, self )
+
+    def finish ( self, score ):
+        world = self.__description
+        body  = packRecord ( self.label, world.colDimension, world.rowDimension,
+                             world.wumpus, world.gold, world.pits )
+        body += self.actions + self.percepts + b"\0" * (-2 * len(self.actions) % 4)
+
+        self.__file.write ( EPISODE.pack ( MAGIC, len(body), len(self.actions), score ) )
+        self.__file.write ( body )
+
+    def close ( self ):
+        self.__file.close()
+
+class RecordingAgent ( Agent ):
+
+    def __init__ ( self, agent, recorder ):
+        self.__agent    = agent
+        self.__actions  = recorder.actions
+        self.__percepts = recorder.percepts
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        try:
+            action = self.__agent.getAction ( stench, breeze, glitter, bump, scream )
+        except Forfeit:
+            # The agent ran out of time on this move; the game ends
+            self.__actions.append ( FORFEIT )
+            self.__percepts.append ( perceptBits ( stench, breeze, glitter, bump, scream ) )
+            raise
+        self.__actions.append ( action.value if isinstance ( action, Agent.Action ) else INVALID )
+        self.__percepts.append ( perceptBits ( stench, breeze, glitter, bump, scream ) )
+        return action
+
+# ======================================================================
+# =                 Reading
+# ======================================================================
+
+class Episode():
+
+    def __init__ ( self, view, records, start ):
+        # view is the whole trace file, and records the same cast to
+        # int32; start is the offset of the episode's header
+        if len(view) - start < EPISODE.size:
+            raise ValueError ( "Truncated trace file" )
+
+        magic, length, steps, score = EPISODE.unpack_from ( view, start )
+        if magic != MAGIC:
+            raise ValueError ( "Not an episode trace" )
+
+        body = start + EPISODE.size
+        end  = body + length - (-2 * steps % 4)
+        if body + length > len(view) or length < 4 * FIELDS + 2 * steps:
+            raise ValueError ( "Truncated episode" )
+
+        # The world record, then the actions and percepts, fill the body
+        fields = records[body // 4 : body // 4 + FIELDS]
+        size   = 4 * ( FIELDS + 2 * ( fields[2] + fields[3] + fields[4] ) ) + fields[5] + (-fields[5] % 4)
+        if min ( fields ) < 0 or size + 2 * steps + (-2 * steps % 4) != length:
+            raise ValueError ( "Corrupt episode" )
+
+        self.record   = WorldRecord ( records, body // 4 )
+        self.name     = self.record.name
+        self.steps    = steps
+        self.score    = score
+        self.length   = EPISODE.size + length
+        self.__view   = view
+        self.__end    = end
+
+    @property
+    def actions ( self ):
+        return self.__view[self.__end - 2 * self.steps : self.__end - self.steps].tobytes()
+
+    @property
+    def percepts ( self ):
+        return self.__view[self.__end - self.steps : self.__end].tobytes()
+
+class TraceFile():
+
+    def __init__ ( self, filename ):
+        # Episodes are read with memoryview casts, like a corpus
+        if sys.byteorder != "little":
+            raise ValueError ( "Traces can only be read on little-endian machines" )
+
+        self.__file    = open ( filename, "rb" )
+        self.__map     = None
+        self.__view    = None
+        self.__records = None
+        self.episodes  = []
+
+        if os.fstat ( self.__file.fileno() ).st_size == 0:
+            return
+
+        self.__map     = mmap.mmap ( self.__file.fileno(), 0, access=mmap.ACCESS_READ )
+        self.__view    = memoryview ( self.__map )
+        self.__records = self.__view[: len(self.__view) - len(self.__view) % 4].cast ( 'i' )
+
+        try:
+            start = 0
+            while start < len(self.__view):
+                episode = Episode ( self.__view, self.__records, start )
+                self.episodes.append ( episode )
+                start += episode.length
+        except ValueError as error:
+            self.close()
+            raise ValueError ( str(error) + ": " + filename )
+
+    def find ( self, key ):
+        # Returns the episode with the given number or world name
+        if key.isdigit() and int(key) < len(self.episodes):
+            return self.episodes[int(key)]
+        for episode in self.episodes:
+            if episode.name == key:
+                return episode
+        return None
+
+    def close ( self ):
+        self.episodes = []
+        if self.__map != None:
+            # Views have to be released before the map can be closed
+            self.__records.release()
+            self.__view.release()
+            self.__map.close()
+        self.__file.close()
+
+    def __enter__ ( self ):
+        return self
+
+    def __exit__ ( self, *args ):
+        self.close()
+
+# ======================================================================
+# =                 Replaying
+# ======================================================================
+
+class ReplayAgent ( Agent ):
+
+    # Plays back the recorded actions of an episode
+
+    def __init__ ( self, actions ):
+        self.__actions = iter ( actions )
+
+    def getAction ( self, stench, breeze, glitter, bump, scream ):
+        return ACTIONS.get ( next ( self.__actions ) )
+
+class Replay():
+
+    # Seeking back restores the nearest earlier keyframe, a snapshot of
+    # the World taken every KEYFRAME steps on the way forward, so
+    # scrubbing through an episode never replays it from the start
+
+    KEYFRAME = 64
+
+    def __init__ ( self, episode ):
+        self.__episode   = episode
+        self.__actions   = episode.actions
+        self.__world     = None
+        self.__step      = 0
+        self.__keyframes = []
+
+    def seek ( self, step ):
+        # Returns the World as it was after the given number of moves.
+        # Seeking forward continues from the current step; seeking back
+        # starts from the nearest keyframe.
+        step = max ( 0, min ( step, self.__episode.steps ) )
+
+        if self.__world == None:
+            self.__world     = World ( record=self.__episode.record, agent=ReplayAgent ( self.__actions ) )
+            self.__step      = 0
+            self.__keyframes = [ self.__world.snapshot() ]
+
+        if step < self.__step:
+            keyframe = min ( step // self.KEYFRAME, len(self.__keyframes) - 1 )
+            self.__world.restore ( self.__keyframes[keyframe] )
+            self.__step = keyframe * self.KEYFRAME
+
+        while self.__step < step:
+            self.__play()
+
+        return self.__world
+
+    def verify ( self ):
+        # Replays the whole episode; returns whether every percept and
+        # the final score match the trace
+        world    = self.seek ( 0 )
+        percepts = self.__episode.percepts
+
+        for step in range ( self.__episode.steps ):
+            if perceptBits ( *world.percepts() ) != percepts[step]:
+                return False
+            self.__play()
+
+        return world.state()["score"] == self.__episode.score
+
+    def __play ( self ):
+        # Makes the next recorded move, and keeps a keyframe after every
+        # KEYFRAME steps
+        action = self.__actions[self.__step]
+        if action == FORFEIT:
+            self.__world.forfeit()
+        else:
+            # An INVALID move is replayed as None, which costs a point
+            # and does nothing, like whatever the agent returned
+            self.__world.step ( ACTIONS.get ( action ) )
+        self.__step += 1
+
+        if self.__step == len(self.__keyframes) * self.KEYFRAME:
+            self.__keyframes.append ( self.__world.snapshot() )
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def traceFiles ( path ):
+    if os.path.isdir ( path ):
+        return [ os.path.join ( path, name ) for name in sorted ( os.listdir ( path ) ) if name.endswith ( ".wwt" ) ]
+    return [ path ]
+
+def main ( ):
+    args = sys.argv
+
+    try:
+        if len(args) in ( 3, 4 ) and args[1] == "list":
+            maxScore = int(args[3]) if len(args) == 4 else None
+            for filename in traceFiles ( args[2] ):
+                with TraceFile ( filename ) as trace:
+                    for number, episode in enumerate ( trace.episodes ):
+                        if maxScore == None or episode.score <= maxScore:
+                            print ( os.path.basename(filename) + "\t" + str(number) + "\t" + episode.name +
+                                    "\tsteps: " + str(episode.steps) + "\tscore: " + str(episode.score) )
+            return
+
+        if len(args) in ( 4, 5 ) and args[1] == "show":
+            with TraceFile ( args[2] ) as trace:
+                episode = trace.find ( args[3] )
+                if episode == None:
+                    print ( "[ERROR] No such episode." )
+                    return
+
+                step = int(args[4]) if len(args) == 5 else episode.steps
+                print ( "Episode: " + episode.name + ", step " + str(min ( step, episode.steps )) +
+                        " of " + str(episode.steps) )
+                Replay ( episode ).seek ( step ).printWorld()
+            return
+    except ( OSError, ValueError ) as error:
+        print ( "[ERROR] Failed to read traces: " + str(error) )
+        return
+
+    print ( "Usage: python3 Trace.py list TraceFile|TraceFolder [MaxScore]" )
+    print ( "       python3 Trace.py show TraceFile Episode [Step]" )
+
+if __name__ == "__main__":
+    main()
@@ -6,33 +6,45 @@
 # DESCRIPTION: This file contains the world class, which is responsible
 #              for everything game related.
 #
-# NOTES:       - Don't make changes to this file.
+# NOTES:       - The world comes from a file or a record (Worlds.py,
+#                Corpus.py) and is kept in a board from Board.py,
+#                TileBoard by default. Timers, trace recorders, time
+#                budgets and renderers are optional, and wrap the agent
+#                or draw the game without changing its rules.
+#
+#              - run() plays in the table-driven turbo loop unless in
+#                debug or manual mode. step(), snapshot(), restore()
+#                and reset() drive a game from outside, for replays,
+#                search agents and folder runs.
+#
+#              - A change that alters any score must bump
+#                ENGINE_VERSION in Tournament.py.
 # ======================================================================
 
 from Agent import Agent
-from ManualAI import ManualAI
-from RandomAI import RandomAI
-from MyAI import MyAI
+from Registry import loadAgent
+from Board import TileBoard
+from Render import Renderer
+from Budget import Forfeit, PENALTY
+from Worlds import WorldDescription, parseWorld
 import random
 
 class World():
     
-    # Tile Structure
-    class __Tile:
-        pit    = False;
-        wumpus = False;
-        gold   = False;
-        breeze = False;
-        stench = False;
-    
     # ===============================================================
     # =                 Constructor
     # ===============================================================   
     
-    def __init__ ( self, debug = False, randomAI = False, manualAI = False, file = None ):
+    def __init__ ( self, debug = False, randomAI = False, manualAI = False, file = None, board = TileBoard, agent = None, record = None, timer = None, recorder = None, renderer = None, budget = None, turbo = True ):
         # Operation Flags
         self.__debug        = debug
         self.__manualAI      = manualAI
+        self.__timer        = timer
+        self.__recorder     = recorder
+        self.__renderer     = renderer
+        self.__budget       = budget
+        self.__turbo        = turbo and not debug and not manualAI
+        self.__forfeited    = False
         
         # Agent Initialization
         self.__goldLooted   = False
@@ -45,30 +57,88 @@ class World():
         self.__agentY       = 0
         self.__lastAction   = Agent.Action.CLIMB
         
-        if randomAI:
-            self.__agent = RandomAI()
+        # Features, as they were added
+        self.__wumpus       = []
+        self.__gold         = []
+        self.__pits         = []
+        
+        if agent != None:
+            self.__agent = agent
+        elif randomAI:
+            self.__agent = loadAgent ( "RandomAI" )()
         elif manualAI:
-            self.__agent = ManualAI()
+            self.__agent = loadAgent ( "ManualAI" )()
         else:
-            self.__agent = MyAI()
+            self.__agent = loadAgent ( "MyAI" )()
             
-        if file != None:
-            self.__colDimension, self.__rowDimension = [int(x) for x in next(file).split()]
-            self.__board = [[self.__Tile() for j in range(self.__rowDimension)] for i in range(self.__colDimension)]
-            self.__addFeatures(file)
+        if record == None and file != None:
+            # Read the whole file, and parse it in one pass
+            record = parseWorld ( file.read() )
+            file.close()
+            
+        if record != None:
+            self.__colDimension = record.colDimension
+            self.__rowDimension = record.rowDimension
+            self.__board = board ( self.__colDimension, self.__rowDimension )
+            self.__addRecord(record)
         else:
             self.__colDimension = 4
             self.__rowDimension = 4
-            self.__board = [[self.__Tile() for j in range(self.__colDimension)] for i in range(self.__rowDimension)]
+            self.__board = board ( self.__colDimension, self.__rowDimension )
             self.__addFeatures()
+            
+        # The start of the game, for reset()
+        self.__start = self.snapshot()
     
     # ===============================================================
     # =                 Engine Function
     # ===============================================================   
     
     def run ( self ):
+        if self.__timer == None and self.__recorder == None and self.__budget == None:
+            return self.__runTurbo() if self.__turbo else self.__run()
+
+        # Time, record or budget the game by wrapping the agent, so the
+        # loop itself doesn't change
+        agent = self.__agent
+        score = None
+
+        if self.__budget != None:
+            self.__agent = self.__budget.wrap ( self.__agent )
+        if self.__timer != None:
+            self.__agent = self.__timer.wrap ( self.__agent )
+        if self.__recorder != None:
+            self.__agent = self.__recorder.wrap ( self.__agent, self.description() )
+        try:
+            score = self.__runTurbo() if self.__turbo else self.__run()
+        except Forfeit:
+            score = self.__forfeit()
+        finally:
+            if self.__budget != None:
+                self.__budget.finish()
+            if self.__timer != None:
+                self.__timer.finish()
+            if self.__recorder != None and score != None:
+                self.__recorder.finish ( score )
+            self.__agent = agent
+        return score
+    
+    def forfeit ( self ):
+        # Ends the game as if the agent ran out of time, for replays of
+        # a forfeited game; returns the score
+        return self.__forfeit()
+
+    def __forfeit ( self ):
+        # The agent ran out of time; it loses the game
+        self.__forfeited = True
+        self.__score    -= PENALTY
+        if self.__debug:
+            self.__printWorldInfo()
+        return self.__score
+
+    def __run ( self ):
         while self.__score >= -1000:
-            if self.__debug or self.__manualAI:
+            if self.__manualAI or ( self.__debug and self.__getRenderer().wants ( self ) ):
                 self.__printWorldInfo()
                 
                 if not self.__manualAI:
@@ -77,267 +147,394 @@ class World():
                     input("Press ENTER to continue...")
                         
             # Get the move
+            stench, breeze, glitter = self.__board.percepts ( self.__agentX, self.__agentY )
             self.__lastAction = self.__agent.getAction (
-														self.__board[self.__agentX][self.__agentY].stench,
-														self.__board[self.__agentX][self.__agentY].breeze,
-														self.__board[self.__agentX][self.__agentY].gold,
+														stench,
+														breeze,
+														glitter,
 														self.__bump,
 														self.__scream
 													   )
 
             # Make the move
-            self.__score -= 1;
-            self.__bump   = False;
-            self.__scream = False;
-            
-            if self.__lastAction == Agent.Action.TURN_LEFT:
-                self.__agentDir -= 1
-                if (self.__agentDir < 0):
-                    self.__agentDir = 3
-                    
-            elif self.__lastAction == Agent.Action.TURN_RIGHT:
-                self.__agentDir += 1
-                if self.__agentDir > 3:
-                    self.__agentDir = 0
-                    
-            elif self.__lastAction == Agent.Action.FORWARD:
-                if self.__agentDir == 0 and self.__agentX+1 < self.__colDimension:
-                    self.__agentX += 1
-                elif self.__agentDir == 1 and self.__agentY-1 >= 0:
-                    self.__agentY -= 1
-                elif self.__agentDir == 2 and self.__agentX-1 >= 0:
-                    self.__agentX -= 1
-                elif self.__agentDir == 3 and self.__agentY+1 < self.__rowDimension:
-                    self.__agentY += 1
-                else:
-                    self.__bump = True
-                    
-                if self.__board[self.__agentX][self.__agentY].pit or self.__board[self.__agentX][self.__agentY].wumpus:
-                    self.__score -= 1000
-                    if self.__debug:
-                        self.__printWorldInfo()
-                    return self.__score
+            if self.__act ( self.__lastAction ):
+                break
+        return self.__score
+
+    # Action codes and turns for __runTurbo
+    __KINDS = {
+        Agent.Action.FORWARD:    1,
+        Agent.Action.TURN_LEFT:  2,
+        Agent.Action.TURN_RIGHT: 3,
+        Agent.Action.GRAB:       4,
+        Agent.Action.SHOOT:      5,
+        Agent.Action.CLIMB:      6
+    }
+    __LEFT  = ( 3, 0, 1, 2 )
+    __RIGHT = ( 1, 2, 3, 0 )
+
+    def __runTurbo ( self ):
+        # The same game as __run and __act, without display, on local
+        # variables. The agent's position is a cell number, c * rows + r,
+        # and each cell's percepts and each (cell, direction) move are
+        # looked up in tables, filled the first time a cell is visited.
+        agent  = self.__agent
+        board  = self.__board
+        rows   = self.__rowDimension
+        kinds  = self.__KINDS
+        left   = self.__LEFT
+        right  = self.__RIGHT
+
+        # cell -> (stench, breeze, glitter, deadly)
+        sensed = {}
+        # cell * 4 + direction -> next cell, or -1 for a bump
+        moves  = {}
+
+        score  = self.__score
+        cell   = self.__agentX * rows + self.__agentY
+        facing = self.__agentDir
+        arrow  = self.__hasArrow
+        gold   = self.__goldLooted
+        bump   = self.__bump
+        scream = self.__scream
+        action = self.__lastAction
+
+        try:
+            while score >= -1000:
+                tile = sensed.get ( cell )
+                if tile == None:
+                    tile = sensed[cell] = self.__sense ( cell )
+
+                action = agent.getAction ( tile[0], tile[1], tile[2], bump, scream )
+                kind   = kinds.get ( action, 0 )
+                score -= 1
+                bump   = False
+                scream = False
+
+                if kind == 1:
+                    move = moves.get ( cell * 4 + facing )
+                    if move == None:
+                        move = moves[cell * 4 + facing] = self.__neighbor ( cell, facing )
+                    if move < 0:
+                        bump = True
+                    else:
+                        cell = move
+
+                    tile = sensed.get ( cell )
+                    if tile == None:
+                        tile = sensed[cell] = self.__sense ( cell )
+                    if tile[3]:
+                        score -= 1000
+                        break
+
+                elif kind == 2:
+                    facing = left[facing]
+
+                elif kind == 3:
+                    facing = right[facing]
+
+                elif kind == 4:
+                    if board.takeGold ( cell // rows, cell % rows ):
+                        gold = True
+                        del sensed[cell]
+
+                elif kind == 5:
+                    if arrow:
+                        arrow  = False
+                        score -= 10
+                        scream = board.shoot ( cell // rows, cell % rows, facing )
+                        if scream:
+                            # Any cell's stench or danger may have changed
+                            sensed.clear()
+
+                elif kind == 6:
+                    if cell == 0:
+                        if gold:
+                            score += 1000
+                        break
+        finally:
+            self.__score      = score
+            self.__agentX     = cell // rows
+            self.__agentY     = cell % rows
+            self.__agentDir   = facing
+            self.__hasArrow   = arrow
+            self.__goldLooted = gold
+            self.__bump       = bump
+            self.__scream     = scream
+            self.__lastAction = action
+        return score
+
+    def __sense ( self, cell ):
+        c, r = divmod ( cell, self.__rowDimension )
+        stench, breeze, glitter = self.__board.percepts ( c, r )
+        return stench, breeze, glitter, self.__board.isDeadly ( c, r )
+
+    def __neighbor ( self, cell, direction ):
+        # Returns the cell a step away in a direction, or -1 past the edge
+        c, r = divmod ( cell, self.__rowDimension )
+        if direction == 0 and c+1 < self.__colDimension:
+            return cell + self.__rowDimension
+        if direction == 1 and r-1 >= 0:
+            return cell - 1
+        if direction == 2 and c-1 >= 0:
+            return cell - self.__rowDimension
+        if direction == 3 and r+1 < self.__rowDimension:
+            return cell + 1
+        return -1
+
+    def step ( self, action ):
+        # Makes one move without asking the agent; returns the percepts
+        # after the move, the change in score, and whether the game is over
+        score = self.__score
+        self.__lastAction = action
+        done = self.__act ( action ) or self.__score < -1000
+        return self.percepts(), self.__score - score, done
+
+    def __act ( self, action ):
+        # Makes the move; returns True if it ended the game
+        self.__score -= 1;
+        self.__bump   = False;
+        self.__scream = False;
+        
+        if action == Agent.Action.TURN_LEFT:
+            self.__agentDir -= 1
+            if (self.__agentDir < 0):
+                self.__agentDir = 3
                 
-            elif self.__lastAction == Agent.Action.SHOOT:
+        elif action == Agent.Action.TURN_RIGHT:
+            self.__agentDir += 1
+            if self.__agentDir > 3:
+                self.__agentDir = 0
+                
+        elif action == Agent.Action.FORWARD:
+            if self.__agentDir == 0 and self.__agentX+1 < self.__colDimension:
+                self.__agentX += 1
+            elif self.__agentDir == 1 and self.__agentY-1 >= 0:
+                self.__agentY -= 1
+            elif self.__agentDir == 2 and self.__agentX-1 >= 0:
+                self.__agentX -= 1
+            elif self.__agentDir == 3 and self.__agentY+1 < self.__rowDimension:
+                self.__agentY += 1
+            else:
+                self.__bump = True
+                
+            if self.__board.isDeadly ( self.__agentX, self.__agentY ):
+                self.__score -= 1000
+                if self.__debug:
+                    self.__printWorldInfo()
+                return True
             
-                if self.__hasArrow:
-                    self.__hasArrow = False
-                    self.__score -= 10
-                    
-                    if self.__agentDir == 0:
-                        for x in range (self.__agentX, self.__colDimension):
-                                if self.__board[x][self.__agentY].wumpus:
-                                    self.__board[x][self.__agentY].wumpus = False
-                                    self.__board[x][self.__agentY].stench = True
-                                    self.__scream = True
-                    
-                    elif self.__agentDir == 1:
-                        for y in range (self.__agentY, -1, -1):
-                            if self.__board[self.__agentX][y].wumpus:
-                                self.__board[self.__agentX][y].wumpus = False
-                                self.__board[self.__agentX][y].stench = True
-                                self.__scream = True
-                    
-                    elif self.__agentDir == 2:
-                        for x in range (self.__agentX, -1, -1):
-                            if self.__board[x][self.__agentY].wumpus:
-                                self.__board[x][self.__agentY].wumpus = False
-                                self.__board[x][self.__agentY].stench = True
-                                self.__scream = True
-
-                    elif self.__agentDir == 3:
-                        for y in range (self.__agentY, self.__rowDimension):
-                            if self.__board[self.__agentX][y].wumpus:
-                                self.__board[self.__agentX][y].wumpus = False
-                                self.__board[self.__agentX][y].stench = True
-                                self.__scream = True
-                    
-            elif self.__lastAction == Agent.Action.GRAB:
-                if self.__board[self.__agentX][self.__agentY].gold:
-                    self.__board[self.__agentX][self.__agentY].gold = False
-                    self.__goldLooted = True
-                    
-            elif self.__lastAction == Agent.Action.CLIMB:
-                if self.__agentX == 0 and self.__agentY == 0:
-                    if self.__goldLooted:
-                        self.__score += 1000
-                    if (self.__debug):
-                        self.__printWorldInfo()
-                    return self.__score;
-        return self.__score
+        elif action == Agent.Action.SHOOT:
         
+            if self.__hasArrow:
+                self.__hasArrow = False
+                self.__score -= 10
+                self.__scream = self.__board.shoot ( self.__agentX, self.__agentY, self.__agentDir )
+                self.__boardChanged()
+                
+        elif action == Agent.Action.GRAB:
+            if self.__board.takeGold ( self.__agentX, self.__agentY ):
+                self.__goldLooted = True
+                self.__boardChanged()
+                
+        elif action == Agent.Action.CLIMB:
+            if self.__agentX == 0 and self.__agentY == 0:
+                if self.__goldLooted:
+                    self.__score += 1000
+                if (self.__debug):
+                    self.__printWorldInfo()
+                return True;
+        return False
+
+    # ===============================================================
+    # =                 Snapshot Functions
+    # ===============================================================
+    
+    def snapshot ( self ):
+        # Returns the whole state of the game, for restore(). The board
+        # only saves what a game can change (the gold and the wumpus),
+        # so a snapshot costs about as much as a step.
+        return ( self.__score, self.__agentX, self.__agentY, self.__agentDir,
+                 self.__hasArrow, self.__goldLooted, self.__bump, self.__scream,
+                 self.__lastAction, self.__forfeited, self.__board.snapshot() )
+    
+    def restore ( self, snapshot ):
+        # Puts the game back to a snapshot, from any state of the same
+        # world; the agent's own state isn't part of it
+        ( self.__score, self.__agentX, self.__agentY, self.__agentDir,
+          self.__hasArrow, self.__goldLooted, self.__bump, self.__scream,
+          self.__lastAction, self.__forfeited, board ) = snapshot
+        self.__board.restore ( board )
+        self.__boardChanged()
+    
+    def reset ( self, record = None, agent = None ):
+        # Puts the game back to its start; returns the first percepts.
+        # With a record, the game starts over on that world instead.
+        # With an agent, it takes the place of the old one. Otherwise, on
+        # a new world, a new agent of the same class is built, unless the
+        # class opts in to being reused by setting reusable = True, in
+        # which case its reset() must clear everything it learned.
+        if agent != None:
+            self.__agent = agent
+        if record != None:
+            self.__load ( record )
+            if agent == None and getattr ( type ( self.__agent ), "reusable", False ) is True:
+                self.__agent.reset()
+            elif agent == None:
+                self.__agent = type ( self.__agent )()
+        self.restore ( self.__start )
+        return self.percepts()
+    
+    # ===============================================================
+    # =                 Inspection Functions
+    # ===============================================================
+    
+    def percepts ( self ):
+        # Returns what the agent senses now:
+        # (stench, breeze, glitter, bump, scream)
+        stench, breeze, glitter = self.__board.percepts ( self.__agentX, self.__agentY )
+        return stench, breeze, glitter, self.__bump, self.__scream
+    
+    def state ( self ):
+        return {
+            "score":      self.__score,
+            "steps":      self.__steps(),
+            "agentX":     self.__agentX,
+            "agentY":     self.__agentY,
+            "agentDir":   self.__agentDir,
+            "hasArrow":   self.__hasArrow,
+            "goldLooted": self.__goldLooted,
+            "bump":       self.__bump,
+            "scream":     self.__scream,
+            "lastAction": self.__lastAction
+        }
+    
+    def outcome ( self ):
+        # Returns how the game ended: "forfeit" if the agent ran out of
+        # time, "died", "climbed", or "timeout" if the score ran out (or
+        # the game isn't over)
+        if self.__forfeited:
+            return "forfeit"
+        if self.__board.isDeadly ( self.__agentX, self.__agentY ):
+            return "died"
+        if self.__lastAction == Agent.Action.CLIMB and self.__agentX == 0 and self.__agentY == 0:
+            return "climbed"
+        return "timeout"
+    
+    def __steps ( self ):
+        # Every move costs one point, so the number of moves is the
+        # score without the arrow, death and gold; the game loop
+        # doesn't have to count them
+        steps = -self.__score
+        if not self.__hasArrow:
+            steps -= 10
+        outcome = self.outcome()
+        if outcome == "forfeit":
+            steps -= PENALTY
+        elif outcome == "died":
+            steps -= 1000
+        elif outcome == "climbed" and self.__goldLooted:
+            steps += 1000
+        return steps
+    
+    def tile ( self, c, r ):
+        # Returns an object with the pit, wumpus, gold, breeze and
+        # stench of a cell
+        return self.__board.tile ( c, r )
+    
+    def description ( self ):
+        # Returns the world as it was built, before any moves
+        return WorldDescription ( self.__colDimension, self.__rowDimension,
+                                  list(self.__wumpus), list(self.__gold), list(self.__pits) )
+    
+    def dimensions ( self ):
+        return self.__colDimension, self.__rowDimension
+    
+    def printWorld ( self ):
+        self.__printWorldInfo()
+    
     # ===============================================================
     # =             World Generation Functions
     # ===============================================================
     
-    def __addFeatures ( self, file = None ):
-        if file == None:
-            # Generate pits
-            for r in range (self.__rowDimension):
-                for c in range (self.__colDimension):
-                    if (c != 0 or r != 0) and self.__randomInt(10) < 2:
-                        self.__addPit ( c, r )
-            
-            # Generate wumpus
+    def __addFeatures ( self ):
+        # Generate pits
+        for r in range (self.__rowDimension):
+            for c in range (self.__colDimension):
+                if (c != 0 or r != 0) and self.__randomInt(10) < 2:
+                    self.__addPit ( c, r )
+        
+        # Generate wumpus
+        wc = self.__randomInt(self.__colDimension)
+        wr = self.__randomInt(self.__rowDimension)
+        
+        while wc == 0 and wr == 0:
             wc = self.__randomInt(self.__colDimension)
             wr = self.__randomInt(self.__rowDimension)
             
-            while wc == 0 and wr == 0:
-                wc = self.__randomInt(self.__colDimension)
-                wr = self.__randomInt(self.__rowDimension)
-                
-            self.__addWumpus ( wc, wr );
+        self.__addWumpus ( wc, wr );
+        
+        # Generate gold
+        gc = self.__randomInt(self.__colDimension)
+        gr = self.__randomInt(self.__rowDimension)
             
-            # Generate gold
+        while gc == 0 and gr == 0:
             gc = self.__randomInt(self.__colDimension)
             gr = self.__randomInt(self.__rowDimension)
-                
-            while gc == 0 and gr == 0:
-                gc = self.__randomInt(self.__colDimension)
-                gr = self.__randomInt(self.__rowDimension)
-            
-            self.__addGold ( gc, gr )
-            
-        else:
-            # Add the Wumpus
-            c, r = [int(x) for x in next(file).split()]
+        
+        self.__addGold ( gc, gr )
+    
+    def __load ( self, record ):
+        # Empties the board and fills it with another world, and makes
+        # its start the state a new World starts a game in
+        self.__colDimension = record.colDimension
+        self.__rowDimension = record.rowDimension
+        self.__board.clear ( self.__colDimension, self.__rowDimension )
+        self.__wumpus.clear()
+        self.__gold.clear()
+        self.__pits.clear()
+        self.__addRecord ( record )
+        self.__start = ( 0, 0, 0, 0, True, False, False, False, Agent.Action.CLIMB, False, self.__board.snapshot() )
+    
+    def __addRecord ( self, record ):
+        for c, r in record.wumpus:
             self.__addWumpus ( c, r )
-            
-            # Add the Gold
-            c, r = [int(x) for x in next(file).split()]
+
+        for c, r in record.gold:
             self.__addGold ( c, r )
-            
-            # Add the Pits
-            numOfPits = int(next(file))
-            
-            while numOfPits > 0:
-                numOfPits -= 1
-                c, r = [int(x) for x in next(file).split()]
-                self.__addPit ( c, r )
-                
-            file.close()
+
+        for c, r in record.pits:
+            self.__addPit ( c, r )
     
     def __addPit ( self, c, r ):
-        if self.__isInBounds(c, r):
-            self.__board[c][r].pit = True
-            self.__addBreeze ( c+1, r )
-            self.__addBreeze ( c-1, r )
-            self.__addBreeze ( c, r+1 )
-            self.__addBreeze ( c, r-1 )
+        self.__pits.append ( (c, r) )
+        self.__board.addPit ( c, r )
     
     def __addWumpus ( self, c, r ):
-        if self.__isInBounds(c, r):
-            self.__board[c][r].wumpus = True
-            self.__addStench ( c+1, r )
-            self.__addStench ( c-1, r )
-            self.__addStench ( c, r+1 )
-            self.__addStench ( c, r-1 )
+        self.__wumpus.append ( (c, r) )
+        self.__board.addWumpus ( c, r )
     
     def __addGold ( self, c, r ):
-        if self.__isInBounds(c, r):
-            self.__board[c][r].gold = True
-    
-    def __addStench ( self, c, r ):
-        if self.__isInBounds(c, r):
-            self.__board[c][r].stench = True
-    
-    def __addBreeze ( self, c, r ):
-        if self.__isInBounds(c, r):
-            self.__board[c][r].breeze = True
-    
-    def __isInBounds ( self, c, r ):
-        return c < self.__colDimension and r < self.__rowDimension and c >= 0 and r >= 0
+        self.__gold.append ( (c, r) )
+        self.__board.addGold ( c, r )
     
     # ===============================================================
     # =             World Printing Functions
     # ===============================================================
     
     def __printWorldInfo ( self ):
-        self.__printBoardInfo()
-        self.__printAgentInfo()
+        self.__getRenderer().draw ( self )
     
-    def __printBoardInfo ( self ):
-        for r in range (self.__rowDimension-1, -1, -1):
-            for c in range (self.__colDimension):
-                self.__printTileInfo ( c, r )
-            print("")
-            print("")
-
-    def __printTileInfo ( self, c, r ):
-        tileString = ""
-        
-        if self.__board[c][r].pit:    tileString += "P"
-        if self.__board[c][r].wumpus: tileString += "W"
-        if self.__board[c][r].gold:   tileString += "G"
-        if self.__board[c][r].breeze: tileString += "B"
-        if self.__board[c][r].stench: tileString += "S"
-        
-        if self.__agentX == c and self.__agentY == r:
-            tileString += "@"
-        
-        tileString += "."
-        
-        print(tileString.rjust(8), end="")
-    
-    def __printAgentInfo ( self ):
-        print ( "Score: "   + str(self.__score) )
-        print ( "AgentX: "  + str(self.__agentX) )
-        print ( "AgentY: "  + str(self.__agentY) )
-        self.__printDirectionInfo()
-        self.__printActionInfo()
-        self.__printPerceptInfo()
-    
-    def __printDirectionInfo ( self ):
-        if self.__agentDir == 0:
-            print ( "AgentDir: Right" )
-            
-        elif self.__agentDir == 1:
-            print ( "AgentDir: Down" )
-            
-        elif self.__agentDir == 2:
-            print ( "AgentDir: Left" )
-            
-        elif self.__agentDir == 3:
-            print ( "AgentDir: Up" )
-            
-        else:
-            print ( "AgentDir: Invalid" )
+    def __getRenderer ( self ):
+        if self.__renderer == None:
+            self.__renderer = Renderer()
+        return self.__renderer
     
-    def __printActionInfo ( self ):
-        if self.__lastAction == Agent.Action.TURN_LEFT:
-            print ( "Last Action: Turned Left" )
-
-        elif self.__lastAction == Agent.Action.TURN_RIGHT:
-            print ( "Last Action: Turned Right")
-
-        elif self.__lastAction == Agent.Action.FORWARD:
-            print ( "Last Action: Moved Forward")
-
-        elif self.__lastAction == Agent.Action.SHOOT:
-            print ( "Last Action: Shot the Arrow")
-
-        elif self.__lastAction == Agent.Action.GRAB:
-            print ( "Last Action: Grabbed")
-
-        elif self.__lastAction == Agent.Action.CLIMB:
-            print ( "Last Action: Climbed")
-
-        else:
-            print ( "Last Action: Invalid")
-
-    def __printPerceptInfo ( self ):
-        perceptString = "Percepts: "
-        
-        if self.__board[self.__agentX][self.__agentY].stench: perceptString += "Stench, "
-        if self.__board[self.__agentX][self.__agentY].breeze: perceptString += "Breeze, "
-        if self.__board[self.__agentX][self.__agentY].gold:   perceptString += "Glitter, "
-        if self.__bump:                         perceptString += "Bump, "
-        if self.__scream:                       perceptString += "Scream"
-        
-        if perceptString[-1] == ' 'and perceptString[-2] == ',':
-            perceptString = perceptString[:-2]
-        
-        print(perceptString)
+    def __boardChanged ( self ):
+        # The board's cells changed, so the rows the renderer drew from
+        # them are out of date
+        if self.__renderer != None:
+            self.__renderer.invalidate()
     
     # ===============================================================
     # =                 Helper Functions
@@ -0,0 +1,125 @@
+# ======================================================================
+# FILE:        Worlds.py
+#
+# AUTHOR:      Wumpus World contributors
+#
+# DESCRIPTION: This file contains in-memory world descriptions, which
+#              the World class can be built from with its record
+#              argument, just like a WorldRecord from Corpus.py.
+#
+#              RandomWorlds is a lazy stream of random worlds. World i
+#              of a stream is drawn from its own generator, seeded from
+#              the stream's seed and i, so it is the same no matter
+#              which process builds it or in what order.
+#
+#              parseWorld reads the text of a world file in one pass,
+#              and readWorld reads and parses a world file.
+#
+# NOTES:       - Random worlds are drawn like World.__addFeatures: every
+#                cell but (0, 0) is a pit with probability 2/10, and the
+#                wumpus and gold are each placed on a cell other than
+#                (0, 0).
+#
+#              - parseWorld takes the whole file as str or bytes, and
+#                splits it on any whitespace, so files with "\n" or
+#                "\r\n" newlines read the same.
+#
+#              - A world file may hold more than one wumpus. After the
+#                pits, it can go on with the number of extra wumpus and
+#                a (c, r) pair for each; files without that section have
+#                just the one wumpus, as before. Anything else after the
+#                pits, or a section with too few or too many pairs, is
+#                rejected with ValueError.
+# ======================================================================
+
+import random
+
+class WorldDescription():
+
+    def __init__ ( self, colDimension, rowDimension, wumpus, gold, pits, name = "" ):
+        self.colDimension = colDimension
+        self.rowDimension = rowDimension
+        self.wumpus       = wumpus
+        self.gold         = gold
+        self.pits         = pits
+        self.name         = name
+
+def parseWorld ( text, name = "" ):
+    # Returns the WorldDescription of a world file's text: the
+    # dimensions, the wumpus, the gold, the number of pits and a
+    # (c, r) pair for every pit, then optionally the number of extra
+    # wumpus and a (c, r) pair for each
+    values = list ( map ( int, text.split() ) )
+
+    if len(values) < 7 or len(values) < 7 + 2 * values[6]:
+        raise ValueError ( "Truncated world file" )
+    if values[6] < 0:
+        raise ValueError ( "Malformed world file: negative number of pits" )
+
+    end    = 7 + 2 * values[6]
+    pits   = list ( zip ( values[7:end:2], values[8:end:2] ) )
+    wumpus = [ (values[2], values[3]) ]
+
+    if len(values) > end:
+        last = end + 1 + 2 * values[end]
+        if values[end] < 0 or len(values) != last:
+            raise ValueError ( "Malformed world file: " + str(len(values) - end) + " values after the pits "
+                               "aren't a number of extra wumpus and a pair for each" )
+        wumpus += zip ( values[end+1:last:2], values[end+2:last:2] )
+
+    return WorldDescription ( values[0], values[1], wumpus, [ (values[4], values[5]) ], pits, name )
+
+def readWorld ( filename, name = "" ):
+    # Reads a world file once, and parses it in one pass
+    with open ( filename, "rb" ) as file:
+        text = file.read()
+
+    try:
+        return parseWorld ( text, name )
+    except ValueError as error:
+        raise ValueError ( str(error) + ": " + filename )
+
+def isNumber ( value ):
+    # Whether a command line value is a number, and not negative
+    try:
+        return float(value) >= 0
+    except ValueError:
+        return False
+
+class RandomWorlds():
+
+    def __init__ ( self, seed, colDimension = 4, rowDimension = 4 ):
+        self.__seed         = seed
+        self.__colDimension = colDimension
+        self.__rowDimension = rowDimension
+
+    def __getitem__ ( self, i ):
+        # Every world gets its own generator, seeded with (seed, i)
+        rng  = random.Random ( (self.__seed << 64) | i )
+        cols = self.__colDimension
+        rows = self.__rowDimension
+
+        # Generate pits
+        pits = []
+        for r in range (rows):
+            for c in range (cols):
+                if (c != 0 or r != 0) and rng.randrange(10) < 2:
+                    pits.append ( (c, r) )
+
+        # Generate wumpus
+        wc = rng.randrange(cols)
+        wr = rng.randrange(rows)
+
+        while wc == 0 and wr == 0:
+            wc = rng.randrange(cols)
+            wr = rng.randrange(rows)
+
+        # Generate gold
+        gc = rng.randrange(cols)
+        gr = rng.randrange(rows)
+
+        while gc == 0 and gr == 0:
+            gc = rng.randrange(cols)
+            gr = rng.randrange(rows)
+
+        return WorldDescription ( cols, rows, [ (wc, wr) ], [ (gc, gr) ], pits, "random_" + str(i) )
@@ -4,10 +4,60 @@
 # AUTHOR:      Abdullah Younis
 #
 # DESCRIPTION: This file contains the Wumpus World Generator script. 
+#
+# NOTES:       - Syntax:
+#
+#                   World_Generator [Options] Base_File_Name #ofWorlds rowDim colDim
+#
+#                  Options:
+#                      -b Bulk mode. Draws the worlds in blocks with
+#                         NumPy, and writes them all to one packed
+#                         corpus, Base_File_Name.wwc, which Main.py's
+#                         -f reads in place of a folder. See Corpus.py
+#                         in the Python shell, which it needs, next to
+#                         this folder.
+#                      -w With -b, writes one world file per world,
+#                         Base_File_Name_N.txt, as without -b, instead
+#                         of the corpus.
+#                      -j N With -b, splits the blocks across N worker
+#                         processes.
+#                      -s N With -b, seeds the generator. Each block has
+#                         its own stream spawned from the seed, so the
+#                         worlds only depend on the seed, not on -j.
+#
+#              - genWorld draws the gaps between pits rather than
+#                a coin per cell, so large sparse boards are quick to
+#                generate.
+#
+#              - Bulk mode draws from the same distribution as
+#                genWorld: every cell but (0, 0) is a pit with
+#                probability 2/10, and the wumpus and gold are each
+#                uniform over every cell but (0, 0).
+#
+#              - The corpus layout is taken from Corpus.py, so the two
+#                can't drift apart.
 # ======================================================================
 
 import sys
+import os
+import math
 import random
+import struct
+import multiprocessing
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+# The packed corpus format belongs to the Python shell
+sys.path.append ( os.path.join ( os.path.dirname ( os.path.abspath ( __file__ ) ), "..", "Wumpus_World_Python_Shell", "src" ) )
+try:
+	import Corpus
+except ImportError:
+	Corpus = None
+
+PIT_LOG = math.log ( 0.8 )
 
 def randomInt ( limit ):
 	return random.randrange(limit)
@@ -19,11 +69,15 @@ def genWorld ( colDimension, rowDimension, filename ):
 	gr = 0
 	pits = []
 	
-	# Generate pits
-	for r in range (rowDimension):
-		for c in range (colDimension):
-			if (c != 0 or r != 0) and randomInt(10) < 2:
-				pits.append((r,c))
+	# Generate pits. Every cell but (0, 0) is a pit with probability
+	# 2/10, so the gap to the next pit is geometric; drawing the gaps
+	# takes one draw per pit instead of one per cell.
+	cell = 0
+	while True:
+		cell += 1 + int ( math.log ( 1.0 - random.random() ) / PIT_LOG )
+		if cell >= colDimension * rowDimension:
+			break
+		pits.append((cell // colDimension, cell % colDimension))
 
 	# Generate wumpus and gold
 	wc = randomInt(colDimension)
@@ -51,15 +105,174 @@ def genWorld ( colDimension, rowDimension, filename ):
 	file.close();
 	
 
-if len(sys.argv) != 5:
-	print ( "Usage: World_Generator Base_File_Name #ofWorlds rowDim colDim" )
-	exit(0)
+# ======================================================================
+# =                 Bulk Generation
+# ======================================================================
+
+def blockSize ( colDimension, rowDimension ):
+	# Keeps every block's pit draws to about 16 MB
+	return max ( 1, min ( 10000, (1 << 24) // (colDimension * rowDimension) ) )
 
-baseFileName = sys.argv[1]
-numOfFiles   = int(sys.argv[2])
-colDimension = int(sys.argv[3])
-rowDimension = int(sys.argv[4])
-	
-for i in range(numOfFiles):
-	print ( "Creating world number: " + str(i) + "." )
-	genWorld( colDimension, rowDimension, baseFileName + "_" + str(i) + ".txt" )
+def genBlock ( start, count, colDimension, rowDimension, seed, baseFileName, files ):
+	# Generates worlds start to start+count-1 and returns them as packed
+	# records with the length of each, or with files, writes them to
+	# world files
+	rng   = np.random.default_rng ( seed )
+	cells = colDimension * rowDimension
+
+	# Generate pits, in the (r, c) order genWorld writes them
+	pitMask = rng.integers ( 0, 10, size=(count, cells), dtype=np.int8 ) < 2
+	pitMask[:, 0] = False
+	world, cell = np.nonzero ( pitMask )
+	numOfPits = np.bincount ( world, minlength=count )
+	ends = np.cumsum ( numOfPits ).tolist()
+
+	# Generate wumpus and gold, uniform over every cell but (0, 0)
+	wumpus = rng.integers ( 1, cells, size=count )
+	gold   = rng.integers ( 1, cells, size=count )
+
+	if not files:
+		# A record's fields, then the wumpus and gold pairs, then the pits
+		baseName = baseFileName.replace ( "\\", "/" ).split ( "/" )[-1]
+		pairs   = np.stack ( ( cell // colDimension, cell % colDimension ), axis=1 ).astype ( "<i4" )
+		heads   = np.zeros ( (count, Corpus.FIELDS + 4), dtype="<i4" )
+		heads[:, 0] = colDimension
+		heads[:, 1] = rowDimension
+		heads[:, 2] = 1
+		heads[:, 3] = 1
+		heads[:, 4] = numOfPits
+		heads[:, Corpus.FIELDS]     = wumpus % colDimension
+		heads[:, Corpus.FIELDS + 1] = wumpus // colDimension
+		heads[:, Corpus.FIELDS + 2] = gold % colDimension
+		heads[:, Corpus.FIELDS + 3] = gold // colDimension
+
+		records = []
+		lengths = []
+		begin   = 0
+		for i in range(count):
+			name = (baseName + "_" + str(start + i) + ".txt").encode ( "utf-8" )
+			heads[i, 5] = len(name)
+			record = heads[i].tobytes() + pairs[begin:ends[i]].tobytes() + name + b"\0" * (-len(name) % 4)
+			records.append ( record )
+			lengths.append ( len(record) )
+			begin = ends[i]
+		return b"".join ( records ), lengths
+
+	pitLines = [ str(r) + "\t" + str(c) + "\n" for r in range(rowDimension) for c in range(colDimension) ]
+	pitLines = [ pitLines[i] for i in cell.tolist() ]
+	dimLine  = str(colDimension) + "\t" + str(rowDimension) + "\n"
+
+	begin = 0
+	for i, ( w, g, n, end ) in enumerate ( zip ( wumpus.tolist(), gold.tolist(), numOfPits.tolist(), ends ) ):
+		with open ( baseFileName + "_" + str(start + i) + ".txt", "w" ) as file:
+			file.write ( dimLine +
+			             str(w % colDimension) + "\t" + str(w // colDimension) + "\n" +
+			             str(g % colDimension) + "\t" + str(g // colDimension) + "\n" +
+			             str(n) + "\n" + "".join ( pitLines[begin:end] ) )
+		begin = end
+	return None, None
+
+def genBulk ( baseFileName, numOfFiles, colDimension, rowDimension, jobs, seed, files ):
+	size   = blockSize ( colDimension, rowDimension )
+	starts = list ( range ( 0, numOfFiles, size ) )
+	seeds  = np.random.SeedSequence ( seed ).spawn ( len(starts) )
+	blocks = [ ( start, min ( size, numOfFiles - start ), colDimension, rowDimension, seeds[i], baseFileName, files )
+	           for i, start in enumerate(starts) ]
+
+	pool     = multiprocessing.Pool ( jobs ) if jobs > 1 else None
+	results  = pool.imap ( genBlockStar, blocks ) if pool else map ( genBlockStar, blocks )
+
+	if not files:
+		filename = baseFileName + ".wwc"
+		header   = Corpus.HEADER
+		with open ( filename, "wb", buffering=1 << 20 ) as file:
+			index  = []
+			offset = header.size + 8 * numOfFiles
+			file.write ( header.pack ( Corpus.MAGIC, Corpus.VERSION, numOfFiles ) )
+			file.write ( b"\0" * (8 * numOfFiles) )
+
+			for data, lengths in results:
+				file.write ( data )
+				for length in lengths:
+					index.append ( offset )
+					offset += length
+
+			file.seek ( header.size )
+			file.write ( struct.pack ( "<" + str(numOfFiles) + "Q", *index ) )
+	else:
+		# Every block writes its own world files; wait for them all
+		filename = baseFileName + "_0.txt to _" + str(numOfFiles - 1) + ".txt"
+		for data, lengths in results:
+			pass
+
+	if pool:
+		pool.close()
+		pool.join()
+
+	print ( "Created " + str(numOfFiles) + " worlds in " + filename + "." )
+
+def genBlockStar ( args ):
+	return genBlock ( *args )
+
+# ======================================================================
+# =                 Command Line
+# ======================================================================
+
+def main ( ):
+	args = sys.argv
+
+	bulk       = False
+	files      = False
+	jobs       = 1
+	seed       = None
+	positional = []
+
+	index = 1
+	while index < len(args):
+		token  = args[index]
+		index += 1
+
+		if token[0] != '-':
+			positional.append ( token )
+			continue
+
+		for char in token[1:]:
+			if char == 'b':
+				bulk = True
+			elif char == 'w':
+				files = True
+			elif char in "js" and index < len(args) and args[index].isdigit():
+				if char == 'j':
+					jobs = max ( 1, int(args[index]) )
+				else:
+					seed = int(args[index])
+				index += 1
+			else:
+				positional = []
+				break
+
+	if len(positional) != 4:
+		print ( "Usage: World_Generator [-b] [-w] [-j N] [-s N] Base_File_Name #ofWorlds rowDim colDim" )
+		exit(0)
+
+	baseFileName = positional[0]
+	numOfFiles   = int(positional[1])
+	colDimension = int(positional[2])
+	rowDimension = int(positional[3])
+
+	if bulk:
+		if np == None:
+			print ( "[ERROR] Bulk mode requires NumPy." )
+			exit(1)
+		if not files and Corpus == None:
+			print ( "[ERROR] Bulk mode requires Corpus.py from the Python shell, or -w." )
+			exit(1)
+		genBulk ( baseFileName, numOfFiles, colDimension, rowDimension, jobs, seed, files )
+		return
+
+	for i in range(numOfFiles):
+		print ( "Creating world number: " + str(i) + "." )
+		genWorld( colDimension, rowDimension, baseFileName + "_" + str(i) + ".txt" )
+
+if __name__ == "__main__":
+	main()